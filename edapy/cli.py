@@ -24,7 +24,7 @@ import edapy.pdf
 logging.basicConfig(
     format="%(asctime)s %(levelname)s %(message)s",
     level=logging.DEBUG,
-    stream=sys.stdout,
+    stream=sys.stderr,
 )
 
 
@@ -2,9 +2,12 @@
 
 # Core Library
 import collections
+import dataclasses
+import json
+import logging
 import os
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 # Third party
 import click
@@ -12,10 +15,32 @@ import pandas as pd
 import yaml
 
 # First party
-from edapy.csv.describe import describe_pandas_df
-from edapy.csv.interactive_type_finder import find_type
-from edapy.csv.utils import load_csv  # noqa
-from edapy.csv.utils import get_csv_delimiter, get_quote_char
+from edapy.csv.cache import DEFAULT_CACHE_DIR, ProfileCache
+from edapy.csv.compression import detect_compression, open_csv
+from edapy.csv.describe import (  # noqa
+    OUTPUT_FORMATS,
+    describe_memory,
+    describe_pandas_df,
+    describe_stats,
+    format_memory,
+    profile_pandas_df,
+    render_stats,
+)
+from edapy.csv.dialect import CsvDialect, sniff_dialect, sniff_file_format
+from edapy.csv.drift import DRIFT_PERCENTILES, diff_stats, format_drift, read_profile
+from edapy.csv.dtypes import recommend_dtypes
+from edapy.csv.incremental import profile_csv_incremental, state_key
+from edapy.csv.interactive_type_finder import find_type, find_type_from_stats
+from edapy.csv.sharding import DEFAULT_CHUNKSIZE, profile_csv_parallel
+from edapy.csv.stats import EXACT_QUANTILE_MAX_ROWS, DatasetStats
+from edapy.csv.streaming import (
+    AccumulatorConfig,
+    DatasetAccumulator,
+    profile_csv_chunked,
+)
+from edapy.csv.utils import get_csv_delimiter, get_quote_char, load_csv  # noqa
+
+logger = logging.getLogger(__name__)
 
 
 @click.group(name="csv")
@@ -25,7 +50,10 @@ def entry_point() -> None:
 
 @entry_point.command(name="predict")
 @click.option(
-    "--csv_path", help="CSV file to read", required=True, type=click.Path(exists=True)
+    "--csv_path",
+    help="CSV, Parquet, Feather or Arrow IPC file to read",
+    required=True,
+    type=click.Path(exists=True),
 )
 @click.option(
     "--types", help="YAML file to read / write", required=True, type=click.Path()
@@ -33,7 +61,125 @@ def entry_point() -> None:
 @click.option(
     "--nrows", help="Number of rows to read. By default, read all lines", type=int
 )
-def main(csv_path: str, types: str, nrows: Optional[int] = None) -> None:
+@click.option(
+    "--chunksize",
+    help=(
+        "Read the CSV in chunks of this many rows. "
+        "By default, the whole file is read at once"
+    ),
+    type=int,
+)
+@click.option(
+    "--jobs",
+    help=(
+        "Number of processes which profile parts of the CSV in parallel. "
+        "Compressed files are decompressed by this many threads instead"
+    ),
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--engine",
+    help=(
+        "Parse and profile with pandas or with pyarrow. "
+        "The arrow engine needs much less memory for string columns"
+    ),
+    default="pandas",
+    show_default=True,
+    type=click.Choice(["pandas", "arrow"]),
+)
+@click.option(
+    "--sketch-error",
+    help=(
+        "Estimate unique values and the most common values with sketches of "
+        "this relative error (e.g. 0.01) instead of counting them exactly. "
+        "Only for the pandas engine"
+    ),
+    type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+)
+@click.option(
+    "--percentiles",
+    help="Comma-separated percentiles to show for numeric columns, e.g. 1,99,99.9",
+    default="",
+    callback=lambda ctx, param, value: _parse_percentiles(value),
+)
+@click.option(
+    "--exact-quantile-max-rows",
+    help=(
+        "Quantiles of columns with more values are estimated with a "
+        "mergeable sketch instead of being computed exactly"
+    ),
+    default=EXACT_QUANTILE_MAX_ROWS,
+    show_default=True,
+    type=click.IntRange(min=0),
+)
+@click.option(
+    "--cache-dir",
+    help=(
+        "Directory, e.g. ~/.edapy/cache, in which the profile is cached until "
+        "the CSV file changes"
+    ),
+    envvar="EDAPY_CACHE_DIR",
+    type=click.Path(file_okay=False),
+)
+@click.option(
+    "--incremental",
+    help=(
+        "Remember the profile in the cache directory and only profile the "
+        "rows which were appended to the CSV file on the next run"
+    ),
+    is_flag=True,
+)
+@click.option(
+    "--metadata-only",
+    help=(
+        "Only read the statistics in the footer of a Parquet file, e.g. the "
+        "minimum. This is fast for huge files, but the mean, the quantiles "
+        "and the most common values are not known"
+    ),
+    is_flag=True,
+)
+@click.option(
+    "--correlations",
+    help=(
+        "Also compute Pearson and Spearman correlations of numeric columns "
+        "and Cramér's V of category columns"
+    ),
+    is_flag=True,
+)
+@click.option(
+    "--output-format",
+    help=(
+        "Format of the profile. json, yaml and arrow contain all statistics "
+        "of each column, e.g. to store them or to compare them"
+    ),
+    default="text",
+    show_default=True,
+    type=click.Choice(OUTPUT_FORMATS),
+)
+@click.option(
+    "--output",
+    help="File to write the profile to. By default, it is printed",
+    type=click.Path(dir_okay=False),
+)
+def main(
+    csv_path: str,
+    types: str,
+    nrows: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    jobs: int = 1,
+    engine: str = "pandas",
+    sketch_error: Optional[float] = None,
+    percentiles: Sequence[float] = (),
+    exact_quantile_max_rows: int = EXACT_QUANTILE_MAX_ROWS,
+    cache_dir: Optional[str] = None,
+    incremental: bool = False,
+    metadata_only: bool = False,
+    correlations: bool = False,
+    output_format: str = "text",
+    output: Optional[str] = None,
+) -> None:
     """
     Start the CSV recognizing.
 
@@ -42,28 +188,581 @@ def main(csv_path: str, types: str, nrows: Optional[int] = None) -> None:
     csv_path : str
     types : str
     nrows : int (default: all rows)
+    chunksize : int (default: read everything at once)
+    jobs : int (default: 1)
+    engine : str (default: 'pandas')
+    sketch_error : float (default: count exactly)
+    percentiles : Sequence[float] (default: only quartiles)
+    exact_quantile_max_rows : int (default: 1000000)
+    cache_dir : str (default: no cache)
+    incremental : bool (default: False)
+    metadata_only : bool (default: False)
+    correlations : bool (default: False)
+    output_format : str (default: 'text')
+    output : str (default: print the profile)
     """
     csv_path = os.path.abspath(csv_path)
     types = os.path.abspath(types)
     if not os.path.isfile(csv_path):
         print(f"Could not find '{csv_path}'.")
         sys.exit(1)
-    if not os.path.isfile(types):
-        df = pd.read_csv(csv_path, sep=None, engine="python", nrows=nrows)
+    file_format = sniff_file_format(csv_path)
+    _validate_options(
+        csv_path,
+        file_format,
+        nrows=nrows,
+        chunksize=chunksize,
+        jobs=jobs,
+        engine=engine,
+        sketch_error=sketch_error,
+        incremental=incremental,
+        metadata_only=metadata_only,
+        correlations=correlations,
+        output_format=output_format,
+        output=output,
+    )
+    is_new = not os.path.isfile(types)
+    if is_new:
         data: Dict[str, Any] = collections.OrderedDict()
-        data["csv_meta"] = {
-            "delimiter": get_csv_delimiter(csv_path),
-            "quotechar": get_quote_char(csv_path),
-        }
-        data["columns"] = find_type(df)
-        _write_yaml(types, data)
+        if file_format == "csv":
+            data["csv_meta"] = sniff_dialect(csv_path).to_dict()
     else:
-        df = pd.read_csv(csv_path, sep=None, engine="python", nrows=nrows)
         data = _read_yaml(types)
-    describe_pandas_df(df)
+    dialect = CsvDialect()
+    if file_format == "csv":
+        dialect = _get_dialect(csv_path, data.get("csv_meta", {}))
+    options = {
+        "file_format": file_format,
+        "metadata_only": metadata_only,
+        "correlations": correlations,
+        "dialect": dialect.to_dict(),
+        "nrows": nrows,
+        "chunksize": chunksize,
+        "engine": engine,
+        "sketch_error": sketch_error,
+        "percentiles": list(percentiles),
+        "exact_quantile_max_rows": exact_quantile_max_rows,
+    }
+    stats, predicted_types = _get_csv_profile(
+        csv_path, dialect, jobs, options, cache_dir, incremental, with_types=is_new
+    )
+    if is_new:
+        data["columns"] = predicted_types
+        recommend_dtypes(data["columns"], stats)
+        _write_yaml(types, data)
+    recommended = {
+        entry["name"]: entry["recommended_dtype"]
+        for entry in data.get("columns", [])
+        if "recommended_dtype" in entry
+    }
+    _write_report(stats, recommended, output_format, output)
     _write_yaml(types, data)
 
 
+def _validate_options(
+    csv_path: str,
+    file_format: str,
+    nrows: Optional[int],
+    chunksize: Optional[int],
+    jobs: int,
+    engine: str,
+    sketch_error: Optional[float],
+    incremental: bool,
+    metadata_only: bool,
+    correlations: bool,
+    output_format: str,
+    output: Optional[str],
+) -> None:
+    """Raise a click.UsageError if options of predict can not be combined."""
+    if jobs > 1 and nrows is not None:
+        raise click.UsageError("--nrows can not be combined with --jobs")
+    if engine == "arrow" and (chunksize is not None or jobs > 1):
+        raise click.UsageError(
+            "The arrow engine is multithreaded already and can not be "
+            "combined with --chunksize or --jobs"
+        )
+    if engine == "arrow" and sketch_error is not None:
+        raise click.UsageError("--sketch-error is not supported by the arrow engine")
+    if incremental and (engine == "arrow" or jobs > 1 or nrows is not None):
+        raise click.UsageError(
+            "--incremental can not be combined with the arrow engine, "
+            "--jobs or --nrows"
+        )
+    if file_format != "csv" and (
+        nrows is not None
+        or chunksize is not None
+        or jobs > 1
+        or sketch_error is not None
+        or incremental
+    ):
+        raise click.UsageError(
+            f"{file_format} files are always profiled with pyarrow and do not "
+            "support --nrows, --chunksize, --jobs, --sketch-error or --incremental"
+        )
+    if incremental and detect_compression(csv_path) is not None:
+        raise click.UsageError("Compressed files can not be profiled incrementally")
+    if metadata_only and file_format != "parquet":
+        raise click.UsageError("--metadata-only is only supported for Parquet files")
+    if output_format == "arrow" and output is None:
+        raise click.UsageError("--output-format arrow needs --output")
+    if correlations and (
+        engine == "arrow" or file_format != "csv" or output_format == "arrow"
+    ):
+        raise click.UsageError(
+            "--correlations is only supported for CSV files with the pandas "
+            "engine and can not be written as arrow"
+        )
+
+
+@entry_point.command(name="convert")
+@click.option(
+    "--csv_path", help="CSV file to read", required=True, type=click.Path(exists=True)
+)
+@click.option(
+    "--types",
+    help="YAML file which edapy csv predict wrote",
+    required=True,
+    type=click.Path(exists=True),
+)
+@click.option(
+    "--output",
+    help="Parquet or Feather file to write",
+    required=True,
+    type=click.Path(),
+)
+@click.option(
+    "--format",
+    "output_format",
+    help="By default, the format is derived from the file extension of --output",
+    type=click.Choice(["parquet", "feather"]),
+)
+@click.option(
+    "--chunksize",
+    help="Number of rows which are converted at once, i.e. the row group size",
+    default=DEFAULT_CHUNKSIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--compression",
+    help="e.g. zstd. By default, snappy for Parquet and lz4 for Feather",
+)
+def convert(
+    csv_path: str,
+    types: str,
+    output: str,
+    output_format: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    compression: Optional[str] = None,
+) -> None:
+    """
+    Convert a CSV file to Parquet or Feather with the dtypes of the types YAML.
+
+    Parameters
+    ----------
+    csv_path : str
+    types : str
+    output : str
+    output_format : str (default: derived from output)
+    chunksize : int (default: 100000)
+    compression : str (default: depends on the format)
+    """
+    # First party
+    from edapy.csv.convert import convert_csv, get_output_format
+
+    if output_format is None:
+        try:
+            output_format = get_output_format(output)
+        except ValueError as exc:
+            raise click.BadParameter(str(exc), param_hint="--output")
+    nb_rows = convert_csv(
+        csv_path,
+        types,
+        output,
+        output_format=output_format,
+        chunksize=chunksize,
+        compression=compression,
+    )
+    print(f"Wrote {nb_rows} rows to '{output}'")
+
+
+@entry_point.command(name="diff")
+@click.option(
+    "--old",
+    "old_path",
+    help=(
+        "Profile written by predict --output-format json, yaml or arrow, or a "
+        "CSV, Parquet or Feather file"
+    ),
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "--new",
+    "new_path",
+    help="Profile or file to compare with the old one",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+)
+@click.option(
+    "--percentiles",
+    help=(
+        "Percentiles of numeric columns for files which are profiled. More "
+        "percentiles give more precise PSI and KS statistics"
+    ),
+    default=",".join(str(percentile) for percentile in DRIFT_PERCENTILES),
+    show_default=True,
+    callback=lambda ctx, param, value: _parse_percentiles(value),
+)
+@click.option(
+    "--jobs",
+    help="Number of processes which profile parts of a CSV file in parallel",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--cache-dir",
+    help=(
+        "Directory in which profiles of files are cached. Profiles which "
+        "predict cached with the same --percentiles are reused"
+    ),
+    envvar="EDAPY_CACHE_DIR",
+    type=click.Path(file_okay=False),
+)
+@click.option(
+    "--output-format",
+    default="text",
+    show_default=True,
+    type=click.Choice(["text", "json", "yaml"]),
+)
+@click.option(
+    "--output",
+    help="File to write the differences to. By default, they are printed",
+    type=click.Path(dir_okay=False),
+)
+@click.option("--only-drifted", help="Only show columns which drifted", is_flag=True)
+@click.option(
+    "--fail-on-drift",
+    help="Exit with status 1 if a column drifted, e.g. to stop a pipeline",
+    is_flag=True,
+)
+def diff(
+    old_path: str,
+    new_path: str,
+    percentiles: Sequence[float] = tuple(DRIFT_PERCENTILES),
+    jobs: int = 1,
+    cache_dir: Optional[str] = None,
+    output_format: str = "text",
+    output: Optional[str] = None,
+    only_drifted: bool = False,
+    fail_on_drift: bool = False,
+) -> None:
+    """
+    Compare two versions of a dataset, e.g. the exports of two days.
+
+    Parameters
+    ----------
+    old_path : str
+    new_path : str
+    percentiles : Sequence[float] (default: DRIFT_PERCENTILES)
+    jobs : int (default: 1)
+    cache_dir : str (default: no cache)
+    output_format : str (default: 'text')
+    output : str (default: print the differences)
+    only_drifted : bool (default: False)
+    fail_on_drift : bool (default: False)
+    """
+    cache = None if cache_dir is None else ProfileCache(cache_dir)
+    drift = diff_stats(
+        _get_profile(old_path, percentiles, jobs, cache),
+        _get_profile(new_path, percentiles, jobs, cache),
+    )
+    if output_format == "text":
+        report = format_drift(drift, only_drifted)
+    else:
+        data = drift.to_dict()
+        if only_drifted:
+            data["columns"] = [col for col in data["columns"] if col["drifted"]]
+        if output_format == "json":
+            report = json.dumps(data, indent=2, ensure_ascii=False)
+        else:
+            report = yaml.safe_dump(data, sort_keys=False, allow_unicode=True)
+    if output is None:
+        print(report)
+    else:
+        with open(output, "w") as fp:
+            fp.write(report + "\n")
+    if fail_on_drift and len(drift.drifted) > 0:
+        sys.exit(1)
+
+
+def _get_profile(
+    path: str, percentiles: Sequence[float], jobs: int, cache: Optional[ProfileCache]
+) -> DatasetStats:
+    """Read a profile or profile a file with the default options of predict."""
+    stats = read_profile(path)
+    if stats is not None:
+        return stats
+    path = os.path.abspath(path)
+    file_format = sniff_file_format(path)
+    dialect = sniff_dialect(path) if file_format == "csv" else CsvDialect()
+    options = {
+        "file_format": file_format,
+        "metadata_only": False,
+        "correlations": False,
+        "dialect": dialect.to_dict(),
+        "nrows": None,
+        "chunksize": None,
+        "engine": "pandas",
+        "sketch_error": None,
+        "percentiles": list(percentiles),
+        "exact_quantile_max_rows": EXACT_QUANTILE_MAX_ROWS,
+    }
+    if cache is None:
+        stats, _ = _profile_csv(path, dialect, jobs, options, with_types=False)
+        return stats
+    key = cache.key(path, options)
+    cached = cache.get(key)
+    if cached is None:
+        cached = _profile_csv(path, dialect, jobs, options, with_types=True)
+        cache.put(key, cached)
+    return cached[0]
+
+
+def _get_csv_profile(
+    csv_path: str,
+    dialect: CsvDialect,
+    jobs: int,
+    options: Dict[str, Any],
+    cache_dir: Optional[str],
+    incremental: bool,
+    with_types: bool,
+) -> Tuple[DatasetStats, Optional[List[Dict]]]:
+    """Profile a file for predict, or get its profile from the cache."""
+    cache = None if cache_dir is None else ProfileCache(cache_dir)
+    if incremental:
+        return _profile_csv_incremental(
+            csv_path, dialect, options, cache or ProfileCache(DEFAULT_CACHE_DIR)
+        )
+    if cache is None:
+        return _profile_csv(csv_path, dialect, jobs, options, with_types=with_types)
+    # Cached profiles always have types, as the types YAML may be deleted
+    key = cache.key(csv_path, options)
+    cached = cache.get(key)
+    if cached is None:
+        cached = _profile_csv(csv_path, dialect, jobs, options, with_types=True)
+        cache.put(key, cached)
+    return cached
+
+
+def _profile_csv(
+    csv_path: str,
+    dialect: CsvDialect,
+    jobs: int,
+    options: Dict[str, Any],
+    with_types: bool,
+) -> Tuple[DatasetStats, Optional[List[Dict]]]:
+    """
+    Compute the statistics and, if with_types is given, the types of a CSV.
+
+    Parameters
+    ----------
+    csv_path : str
+    dialect : CsvDialect
+    jobs : int
+    options : Dict[str, Any]
+        The command line options which change the profile
+    with_types : bool
+
+    Returns
+    -------
+    stats, predicted_types : Tuple[DatasetStats, Optional[List[Dict]]]
+    """
+    df = None
+    if options["file_format"] != "csv":
+        # First party
+        from edapy.csv.columnar import profile_columnar, read_embedded_types
+
+        stats = profile_columnar(
+            csv_path,
+            percentiles=options["percentiles"],
+            exact_quantile_max_rows=options["exact_quantile_max_rows"],
+            metadata_only=options["metadata_only"],
+        )
+        if not with_types:
+            return stats, None
+        return stats, read_embedded_types(csv_path) or find_type_from_stats(stats)
+    if options["engine"] == "arrow":
+        # First party
+        from edapy.csv.arrow import profile_table, read_csv_arrow
+
+        stats = profile_table(
+            read_csv_arrow(csv_path, dialect, nrows=options["nrows"]),
+            percentiles=options["percentiles"],
+            exact_quantile_max_rows=options["exact_quantile_max_rows"],
+        )
+    elif options["chunksize"] is None and jobs == 1:
+        with open_csv(csv_path) as source:
+            df = pd.read_csv(
+                source, nrows=options["nrows"], **dialect.read_csv_kwargs()
+            )
+        stats = profile_pandas_df(
+            df,
+            sketch_error=options["sketch_error"],
+            percentiles=options["percentiles"],
+            exact_quantile_max_rows=options["exact_quantile_max_rows"],
+            correlations=options["correlations"],
+        )
+    else:
+        config = AccumulatorConfig(
+            sketch_error=options["sketch_error"],
+            exact_quantile_max_rows=options["exact_quantile_max_rows"],
+            correlations=options["correlations"],
+        )
+        accumulator = _profile(
+            csv_path, dialect, options["chunksize"], options["nrows"], jobs, config
+        )
+        stats = accumulator.to_stats(percentiles=options["percentiles"])
+    if not with_types:
+        return stats, None
+    if df is None:
+        return stats, find_type_from_stats(stats)
+    return stats, find_type(df, sketch_error=options["sketch_error"])
+
+
+def _profile_csv_incremental(
+    csv_path: str, dialect: CsvDialect, options: Dict[str, Any], cache: ProfileCache
+) -> Tuple[DatasetStats, List[Dict]]:
+    """
+    Profile the rows which were appended since the state in the cache was made.
+
+    Parameters
+    ----------
+    csv_path : str
+    dialect : CsvDialect
+    options : Dict[str, Any]
+        The command line options which change the profile
+    cache : ProfileCache
+        Stores the state of the profile
+
+    Returns
+    -------
+    stats, predicted_types : Tuple[DatasetStats, List[Dict]]
+    """
+    config = AccumulatorConfig(
+        sketch_error=options["sketch_error"],
+        exact_quantile_max_rows=options["exact_quantile_max_rows"],
+        correlations=options["correlations"],
+    )
+    key = state_key(
+        csv_path,
+        {
+            "dialect": options["dialect"],
+            "sketch_error": options["sketch_error"],
+            "exact_quantile_max_rows": options["exact_quantile_max_rows"],
+            "correlations": options["correlations"],
+        },
+    )
+    state = profile_csv_incremental(
+        csv_path,
+        state=cache.get(key),
+        chunksize=options["chunksize"] or DEFAULT_CHUNKSIZE,
+        dialect=dialect,
+        config=config,
+    )
+    cache.put(key, state)
+    stats = state.accumulator.to_stats(percentiles=options["percentiles"])
+    return stats, find_type_from_stats(stats)
+
+
+def _write_report(
+    stats: DatasetStats,
+    recommended: Dict[str, str],
+    output_format: str,
+    output: Optional[str],
+) -> None:
+    if output_format == "text" and output is None:
+        describe_stats(stats)
+        describe_memory(stats, recommended)
+        return
+    if output_format == "arrow":
+        # Third party
+        import pyarrow.feather as feather
+
+        # First party
+        from edapy.csv.arrow import stats_to_table
+
+        feather.write_feather(stats_to_table(stats), output)
+        return
+    report = render_stats(stats, output_format)
+    if output_format == "text":
+        report += "\n" + format_memory(stats, recommended)
+    if output is None:
+        print(report)
+        return
+    with open(output, "w") as fp:
+        fp.write(report + "\n")
+
+
+def _get_dialect(csv_path: str, csv_meta: Dict[str, Any]) -> CsvDialect:
+    """Get the sniffed dialect, overwritten by what the types YAML says."""
+    fields = {field.name for field in dataclasses.fields(CsvDialect)}
+    known = {key: value for key, value in csv_meta.items() if key in fields}
+    return dataclasses.replace(sniff_dialect(csv_path), **known)
+
+
+def _profile(
+    csv_path: str,
+    dialect: CsvDialect,
+    chunksize: Optional[int],
+    nrows: Optional[int],
+    jobs: int,
+    config: AccumulatorConfig,
+) -> DatasetAccumulator:
+    if jobs > 1 and detect_compression(csv_path) is None:
+        return profile_csv_parallel(
+            csv_path,
+            jobs=jobs,
+            chunksize=chunksize,
+            dialect=dialect,
+            config=config,
+        )
+    return profile_csv_chunked(
+        csv_path,
+        chunksize=chunksize or DEFAULT_CHUNKSIZE,
+        dialect=dialect,
+        nrows=nrows,
+        config=config,
+        threads=jobs,
+    )
+
+
+def _parse_percentiles(value: str) -> List[float]:
+    """
+    Parse a comma-separated list of percentiles.
+
+    Examples
+    --------
+    >>> _parse_percentiles("1, 99,99.9")
+    [1.0, 99.0, 99.9]
+    >>> _parse_percentiles("")
+    []
+    """
+    percentiles = []
+    for part in value.split(","):
+        if part.strip() == "":
+            continue
+        try:
+            percentile = float(part)
+        except ValueError:
+            raise click.BadParameter(f"'{part.strip()}' is not a number")
+        if not 0 <= percentile <= 100:
+            raise click.BadParameter(f"{percentile} is not between 0 and 100")
+        percentiles.append(percentile)
+    return percentiles
+
+
 def _write_yaml(yaml_path: str, data) -> None:
     with open(yaml_path, "w", encoding="utf8") as outfile:
         yaml.dump(data, outfile, default_flow_style=False, allow_unicode=True)
@@ -78,7 +777,7 @@ def _read_yaml(yaml_path: str):
 def _load_dtype(data):
     dtype = {}
     for el in data["columns"]:
-        print(el)
+        logger.debug(f"Column of the types file: {el}")
         if "type" in el:
             dtype[el["name"]] = el["type"]
         elif "dtype" in el:
@@ -0,0 +1,336 @@
+"""
+Read and profile CSV files with pyarrow.
+
+The CSV is parsed with the multithreaded pyarrow.csv reader and all
+statistics are computed with pyarrow.compute on the Arrow arrays. No pandas
+object columns are created, which keeps string-heavy files small in memory.
+
+pyarrow is an optional dependency: pip install edapy[arrow]
+"""
+
+# Core Library
+from typing import Any, Dict, Optional, Sequence
+
+# Third party
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+# First party
+from edapy.csv.compression import open_csv
+from edapy.csv.describe import get_column_kind, warn_if_suspicious_category
+from edapy.csv.dialect import CsvDialect, sniff_dialect
+from edapy.csv.sketches import Histogram
+from edapy.csv.stats import (
+    EXACT_QUANTILE_MAX_ROWS,
+    MAX_VALUE_LIST,
+    QUARTILES,
+    TOP_COUNTS,
+    ColumnStats,
+    DatasetStats,
+)
+
+# One row per column, so that the profiles of many files can be concatenated
+STATS_SCHEMA = pa.schema(
+    [
+        ("nb_rows", pa.int64()),
+        ("name", pa.string()),
+        ("kind", pa.string()),
+        ("dtype", pa.string()),
+        ("non_nan", pa.int64()),
+        ("nb_null", pa.int64()),
+        ("value_count", pa.int64()),
+        ("value_list", pa.list_(pa.string())),
+        ("top_count_val", pa.int64()),
+        ("mean", pa.float64()),
+        ("std", pa.float64()),
+        ("min", pa.float64()),
+        ("q25", pa.float64()),
+        ("q50", pa.float64()),
+        ("q75", pa.float64()),
+        ("max", pa.float64()),
+        ("has_frac", pa.bool_()),
+        ("is_integral", pa.bool_()),
+        ("approximate", pa.bool_()),
+        ("percentiles", pa.map_(pa.float64(), pa.float64())),
+        ("quantiles_approximate", pa.bool_()),
+        ("top_counts", pa.list_(pa.int64())),
+        ("histogram_edges", pa.list_(pa.float64())),
+        ("histogram_counts", pa.list_(pa.int64())),
+    ]
+)
+
+
+def read_csv_arrow(
+    csv_path: str, dialect: Optional[CsvDialect] = None, nrows: Optional[int] = None
+) -> pa.Table:
+    """
+    Read a CSV file as an Arrow table.
+
+    Parameters
+    ----------
+    csv_path : str
+    dialect : Optional[CsvDialect]
+        Sniffed from the head of the file if it is not given
+    nrows : Optional[int]
+        Number of rows to read. By default, read all lines
+
+    Returns
+    -------
+    table : pa.Table
+    """
+    if dialect is None:
+        dialect = sniff_dialect(csv_path)
+    read_options = pa_csv.ReadOptions(
+        use_threads=True,
+        encoding=dialect.encoding,
+        autogenerate_column_names=not dialect.has_header,
+    )
+    parse_options = pa_csv.ParseOptions(
+        delimiter=dialect.delimiter,
+        quote_char=dialect.quotechar,
+        escape_char=dialect.escapechar or False,
+        newlines_in_values=True,
+    )
+    with open_csv(csv_path) as source:
+        if nrows is None:
+            return pa_csv.read_csv(
+                source, read_options=read_options, parse_options=parse_options
+            )
+        batches = []
+        nb_rows = 0
+        with pa_csv.open_csv(
+            source, read_options=read_options, parse_options=parse_options
+        ) as reader:
+            for batch in reader:
+                batches.append(batch.slice(0, nrows - nb_rows))
+                nb_rows += len(batches[-1])
+                if nb_rows >= nrows:
+                    break
+            return pa.Table.from_batches(batches, schema=reader.schema)
+
+
+def profile_table(
+    table: pa.Table,
+    dtype: Optional[Dict[str, Any]] = None,
+    percentiles: Sequence[float] = (),
+    exact_quantile_max_rows: int = EXACT_QUANTILE_MAX_ROWS,
+    known: Optional[DatasetStats] = None,
+) -> DatasetStats:
+    """
+    Compute the statistics of all columns of an Arrow table.
+
+    Parameters
+    ----------
+    table : pa.Table
+    dtype : Optional[Dict[str, Any]]
+        Maps column names to types
+    percentiles : Sequence[float]
+        Additional percentiles to compute, e.g. [1, 99, 99.9]
+    exact_quantile_max_rows : int
+        Above this number of rows, quantiles are estimated with pyarrow's
+        t-digest instead of being computed exactly
+    known : Optional[DatasetStats]
+        Statistics which are known already, e.g. from the footer of a
+        Parquet file. Their minimum and maximum are not computed again
+
+    Returns
+    -------
+    stats : DatasetStats
+        The same statistics edapy.csv.stats.compute_stats gives for the
+        equivalent pandas dataframe
+    """
+    if dtype is None:
+        dtype = {}
+    stats = DatasetStats(nb_rows=table.num_rows)
+    for column_name, column in zip(table.column_names, table.columns):
+        column, column_dtype = _as_pandas_would_parse(column)
+        kind = get_column_kind(column_name, column_dtype, dtype)
+        column_stats = _profile_column(
+            column_name,
+            kind,
+            column_dtype,
+            column,
+            None if known is None else known.columns.get(column_name),
+        )
+        if kind in ["int", "float"] and column_stats.non_nan > 0:
+            _add_quantiles(column_stats, column, percentiles, exact_quantile_max_rows)
+        warn_if_suspicious_category(
+            column_name,
+            column_dtype,
+            column_stats.value_list,
+            column_stats.value_count,
+            dtype,
+        )
+        stats.columns[column_name] = column_stats
+    return stats
+
+
+def stats_to_table(stats: DatasetStats) -> pa.Table:
+    """
+    Convert column statistics to an Arrow table with one row per column.
+
+    All tables have the STATS_SCHEMA. Column names and the most common
+    values are stored as strings.
+
+    Parameters
+    ----------
+    stats : DatasetStats
+
+    Returns
+    -------
+    table : pa.Table
+    """
+    rows = []
+    for column_stats in stats.columns.values():
+        row = column_stats.to_dict()
+        row["nb_rows"] = stats.nb_rows
+        row["name"] = str(row["name"])
+        row["value_list"] = [str(value) for value in row["value_list"]]
+        row["percentiles"] = list(row["percentiles"].items())
+        rows.append(row)
+    return pa.Table.from_pylist(rows, schema=STATS_SCHEMA)
+
+
+def stats_from_table(table: pa.Table) -> DatasetStats:
+    """
+    Convert a table which stats_to_table created back to column statistics.
+
+    Parameters
+    ----------
+    table : pa.Table
+
+    Returns
+    -------
+    stats : DatasetStats
+    """
+    rows = table.to_pylist()
+    stats = DatasetStats(nb_rows=rows[0]["nb_rows"] if rows else 0)
+    for row in rows:
+        del row["nb_rows"]
+        row["percentiles"] = dict(row["percentiles"])
+        column_stats = ColumnStats.from_dict(row)
+        stats.columns[column_stats.name] = column_stats
+    return stats
+
+
+def get_pandas_dtype(arrow_type: pa.DataType, has_nulls: bool) -> str:
+    """
+    Get the dtype pandas.read_csv would have inferred for an Arrow type.
+
+    Narrow numeric types, e.g. of Parquet files, are widened to the types
+    pandas.read_csv infers, so that all input formats are described alike.
+
+    Parameters
+    ----------
+    arrow_type : pa.DataType
+    has_nulls : bool
+
+    Returns
+    -------
+    dtype : str
+
+    Examples
+    --------
+    >>> get_pandas_dtype(pa.uint16(), has_nulls=True)
+    'float64'
+    >>> get_pandas_dtype(pa.int8(), has_nulls=False)
+    'int64'
+    """
+    if pa.types.is_null(arrow_type) or pa.types.is_floating(arrow_type):
+        return "float64"
+    if pa.types.is_integer(arrow_type):
+        return "float64" if has_nulls else "int64"
+    if pa.types.is_boolean(arrow_type) and not has_nulls:
+        return "bool"
+    return "object"
+
+
+def _as_pandas_would_parse(column: pa.ChunkedArray):
+    """
+    Cast a column to the type pandas.read_csv would have inferred.
+
+    Returns
+    -------
+    column, dtype : Tuple[pa.ChunkedArray, str]
+    """
+    arrow_type = column.type
+    column_dtype = get_pandas_dtype(arrow_type, column.null_count > 0)
+    if pa.types.is_temporal(arrow_type):
+        return column.cast(pa.string()), column_dtype
+    if column_dtype != "object" and column_dtype != "bool":
+        return column.cast(pa.from_numpy_dtype(np.dtype(column_dtype))), column_dtype
+    return column, column_dtype
+
+
+def _profile_column(
+    column_name: str,
+    kind: Optional[str],
+    column_dtype: str,
+    column: pa.ChunkedArray,
+    known: Optional[ColumnStats] = None,
+) -> ColumnStats:
+    value_counts = pc.value_counts(column)
+    value_counts = value_counts.filter(pc.is_valid(value_counts.field("values")))
+    order = pc.array_sort_indices(value_counts.field("counts"), order="descending")
+    top = value_counts.take(order[:MAX_VALUE_LIST])
+    counts = top.field("counts")
+    column_stats = ColumnStats(
+        name=column_name,
+        kind=kind,
+        dtype=column_dtype,
+        non_nan=len(column) - column.null_count,
+        nb_null=column.null_count,
+        value_count=len(value_counts),
+        value_list=top.field("values").to_pylist(),
+        top_count_val=counts[0].as_py() if len(counts) > 0 else None,
+        top_counts=counts[:TOP_COUNTS].to_pylist(),
+    )
+    if kind in ["int", "float"] and column_stats.non_nan > 0:
+        column_stats.mean = pc.mean(column).as_py()
+        std = pc.stddev(column, ddof=1).as_py()
+        column_stats.std = np.nan if std is None else std
+        if known is not None and _is_number(known.min) and _is_number(known.max):
+            to_dtype = np.dtype(column_dtype).type
+            column_stats.min = to_dtype(known.min).item()
+            column_stats.max = to_dtype(known.max).item()
+        else:
+            min_max = pc.min_max(column)
+            column_stats.min = min_max["min"].as_py()
+            column_stats.max = min_max["max"].as_py()
+        column_stats.has_frac = _has_frac(column)
+        column_stats.is_integral = not _has_frac(column, epsilon=0)
+        histogram = Histogram(integer=not column_stats.has_frac)
+        histogram.update(column.to_numpy())
+        column_stats.histogram_edges, column_stats.histogram_counts = (
+            histogram.trimmed()
+        )
+    return column_stats
+
+
+def _add_quantiles(
+    column_stats: ColumnStats,
+    column: pa.ChunkedArray,
+    percentiles: Sequence[float],
+    exact_quantile_max_rows: int,
+) -> None:
+    q = QUARTILES + [percentile / 100 for percentile in percentiles]
+    column_stats.quantiles_approximate = len(column) > exact_quantile_max_rows
+    if column_stats.quantiles_approximate:
+        quantiles = pc.tdigest(column, q=q).to_pylist()
+    else:
+        quantiles = pc.quantile(column, q=q).to_pylist()
+    column_stats.q25, column_stats.q50, column_stats.q75 = quantiles[:3]
+    column_stats.percentiles = dict(zip(percentiles, quantiles[3:]))
+
+
+def _is_number(value: Optional[float]) -> bool:
+    return value is not None and not np.isnan(value)
+
+
+def _has_frac(column: pa.ChunkedArray, epsilon: float = 10**-4) -> bool:
+    if pa.types.is_integer(column.type):
+        return False
+    distance = pc.abs(pc.subtract(column, pc.round(column)))
+    return bool(pc.any(pc.greater(distance, epsilon)).as_py())
@@ -0,0 +1,127 @@
+"""Cache the profiles of CSV files on disk, keyed by a fingerprint of the file."""
+
+# Core Library
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from contextlib import suppress
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".edapy", "cache")
+DEFAULT_MAX_SIZE = 512 * 1024**2
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+CACHE_VERSION = 2
+
+
+def fingerprint(path: str, block_size: int = FINGERPRINT_BLOCK_SIZE) -> str:
+    """
+    Get a fingerprint of a file which changes when the file changes.
+
+    The fingerprint consists of the absolute path, the size, the
+    modification time and a hash of the first, the middle and the last
+    block_size bytes. Reading three blocks is fast, even for huge files.
+
+    Parameters
+    ----------
+    path : str
+    block_size : int
+
+    Returns
+    -------
+    fingerprint : str
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    digest = hashlib.sha256(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}".encode())
+    with open(path, "rb") as fp:
+        for offset in sorted({0, stat.st_size // 2, stat.st_size - block_size}):
+            fp.seek(max(offset, 0))
+            digest.update(fp.read(block_size))
+    return digest.hexdigest()
+
+
+class ProfileCache:
+    """
+    Pickled profiles in a directory, evicted by least recent use.
+
+    Parameters
+    ----------
+    cache_dir : str
+    max_size : int
+        Total bytes of all entries. When a new entry exceeds it, the entries
+        which were used least recently are removed.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, path: str, options: Dict[str, Any]) -> str:
+        """
+        Get the key of the profile of a file with the given options.
+
+        Parameters
+        ----------
+        path : str
+        options : Dict[str, Any]
+            Everything which changes the profile, e.g. the number of rows
+
+        Returns
+        -------
+        key : str
+        """
+        options_str = json.dumps(options, sort_keys=True, default=str)
+        return hashlib.sha256(
+            f"{CACHE_VERSION}\0{fingerprint(path)}\0{options_str}".encode()
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached profile or None if there is no valid one."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fp:
+                value = pickle.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception as exc:  # Broken or written by an older version
+            logger.warning(f"Ignoring the cache entry '{path}': {exc}")
+            self._remove(path)
+            return None
+        # Mark the entry as recently used
+        os.utime(path)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a profile and evict old entries if the cache is too big."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fp:
+            pickle.dump(value, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".pickle"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            self._remove(path)
+            total_size -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        with suppress(FileNotFoundError):
+            os.remove(path)
@@ -0,0 +1,184 @@
+"""
+Profile Parquet, Feather and Arrow IPC files.
+
+Parquet files store the number of rows and, for each row group, the null
+count, minimum and maximum of every column in their footer. These
+statistics are read without touching the data pages. The remaining
+statistics are computed one column at a time, so only one decoded column
+is in memory, while the minimum and maximum are taken from the footer.
+Feather and Arrow IPC files are memory-mapped, so uncompressed columns are
+profiled without being copied.
+
+pyarrow is an optional dependency: pip install edapy[arrow]
+"""
+
+# Core Library
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+# Third party
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import yaml
+
+# First party
+from edapy.csv.arrow import get_pandas_dtype, profile_table
+from edapy.csv.convert import TYPES_METADATA_KEY
+from edapy.csv.describe import get_column_kind
+from edapy.csv.dialect import sniff_file_format
+from edapy.csv.stats import EXACT_QUANTILE_MAX_ROWS, ColumnStats, DatasetStats
+
+logger = logging.getLogger(__name__)
+
+
+def profile_columnar(
+    path: str,
+    dtype: Optional[Dict[str, Any]] = None,
+    percentiles: Sequence[float] = (),
+    exact_quantile_max_rows: int = EXACT_QUANTILE_MAX_ROWS,
+    metadata_only: bool = False,
+) -> DatasetStats:
+    """
+    Compute the statistics of all columns of a Parquet, Feather or IPC file.
+
+    Parameters
+    ----------
+    path : str
+    dtype : Optional[Dict[str, Any]]
+        Maps column names to types
+    percentiles : Sequence[float]
+        Additional percentiles to compute, e.g. [1, 99, 99.9]
+    exact_quantile_max_rows : int
+        Above this number of rows, quantiles are estimated
+    metadata_only : bool
+        Only read the statistics in the footer of a Parquet file. Everything
+        which is not stored there, e.g. the mean, is NaN, and the values are
+        not counted.
+
+    Returns
+    -------
+    stats : DatasetStats
+        The same statistics edapy.csv.arrow.profile_table gives
+    """
+    if sniff_file_format(path) == "feather":
+        if metadata_only:
+            raise ValueError("Only Parquet files have statistics in their metadata")
+        return profile_table(
+            feather.read_table(path, memory_map=True),
+            dtype=dtype,
+            percentiles=percentiles,
+            exact_quantile_max_rows=exact_quantile_max_rows,
+        )
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    stats = read_parquet_statistics(parquet_file, dtype)
+    if metadata_only:
+        return stats
+    for column_name in stats.columns:
+        stats.columns[column_name] = profile_table(
+            parquet_file.read(columns=[column_name]),
+            dtype=dtype,
+            percentiles=percentiles,
+            exact_quantile_max_rows=exact_quantile_max_rows,
+            known=stats,
+        ).columns[column_name]
+    return stats
+
+
+def read_parquet_statistics(
+    parquet_file: pq.ParquetFile, dtype: Optional[Dict[str, Any]] = None
+) -> DatasetStats:
+    """
+    Get the statistics which are stored in the footer of a Parquet file.
+
+    Parameters
+    ----------
+    parquet_file : pq.ParquetFile
+    dtype : Optional[Dict[str, Any]]
+        Maps column names to types
+
+    Returns
+    -------
+    stats : DatasetStats
+        The number of rows and, for each column, the null count. Numeric
+        columns also get their minimum and maximum.
+    """
+    if dtype is None:
+        dtype = {}
+    metadata = parquet_file.metadata
+    stats = DatasetStats(nb_rows=metadata.num_rows)
+    leaf_index = {
+        metadata.schema.column(i).path: i for i in range(metadata.num_columns)
+    }
+    for schema_field in parquet_file.schema_arrow:
+        row_group_stats = [
+            metadata.row_group(i).column(leaf_index[schema_field.name]).statistics
+            for i in range(metadata.num_row_groups)
+        ]
+        if any(
+            statistics is None or not statistics.has_null_count
+            for statistics in row_group_stats
+        ):
+            logger.warning(f"Column '{schema_field.name}' has no statistics")
+            row_group_stats = []
+        nb_null = sum(statistics.null_count for statistics in row_group_stats)
+        column_dtype = get_pandas_dtype(schema_field.type, nb_null > 0)
+        kind = get_column_kind(schema_field.name, column_dtype, dtype)
+        column_stats = ColumnStats(
+            name=schema_field.name,
+            kind=kind,
+            dtype=column_dtype,
+            non_nan=metadata.num_rows - nb_null,
+            nb_null=nb_null,
+        )
+        if pa.types.is_integer(schema_field.type):
+            column_stats.has_frac = False
+            column_stats.is_integral = True
+        if kind in ["int", "float"]:
+            _add_min_max(column_stats, row_group_stats)
+        stats.columns[schema_field.name] = column_stats
+    return stats
+
+
+def read_embedded_types(path: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Get the column types which edapy csv convert stored in a file.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    columns : Optional[List[Dict[str, Any]]]
+        None if the file was not written by edapy csv convert
+    """
+    if sniff_file_format(path) == "parquet":
+        schema = pq.read_schema(path, memory_map=True)
+    else:
+        try:
+            with pa.memory_map(path) as source:
+                schema = pa.ipc.open_file(source).schema
+        except pa.ArrowInvalid:  # Feather version 1
+            return None
+    metadata = schema.metadata or {}
+    if TYPES_METADATA_KEY not in metadata:
+        return None
+    return yaml.safe_load(metadata[TYPES_METADATA_KEY])["columns"]
+
+
+def _add_min_max(column_stats: ColumnStats, row_group_stats: List[Any]) -> None:
+    """Add the min/max and mark everything the metadata lacks as unknown."""
+    column_stats.mean = column_stats.std = np.nan
+    column_stats.q25 = column_stats.q50 = column_stats.q75 = np.nan
+    with_values = [
+        statistics for statistics in row_group_stats if statistics.num_values > 0
+    ]
+    if len(with_values) == 0 or not all(
+        statistics.has_min_max for statistics in with_values
+    ):
+        column_stats.min = column_stats.max = np.nan
+        return
+    column_stats.min = min(statistics.min for statistics in with_values)
+    column_stats.max = max(statistics.max for statistics in with_values)
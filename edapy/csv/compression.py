@@ -0,0 +1,354 @@
+"""
+Read compressed CSV files with a single streaming decompression.
+
+gzip, bz2, xz and zstd files are recognized by their magic bytes. Files
+which consist of independent parts whose compressed size can be read
+without decompressing them are decompressed by a pool of threads, while
+the parser consumes the output in order:
+
+* bgzip (BGZF) files, whose gzip members store their size in a header field
+* zstd files with multiple small frames, e.g. written by pzstd
+
+Other files are decompressed by a single stream.
+
+zlib and zstd release the GIL, so the threads decompress in parallel.
+zstd needs the zstandard package or pyarrow.
+"""
+
+# Core Library
+import bz2
+import contextlib
+import gzip
+import importlib.util
+import io
+import lzma
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Deque, Iterator, Optional, Union, cast
+
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+ZSTD_MAGIC = 0xFD2FB528
+# Frames with a magic number in this range carry metadata, e.g. pzstd's
+# index of frame sizes, and are skipped
+ZSTD_SKIPPABLE_MAGIC = 0x184D2A50
+# Consecutive members or frames are decompressed together, so that each
+# task is big enough to outweigh its overhead
+TASK_SIZE = 4 * 1024**2
+# zstd files with bigger frames are decompressed by a single stream, as each
+# frame is decompressed at once
+MAX_FRAME_SIZE = TASK_SIZE
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    Get the compression of a file from its first bytes.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    compression : Optional[str]
+        'gzip', 'bz2', 'xz', 'zstd' or None if the file is not compressed
+    """
+    with open(path, "rb") as fp:
+        head = fp.read(max(len(magic) for magic in COMPRESSION_MAGIC))
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+@contextlib.contextmanager
+def open_csv(csv_path: str, threads: int = 1) -> Iterator[Union[str, BinaryIO]]:
+    """
+    Open a CSV file for pd.read_csv, decompressing it if it is compressed.
+
+    Parameters
+    ----------
+    csv_path : str
+    threads : int
+        Number of threads which decompress the file, if its format allows it
+
+    Yields
+    ------
+    source : Union[str, BinaryIO]
+        The path of an uncompressed file or a stream of decompressed bytes
+    """
+    compression = detect_compression(csv_path)
+    if compression is None:
+        yield csv_path
+        return
+    with open_decompressed(csv_path, compression, threads) as fp:
+        yield fp
+
+
+def open_decompressed(
+    path: str, compression: Optional[str] = None, threads: int = 1
+) -> BinaryIO:
+    """
+    Open a stream of the decompressed bytes of a file.
+
+    Parameters
+    ----------
+    path : str
+    compression : Optional[str]
+        Detected from the first bytes of the file if it is not given
+    threads : int
+        Number of threads which decompress BGZF files and zstd files
+
+    Returns
+    -------
+    fp : BinaryIO
+    """
+    if compression is None:
+        compression = detect_compression(path)
+    if compression is None:
+        return open(path, "rb")
+    if compression == "gzip":
+        if not _is_bgzf(path):
+            return cast(BinaryIO, gzip.open(path, "rb"))
+        return cast(
+            BinaryIO, _ParallelReader(path, _split_bgzf, _decompress_gzip, threads)
+        )
+    if compression == "zstd":
+        with open(path, "rb") as fp:
+            while _skip_zstd_frame(fp) is False:
+                pass
+            if fp.tell() > MAX_FRAME_SIZE:
+                return _open_zstd_stream(path)
+        return cast(
+            BinaryIO, _ParallelReader(path, _split_zstd, _decompress_zstd, threads)
+        )
+    if compression == "bz2":
+        return cast(BinaryIO, bz2.open(path, "rb"))
+    return cast(BinaryIO, lzma.open(path, "rb"))
+
+
+class _ParallelReader(io.BufferedIOBase):
+    """
+    Decompress independent parts of a file in threads and read them in order.
+
+    At most 2 * threads parts are decompressed ahead of the reader, which
+    bounds the memory. Nothing is decompressed before the first read, and
+    the first part is decompressed on its own, so that reading the head of
+    a file is cheap.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        split: Callable[[BinaryIO], Iterator[bytes]],
+        decompress: Callable[[bytes], bytes],
+        threads: int,
+    ):
+        self._fp = open(path, "rb")
+        self._tasks = _group(split(self._fp), TASK_SIZE)
+        self._decompress = decompress
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        self._pending: Deque[Future] = deque()
+        self._max_pending = 2 * threads
+        self._buffer = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if size is None or size < 0:
+            parts = [bytes(self._buffer)]
+            self._buffer = memoryview(b"")
+            while self._next_part():
+                parts.append(bytes(self._buffer))
+                self._buffer = memoryview(b"")
+            return b"".join(parts)
+        while len(self._buffer) == 0:
+            if not self._next_part():
+                return b""
+        data = bytes(self._buffer[:size])
+        self._buffer = self._buffer[size:]
+        return data
+
+    def read1(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        memoryview(buffer)[: len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            # shutdown(cancel_futures=True) needs Python 3.9
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self._executor.shutdown(wait=True)
+            self._fp.close()
+        super().close()
+
+    def _fill(self) -> None:
+        while len(self._pending) < self._max_pending:
+            task = next(self._tasks, None)
+            if task is None:
+                return
+            self._pending.append(self._executor.submit(self._decompress, task))
+
+    def _next_part(self) -> bool:
+        self._fill()
+        if not self._pending:
+            return False
+        self._buffer = memoryview(self._pending.popleft().result())
+        self._fill()
+        return True
+
+
+def _group(parts: Iterator[bytes], size: int) -> Iterator[bytes]:
+    """Concatenate consecutive parts, except the first, to size bytes."""
+    first = next(parts, None)
+    if first is None:
+        return
+    yield first
+    group = []
+    group_size = 0
+    for part in parts:
+        group.append(part)
+        group_size += len(part)
+        if group_size >= size:
+            yield b"".join(group)
+            group, group_size = [], 0
+    if group:
+        yield b"".join(group)
+
+
+def _is_bgzf(path: str) -> bool:
+    with open(path, "rb") as fp:
+        return _read_bgzf_size(fp.read(18 + 256)) is not None
+
+
+def _read_bgzf_size(header: bytes) -> Optional[int]:
+    """Get the size of a BGZF member from its header, None if it is no BGZF."""
+    if len(header) < 12 or header[:4] != b"\x1f\x8b\x08\x04":
+        return None
+    (extra_length,) = struct.unpack_from("<H", header, 10)
+    pos = 12
+    while pos + 4 <= min(12 + extra_length, len(header)):
+        (subfield_length,) = struct.unpack_from("<H", header, pos + 2)
+        if header[pos : pos + 2] == b"BC" and subfield_length == 2:
+            return struct.unpack_from("<H", header, pos + 4)[0] + 1
+        pos += 4 + subfield_length
+    return None
+
+
+def _split_bgzf(fp: BinaryIO) -> Iterator[bytes]:
+    while True:
+        header = fp.read(18)
+        if not header:
+            return
+        size = _read_bgzf_size(header)
+        if size is None:
+            raise ValueError("The gzip file mixes BGZF and other members")
+        yield header + fp.read(size - len(header))
+
+
+def _decompress_gzip(data: bytes) -> bytes:
+    parts = []
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        parts.append(decompressor.decompress(data))
+        data = decompressor.unused_data
+    return b"".join(parts)
+
+
+def _split_zstd(fp: BinaryIO) -> Iterator[bytes]:
+    """Split a zstd file into frames by reading their headers and block sizes."""
+    while True:
+        start = fp.tell()
+        is_data_frame = _skip_zstd_frame(fp)
+        if is_data_frame is None:
+            return
+        if is_data_frame:
+            end = fp.tell()
+            fp.seek(start)
+            yield fp.read(end - start)
+
+
+def _skip_zstd_frame(fp: BinaryIO) -> Optional[bool]:
+    """
+    Move to the end of the next frame without decompressing it.
+
+    Returns
+    -------
+    is_data_frame : Optional[bool]
+        False for skippable frames and None at the end of the file
+    """
+    head = fp.read(4)
+    if not head:
+        return None
+    (magic,) = struct.unpack("<I", head)
+    if magic & 0xFFFFFFF0 == ZSTD_SKIPPABLE_MAGIC:
+        (size,) = struct.unpack("<I", fp.read(4))
+        fp.seek(size, io.SEEK_CUR)
+        return False
+    if magic != ZSTD_MAGIC:
+        raise ValueError("Invalid zstd frame")
+    flags = fp.read(1)[0]
+    single_segment = bool(flags & 0x20)
+    content_size_length = [int(single_segment), 2, 4, 8][flags >> 6]
+    header_length = (
+        int(not single_segment) + [0, 1, 2, 4][flags & 0x03] + content_size_length
+    )
+    fp.seek(header_length, io.SEEK_CUR)
+    is_last = False
+    while not is_last:
+        block_header = fp.read(3)
+        if len(block_header) < 3:
+            raise ValueError("Truncated zstd frame")
+        value = int.from_bytes(block_header, "little")
+        is_last = bool(value & 1)
+        block_type = (value >> 1) & 0x03
+        fp.seek(1 if block_type == 1 else value >> 3, io.SEEK_CUR)
+    if flags & 0x04:
+        fp.seek(4, io.SEEK_CUR)
+    return True
+
+
+def _open_zstd_stream(path: str) -> BinaryIO:
+    if importlib.util.find_spec("zstandard") is not None:
+        # Third party
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True
+        )
+    if importlib.util.find_spec("pyarrow") is not None:
+        # Third party
+        import pyarrow as pa
+
+        return pa.input_stream(path, compression="zstd")
+    raise ImportError("Reading zstd files needs zstandard: pip install edapy[zstd]")
+
+
+def _decompress_zstd(data: bytes) -> bytes:
+    if importlib.util.find_spec("zstandard") is not None:
+        # Third party
+        import zstandard
+
+        with zstandard.ZstdDecompressor().stream_reader(
+            data, read_across_frames=True
+        ) as reader:
+            return reader.read()
+    if importlib.util.find_spec("pyarrow") is not None:
+        # Third party
+        import pyarrow as pa
+
+        with pa.input_stream(pa.py_buffer(data), compression="zstd") as stream:
+            return stream.read()
+    raise ImportError("Reading zstd files needs zstandard: pip install edapy[zstd]")
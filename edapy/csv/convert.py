@@ -0,0 +1,155 @@
+"""
+Convert CSV files to Parquet or Feather with the dtypes of the types YAML.
+
+The CSV is loaded chunk by chunk with edapy.csv.loader.load_csv, so the
+narrowed dtypes are used and at most one chunk is in memory. Each chunk
+becomes a row group of the Parquet file or a record batch of the Feather
+file.
+
+pyarrow is an optional dependency: pip install edapy[arrow]
+"""
+
+# Core Library
+import os
+from typing import Any, Dict, Optional
+
+# Third party
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yaml
+
+# First party
+from edapy.csv.loader import load_csv
+from edapy.csv.sharding import DEFAULT_CHUNKSIZE
+
+FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+DEFAULT_COMPRESSION = {"parquet": "snappy", "feather": "lz4"}
+# The content of the types YAML is stored in the schema metadata
+TYPES_METADATA_KEY = b"edapy.types"
+
+
+def convert_csv(
+    csv_path: str,
+    yaml_path: str,
+    output_path: str,
+    output_format: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    compression: Optional[str] = None,
+) -> int:
+    """
+    Convert a CSV file to Parquet or Feather.
+
+    Parquet files get min/max/null count statistics for each row group and
+    dictionary encoding for categories. In Feather files, categories are
+    only stored as dictionaries if the types YAML lists them, as every
+    record batch of a Feather file has to use the same dictionary.
+
+    Parameters
+    ----------
+    csv_path : str
+    yaml_path : str
+        The types YAML which edapy csv predict generated
+    output_path : str
+    output_format : Optional[str]
+        'parquet' or 'feather'. By default, it is derived from the file
+        extension of output_path
+    chunksize : int
+        Number of rows which are converted at once. This is the size of
+        the row groups or record batches
+    compression : Optional[str]
+        e.g. 'zstd'. By default, snappy for Parquet and lz4 for Feather
+
+    Returns
+    -------
+    nb_rows : int
+    """
+    if output_format is None:
+        output_format = get_output_format(output_path)
+    if compression is None:
+        compression = DEFAULT_COMPRESSION[output_format]
+    with open(yaml_path) as stream:
+        types_yaml = stream.read()
+    columns = {col["name"]: col for col in yaml.safe_load(types_yaml)["columns"]}
+    writer: Any = None
+    schema = None
+    nb_rows = 0
+    try:
+        for chunk in load_csv(csv_path, yaml_path, chunksize=chunksize):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = _get_schema(table.schema, columns, output_format)
+                schema = schema.with_metadata(
+                    {**schema.metadata, TYPES_METADATA_KEY: types_yaml.encode()}
+                )
+                writer = _open_writer(output_path, schema, output_format, compression)
+            writer.write_table(table.cast(schema))
+            nb_rows += len(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return nb_rows
+
+
+def get_output_format(output_path: str) -> str:
+    """
+    Get the output format from the file extension.
+
+    Examples
+    --------
+    >>> get_output_format("titanic.parquet")
+    'parquet'
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(
+            f"Can not derive the format from '{extension}', "
+            f"use one of {sorted(FORMATS)}"
+        )
+    return FORMATS[extension]
+
+
+def _get_schema(
+    schema: pa.Schema, columns: Dict[str, Dict[str, Any]], output_format: str
+) -> pa.Schema:
+    """
+    Get a schema which every chunk can be cast to.
+
+    The dictionaries of categories without declared categories differ
+    between chunks, and so might the type of their indices. Columns which
+    are empty in the first chunk have the null type.
+    """
+    for i, schema_field in enumerate(schema):
+        arrow_type = schema_field.type
+        if pa.types.is_dictionary(arrow_type):
+            declared = "categories" in columns.get(schema_field.name, {})
+            if output_format == "parquet" or declared:
+                arrow_type = pa.dictionary(pa.int32(), arrow_type.value_type)
+            else:
+                arrow_type = arrow_type.value_type
+        elif pa.types.is_null(arrow_type):
+            arrow_type = pa.string()
+        schema = schema.set(i, schema_field.with_type(arrow_type))
+    return schema
+
+
+def _open_writer(
+    output_path: str, schema: pa.Schema, output_format: str, compression: str
+) -> Any:
+    if output_format == "parquet":
+        return pq.ParquetWriter(
+            output_path,
+            schema,
+            compression=compression,
+            use_dictionary=True,
+            write_statistics=True,
+        )
+    # Feather version 2 is the Arrow IPC file format
+    return pa.ipc.new_file(
+        output_path, schema, options=pa.ipc.IpcWriteOptions(compression=compression)
+    )
@@ -0,0 +1,458 @@
+"""
+Correlations of numeric columns and associations of category columns.
+
+All statistics are accumulated chunk by chunk and can be merged, e.g. the
+accumulators of the shards of edapy.csv.sharding:
+
+* Pearson correlations come from co-moments of all pairs of numeric
+  columns. They are updated in blocks of columns, so a chunk never needs
+  more than a block x block matrix besides the accumulated sums.
+* Spearman correlations are computed from a bounded sample of the rows.
+  Each row gets a random key, and the rows with the smallest keys are
+  kept, which is a uniform sample of all rows no matter how the file was
+  split. Files with at most sample_size rows get exact correlations.
+* Cramér's V comes from the contingency tables of all pairs of category
+  columns. Columns with more than max_categories values are left out.
+
+Missing values are left out pairwise.
+"""
+
+# Core Library
+import itertools
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Third party
+import numpy as np
+import pandas as pd
+
+DEFAULT_BLOCK_SIZE = 64
+SPEARMAN_SAMPLE_SIZE = 10000
+MAX_CATEGORIES = 100
+MAX_REPORTED_PAIRS = 20
+CORRELATION_METHODS = ["pearson", "spearman", "cramers_v"]
+
+
+class CoMoments:
+    """
+    Mergeable sums which give the Pearson correlations of all column pairs.
+
+    For each pair of columns (i, j), the number of rows where both are
+    known, the sums of column i and of its squares over these rows and the
+    sum of the products are kept. Values are shifted by the mean of the
+    first chunk to avoid cancellation.
+
+    Parameters
+    ----------
+    columns : List[str]
+    block_size : int
+        Number of columns whose products are computed at once
+    """
+
+    def __init__(self, columns: List[str], block_size: int = DEFAULT_BLOCK_SIZE):
+        self.columns = list(columns)
+        self.block_size = block_size
+        size = len(self.columns)
+        self.shift: Optional[np.ndarray] = None
+        self.counts = np.zeros((size, size))
+        self.sums = np.zeros((size, size))
+        self.squares = np.zeros((size, size))
+        self.products = np.zeros((size, size))
+
+    def update(self, values: np.ndarray) -> None:
+        """Add rows of values, one column per column of the accumulator."""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        known = ~np.isnan(values)
+        if self.shift is None:
+            with np.errstate(all="ignore"):
+                self.shift = np.nan_to_num(
+                    np.nansum(values, axis=0) / known.sum(axis=0)
+                )
+        shifted = np.where(known, values - self.shift, 0.0)
+        mask = known.astype(np.float64)
+        is_complete = known.all(axis=0)
+        sums = shifted.sum(axis=0)
+        squares = (shifted**2).sum(axis=0)
+        for start_i, start_j in self._blocks():
+            i = slice(start_i, start_i + self.block_size)
+            j = slice(start_j, start_j + self.block_size)
+            self.products[i, j] += shifted[:, i].T @ shifted[:, j]
+            if start_i != start_j:
+                self.products[j, i] = self.products[i, j].T
+            if is_complete[i].all() and is_complete[j].all():
+                # Without missing values, the pairwise sums are the column sums
+                self.counts[i, j] += len(values)
+                self.sums[i, j] += sums[i, None]
+                self.squares[i, j] += squares[i, None]
+                if start_i != start_j:
+                    self.counts[j, i] += len(values)
+                    self.sums[j, i] += sums[j, None]
+                    self.squares[j, i] += squares[j, None]
+                continue
+            self.counts[i, j] += mask[:, i].T @ mask[:, j]
+            self.sums[i, j] += shifted[:, i].T @ mask[:, j]
+            self.squares[i, j] += (shifted[:, i] ** 2).T @ mask[:, j]
+            if start_i != start_j:
+                self.counts[j, i] = self.counts[i, j].T
+                self.sums[j, i] += shifted[:, j].T @ mask[:, i]
+                self.squares[j, i] += (shifted[:, j] ** 2).T @ mask[:, i]
+
+    def merge(self, other: "CoMoments") -> None:
+        """Merge the sums of other rows of the same columns."""
+        if other.shift is None:
+            return
+        if self.shift is None:
+            self.shift = other.shift
+        # Shift the sums of the other accumulator to the shift of this one
+        delta = other.shift - self.shift
+        sums = other.sums + delta[:, None] * other.counts
+        self.squares += (
+            other.squares
+            + 2 * delta[:, None] * other.sums
+            + delta[:, None] ** 2 * other.counts
+        )
+        self.products += (
+            other.products
+            + delta[None, :] * other.sums
+            + delta[:, None] * other.sums.T
+            + np.outer(delta, delta) * other.counts
+        )
+        self.sums += sums
+        self.counts += other.counts
+
+    def subset(self, columns: Sequence[str]) -> "CoMoments":
+        """Get the sums of some of the columns."""
+        index = [self.columns.index(column) for column in columns]
+        result = CoMoments(list(columns), self.block_size)
+        result.shift = None if self.shift is None else self.shift[index]
+        for name in ["counts", "sums", "squares", "products"]:
+            setattr(result, name, getattr(self, name)[np.ix_(index, index)])
+        return result
+
+    def correlation(self) -> pd.DataFrame:
+        """Get the Pearson correlations, NaN for pairs without variance."""
+        with np.errstate(all="ignore"):
+            mean_i = self.sums / self.counts
+            mean_j = mean_i.T
+            covariance = self.products / self.counts - mean_i * mean_j
+            variance_i = self.squares / self.counts - mean_i**2
+            variance_j = variance_i.T
+            correlation = covariance / np.sqrt(variance_i * variance_j)
+        correlation = np.clip(correlation, -1, 1)
+        correlation[np.abs(variance_i * variance_j) < 1e-300] = np.nan
+        np.fill_diagonal(correlation, np.where(np.diag(variance_i) > 0, 1.0, np.nan))
+        return pd.DataFrame(correlation, index=self.columns, columns=self.columns)
+
+    def _blocks(self) -> List[Tuple[int, int]]:
+        starts = range(0, len(self.columns), self.block_size)
+        return [(i, j) for i in starts for j in starts if j >= i]
+
+
+class RowSample:
+    """
+    Uniform sample of at most `size` rows which can be merged.
+
+    Every row gets a random key. The rows with the smallest keys are kept,
+    so merging two samples gives a sample of the union. The generator is
+    seeded with a hash of each chunk, so results can be reproduced.
+
+    Parameters
+    ----------
+    size : int
+    """
+
+    def __init__(self, size: int = SPEARMAN_SAMPLE_SIZE):
+        self.size = size
+        self.keys = np.empty(0)
+        self.rows: Optional[pd.DataFrame] = None
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Add a chunk of rows."""
+        if len(df) == 0:
+            return
+        # Chunks of different shards have to get different keys
+        hashes = pd.util.hash_pandas_object(df.iloc[[0, -1]], index=False)
+        seed = [len(df)] + hashes.tolist()
+        keys = np.random.default_rng(seed).random(len(df))
+        self._add(keys, df)
+
+    def merge(self, other: "RowSample") -> None:
+        """Merge the sample of other rows."""
+        if other.rows is not None:
+            self._add(other.keys, other.rows)
+
+    def _add(self, keys: np.ndarray, rows: pd.DataFrame) -> None:
+        keys, rows = self._smallest(keys, rows)
+        if self.rows is not None:
+            keys = np.concatenate([self.keys, keys])
+            rows = pd.concat([self.rows, rows], ignore_index=True, join="inner")
+        self.keys, self.rows = self._smallest(keys, rows)
+
+    def _smallest(
+        self, keys: np.ndarray, rows: pd.DataFrame
+    ) -> Tuple[np.ndarray, pd.DataFrame]:
+        if len(keys) > self.size:
+            keep = np.sort(np.argpartition(keys, self.size)[: self.size])
+            keys, rows = keys[keep], rows.iloc[keep]
+        return keys, rows.reset_index(drop=True)
+
+
+class ContingencyTables:
+    """
+    Mergeable counts of the value pairs of all pairs of category columns.
+
+    Parameters
+    ----------
+    columns : List[str]
+    max_categories : int
+        Columns with more different values are dropped
+    """
+
+    def __init__(self, columns: List[str], max_categories: int = MAX_CATEGORIES):
+        self.columns = list(columns)
+        self.max_categories = max_categories
+        self.tables: Dict[Tuple[str, str], pd.Series] = {}
+        self.values: Dict[str, set] = {column: set() for column in self.columns}
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Add a chunk of rows. It has to contain all columns."""
+        for column in self.columns:
+            self.values[column].update(df[column].dropna().unique())
+        self._drop_large()
+        for column_a, column_b in itertools.combinations(self.columns, 2):
+            counts = df.groupby([column_a, column_b], sort=False, observed=True).size()
+            self._add(column_a, column_b, counts)
+
+    def merge(self, other: "ContingencyTables") -> None:
+        """Merge the tables of other rows."""
+        self.columns = [column for column in self.columns if column in other.columns]
+        for column in self.columns:
+            self.values[column].update(other.values[column])
+        self._drop_large()
+        for (column_a, column_b), counts in other.tables.items():
+            if column_a in self.columns and column_b in self.columns:
+                self._add(column_a, column_b, counts)
+
+    def cramers_v(self) -> pd.DataFrame:
+        """Get Cramér's V of all pairs of columns."""
+        result = pd.DataFrame(np.nan, index=self.columns, columns=self.columns)
+        for column in self.columns:
+            result.loc[column, column] = 1.0 if len(self.values[column]) > 1 else np.nan
+        for (column_a, column_b), counts in self.tables.items():
+            value = _cramers_v(counts.unstack(fill_value=0).to_numpy())
+            result.loc[column_a, column_b] = result.loc[column_b, column_a] = value
+        return result
+
+    def _add(self, column_a: str, column_b: str, counts: pd.Series) -> None:
+        key = (column_a, column_b)
+        if key in self.tables:
+            counts = self.tables[key].add(counts, fill_value=0)
+        self.tables[key] = counts
+
+    def _drop_large(self) -> None:
+        large = {
+            column
+            for column in self.columns
+            if len(self.values[column]) > self.max_categories
+        }
+        if not large:
+            return
+        self.columns = [column for column in self.columns if column not in large]
+        for column in large:
+            self.values[column] = set()
+        self.tables = {
+            key: counts
+            for key, counts in self.tables.items()
+            if not large.intersection(key)
+        }
+
+
+class CorrelationAccumulator:
+    """
+    Mergeable correlations of numeric columns and associations of categories.
+
+    The numeric and category columns are fixed by the first chunk. Columns
+    whose kind changes in a later chunk are left out.
+
+    Parameters
+    ----------
+    block_size : int
+        Number of columns whose co-moments are computed at once
+    sample_size : int
+        Number of rows from which Spearman correlations are computed
+    max_categories : int
+        Category columns with more values get no Cramér's V
+    """
+
+    def __init__(
+        self,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        sample_size: int = SPEARMAN_SAMPLE_SIZE,
+        max_categories: int = MAX_CATEGORIES,
+    ):
+        self.block_size = block_size
+        self.max_categories = max_categories
+        self.co_moments: Optional[CoMoments] = None
+        self.sample = RowSample(sample_size)
+        self.contingency: Optional[ContingencyTables] = None
+
+    def update(
+        self,
+        df: pd.DataFrame,
+        numeric_columns: Sequence[str],
+        category_columns: Sequence[str],
+    ) -> None:
+        """
+        Add a chunk of rows.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+        numeric_columns : Sequence[str]
+            Columns of the kinds 'int' and 'float'
+        category_columns : Sequence[str]
+            Columns of the kinds 'category' and 'other'
+        """
+        if self.co_moments is None or self.contingency is None:
+            self.co_moments = CoMoments(list(numeric_columns), self.block_size)
+            self.contingency = ContingencyTables(
+                list(category_columns), self.max_categories
+            )
+        self._keep(numeric_columns, category_columns)
+        numeric = df[self.co_moments.columns].astype(np.float64)
+        self.co_moments.update(numeric.to_numpy())
+        self.sample.update(numeric)
+        self.contingency.update(df[self.contingency.columns])
+
+    def merge(self, other: "CorrelationAccumulator") -> None:
+        """Merge the accumulator of other rows of the same file."""
+        if other.co_moments is None or other.contingency is None:
+            return
+        if self.co_moments is None or self.contingency is None:
+            self.co_moments = CoMoments(other.co_moments.columns, self.block_size)
+            self.contingency = ContingencyTables(
+                other.contingency.columns, self.max_categories
+            )
+        self._keep(other.co_moments.columns, other.contingency.columns)
+        other_co_moments = other.co_moments.subset(self.co_moments.columns)
+        self.co_moments.merge(other_co_moments)
+        self.sample.merge(other.sample)
+        self.contingency.merge(other.contingency)
+
+    def to_correlations(self) -> Dict[str, pd.DataFrame]:
+        """
+        Get the correlation matrices.
+
+        Returns
+        -------
+        correlations : Dict[str, pd.DataFrame]
+            Maps 'pearson', 'spearman' and 'cramers_v' to symmetric matrices
+        """
+        if self.co_moments is None or self.contingency is None:
+            return {method: pd.DataFrame() for method in CORRELATION_METHODS}
+        spearman = pd.DataFrame(
+            index=self.co_moments.columns, columns=self.co_moments.columns
+        )
+        if self.sample.rows is not None:
+            ranks = CoMoments(self.co_moments.columns, self.block_size)
+            ranks.update(self.sample.rows[self.co_moments.columns].rank().to_numpy())
+            spearman = ranks.correlation()
+        return {
+            "pearson": self.co_moments.correlation(),
+            "spearman": spearman,
+            "cramers_v": self.contingency.cramers_v(),
+        }
+
+    def _keep(
+        self, numeric_columns: Sequence[str], category_columns: Sequence[str]
+    ) -> None:
+        """Leave out columns which are not of the same kind anymore."""
+        assert self.co_moments is not None and self.contingency is not None
+        numeric = [col for col in self.co_moments.columns if col in numeric_columns]
+        if numeric != self.co_moments.columns:
+            self.co_moments = self.co_moments.subset(numeric)
+        self.contingency.columns = [
+            column for column in self.contingency.columns if column in category_columns
+        ]
+        self.contingency.tables = {
+            key: counts
+            for key, counts in self.contingency.tables.items()
+            if set(key) <= set(self.contingency.columns)
+        }
+
+
+def compute_correlations(
+    df: pd.DataFrame, column_info: Dict[str, List]
+) -> Dict[str, pd.DataFrame]:
+    """
+    Compute the correlations of the columns of a dataframe.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    column_info : Dict[str, List]
+        Maps column kinds to column names, as generated by
+        edapy.csv.describe._generate_column_info
+
+    Returns
+    -------
+    correlations : Dict[str, pd.DataFrame]
+        Maps 'pearson', 'spearman' and 'cramers_v' to symmetric matrices
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({"a": [1, 2, 3, 4], "b": [1, 4, 9, 16]})
+    >>> correlations = compute_correlations(df, {"int": ["a", "b"]})
+    >>> correlations["spearman"].loc["a", "b"]
+    1.0
+    """
+    accumulator = CorrelationAccumulator()
+    accumulator.update(
+        df,
+        column_info.get("int", []) + column_info.get("float", []),
+        column_info.get("category", []) + column_info.get("other", []),
+    )
+    return accumulator.to_correlations()
+
+
+def get_strongest_pairs(
+    matrix: pd.DataFrame, max_pairs: int = MAX_REPORTED_PAIRS
+) -> List[Tuple[str, str, float]]:
+    """
+    Get the pairs of different columns with the highest absolute values.
+
+    Parameters
+    ----------
+    matrix : pd.DataFrame
+        A symmetric correlation matrix
+    max_pairs : int
+
+    Returns
+    -------
+    pairs : List[Tuple[str, str, float]]
+    """
+    pairs = [
+        (column_a, column_b, float(matrix.at[column_a, column_b]))
+        for column_a, column_b in itertools.combinations(matrix.columns, 2)
+        if not np.isnan(matrix.at[column_a, column_b])
+    ]
+    pairs.sort(key=lambda pair: -abs(pair[2]))
+    return pairs[:max_pairs]
+
+
+def _cramers_v(table: np.ndarray) -> float:
+    """
+    Get Cramér's V of a contingency table.
+
+    Examples
+    --------
+    >>> _cramers_v(np.array([[10, 0], [0, 10]]))
+    1.0
+    """
+    total = table.sum()
+    if total == 0 or min(table.shape) < 2:
+        return np.nan
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / total
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    return float(np.sqrt(chi2 / total / (min(table.shape) - 1)))
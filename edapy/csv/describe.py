@@ -1,17 +1,41 @@
 """Describe a CSV."""
 
 # Core Library
+import json
 import logging
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 # Third party
 import pandas as pd
+import yaml
+
+# First party
+from edapy.csv.correlations import compute_correlations, get_strongest_pairs
+from edapy.csv.dtypes import project_memory
+from edapy.csv.sketches import sketch_value_counts
+from edapy.csv.stats import (
+    EXACT_QUANTILE_MAX_ROWS,
+    TOP_COUNTS,
+    ColumnStats,
+    DatasetStats,
+    compute_stats,
+)
 
 logger = logging.getLogger(__name__)
 
+FLOAT_TYPES = ["float64"]
+INTEGER_TYPES = ["int64", "uint8"]
+TIME_TYPES = ["datetime64[ns]"]
+OTHER_TYPES = ["object", "category"]
+OUTPUT_FORMATS = ["text", "json", "yaml", "arrow"]
+
 
 def describe_pandas_df(
-    df: pd.DataFrame, dtype: Dict[str, Any] = None
+    df: pd.DataFrame,
+    dtype: Dict[str, Any] = None,
+    sketch_error: Optional[float] = None,
+    percentiles: Sequence[float] = (),
+    exact_quantile_max_rows: int = EXACT_QUANTILE_MAX_ROWS,
 ) -> Dict[str, Any]:
     """
     Show basic information about a pandas dataframe.
@@ -21,123 +45,340 @@ def describe_pandas_df(
     df : pd.DataFrame
     dtype : Dict[str, Any]
         Maps column names to types
+    sketch_error : Optional[float]
+        If given, the number of unique values and the most common values
+        are estimated with sketches of this relative error instead of being
+        counted exactly.
+    percentiles : Sequence[float]
+        Additional percentiles to show for numeric columns, e.g. [1, 99, 99.9]
+    exact_quantile_max_rows : int
+        Above this number of rows, quantiles are estimated with a sketch
 
     Returns
     -------
     column_types : Dict[str, Any]
         Maps column names to type names
     """
+    return describe_stats(
+        profile_pandas_df(df, dtype, sketch_error, percentiles, exact_quantile_max_rows)
+    )
+
+
+def profile_pandas_df(
+    df: pd.DataFrame,
+    dtype: Optional[Dict[str, Any]] = None,
+    sketch_error: Optional[float] = None,
+    percentiles: Sequence[float] = (),
+    exact_quantile_max_rows: int = EXACT_QUANTILE_MAX_ROWS,
+    correlations: bool = False,
+) -> DatasetStats:
+    """
+    Compute the statistics which describe_pandas_df shows.
+
+    See describe_pandas_df for the other parameters.
+
+    Parameters
+    ----------
+    correlations : bool
+        Also compute the correlations of numeric columns and the
+        associations of category columns
+
+    Returns
+    -------
+    stats : DatasetStats
+    """
     if dtype is None:
         dtype = {}
-    print(f"Number of datapoints: {len(df)}")
-    column_info, column_info_meta = _generate_column_info(df, dtype)
+    column_info, column_info_meta = _generate_column_info(df, dtype, sketch_error)
+    stats = compute_stats(
+        df, column_info, column_info_meta, percentiles, exact_quantile_max_rows
+    )
+    if correlations:
+        stats.correlations = compute_correlations(df, column_info)
+    return stats
+
+
+def describe_memory(stats: DatasetStats, recommended: Dict[Any, str]) -> None:
+    """
+    Show the projected memory of the dataframe with the recommended dtypes.
+
+    Parameters
+    ----------
+    stats : DatasetStats
+    recommended : Dict[Any, str]
+        Maps column names to recommended dtypes
+    """
+    print(format_memory(stats, recommended))
+
+
+def format_memory(stats: DatasetStats, recommended: Dict[Any, str]) -> str:
+    """
+    Format the projected memory with the parsed and recommended dtypes.
+
+    See describe_memory for the parameters.
+    """
+    original, optimized = project_memory(stats, recommended)
+    return "\n".join(
+        [
+            "\n## Memory",
+            f"Parsed dtypes     : {format_bytes(original)}",
+            f"Recommended dtypes: {format_bytes(optimized)} "
+            f"({original / max(optimized, 1):0.1f}x smaller)",
+        ]
+    )
+
+
+def format_bytes(nb_bytes: float) -> str:
+    """
+    Format a number of bytes for humans.
+
+    Examples
+    --------
+    >>> format_bytes(1536)
+    '1.5 KiB'
+    """
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if nb_bytes < 1024:
+            break
+        nb_bytes /= 1024
+    else:
+        unit = "TiB"
+    return f"{nb_bytes:0.1f} {unit}"
+
+
+def describe_stats(stats: DatasetStats) -> Dict[str, Any]:
+    """
+    Show basic information about precomputed column statistics.
+
+    Parameters
+    ----------
+    stats : DatasetStats
+
+    Returns
+    -------
+    column_types : Dict[str, Any]
+        Maps column names to type names
+    """
+    print(format_stats(stats))
+    return get_column_types(stats)
+
+
+def render_stats(stats: DatasetStats, output_format: str = "text") -> str:
+    """
+    Render column statistics in one of the OUTPUT_FORMATS.
 
-    column_name_len = max(len(column_name) for column_name in df)
+    Parameters
+    ----------
+    stats : DatasetStats
+    output_format : str
+        'text' for the tables describe_stats shows, 'json' or 'yaml'
+
+    Returns
+    -------
+    report : str
+    """
+    if output_format == "json":
+        return json.dumps(stats.to_dict(), indent=2, ensure_ascii=False)
+    if output_format == "yaml":
+        return yaml.safe_dump(stats.to_dict(), sort_keys=False, allow_unicode=True)
+    if output_format == "text":
+        return format_stats(stats)
+    raise ValueError(f"Unknown output format '{output_format}'")
+
+
+def format_stats(stats: DatasetStats) -> str:
+    """
+    Format column statistics as text tables, grouped by the kind of column.
+
+    Parameters
+    ----------
+    stats : DatasetStats
+
+    Returns
+    -------
+    tables : str
+    """
+    lines = [f"Number of datapoints: {stats.nb_rows}"]
+    column_name_len = max(len(str(column_name)) for column_name in stats.columns)
 
-    print("\n## Integer Columns")
-    print(
+    lines.append("\n## Integer Columns")
+    lines.append(
         "{column_name:<{column_name_len}}: Non-nan  mean   std   min   25%  "
         " 50%   75%   max".format(
             column_name_len=column_name_len, column_name="Column name"
         )
     )
-    for column_name in column_info["int"]:
-        print(
+    for column_stats in stats.by_kind("int"):
+        lines.append(
             "{column_name:<{column_name_len}}: {non_nan:>7}  "
             "{mean:0.2f}  {std:>4.2f}  "
             "{min:>4.0f}  {q25:>4.0f}  {q50:>4.0f}  {q75:>4.0f}  {max:>4.0f}".format(
                 column_name_len=column_name_len,
-                column_name=column_name,
-                non_nan=sum(df[column_name].notnull()),
-                mean=df[column_name].mean(),
-                std=df[column_name].std(),
-                min=df[column_name].min(),
-                q25=df[column_name].quantile(0.25),
-                q50=df[column_name].quantile(0.50),
-                q75=df[column_name].quantile(0.75),
-                max=max(df[column_name]),
+                column_name=column_stats.name,
+                **_numeric_fields(column_stats),
             )
         )
 
-    print("\n## Float Columns")
-    print(
+    lines.append("\n## Float Columns")
+    lines.append(
         "{column_name:<{column_name_len}}: Non-nan   mean    std    min    "
         "25%    50%    75%    max".format(
             column_name_len=column_name_len, column_name="Column name"
         )
     )
-    for column_name in column_info["float"]:
-        print(
+    for column_stats in stats.by_kind("float"):
+        lines.append(
             "{column_name:<{column_name_len}}: {non_nan:>7}  "
             "{mean:5.2f}  {std:>4.2f}  "
             "{min:>5.2f}  {q25:>5.2f}  {q50:>5.2f}  {q75:>5.2f}  {max:>5.2f}".format(
                 column_name_len=column_name_len,
-                column_name=column_name,
-                non_nan=sum(df[column_name].notnull()),
-                mean=df[column_name].mean(),
-                std=df[column_name].std(),
-                min=df[column_name].min(),
-                q25=df[column_name].quantile(0.25),
-                q50=df[column_name].quantile(0.50),
-                q75=df[column_name].quantile(0.75),
-                max=max(df[column_name]),
+                column_name=column_stats.name,
+                **_numeric_fields(column_stats),
             )
         )
 
-    if len(column_info["category"]) > 0:
-        print("\n## Category Columns")
-        print(
+    numeric_columns = stats.by_kind("int") + stats.by_kind("float")
+    percentiles = list(numeric_columns[0].percentiles) if numeric_columns else []
+    if len(percentiles) > 0:
+        lines.append("\n## Percentiles")
+        lines.append(
+            "{column_name:<{column_name_len}}: {header}".format(
+                column_name_len=column_name_len,
+                column_name="Column name",
+                header="  ".join(f"{f'p{p:g}':>9}" for p in percentiles),
+            )
+        )
+        for column_stats in numeric_columns:
+            lines.append(
+                "{column_name:<{column_name_len}}: {values}".format(
+                    column_name_len=column_name_len,
+                    column_name=column_stats.name,
+                    values="  ".join(
+                        f"{column_stats.percentiles[p]:>9.2f}" for p in percentiles
+                    ),
+                )
+            )
+
+    if len(stats.by_kind("category")) > 0:
+        lines.append("\n## Category Columns")
+        lines.append(
             "{column_name:<{column_name_len}}: Non-nan   unique   "
             "top (count)  rest".format(
                 column_name_len=column_name_len, column_name="Column name"
             )
         )
-    for column_name in column_info["category"]:
-        rest_str = str(column_info_meta[column_name]["value_list"][1:])[:40]
-        print(
+    for column_stats in stats.by_kind("category"):
+        rest_str = str(column_stats.value_list[1:])[:40]
+        lines.append(
             "{column_name:<{column_name_len}}: {non_nan:>7}   {unique:>6}   "
-            "{top} ({count})  {rest}".format(
+            "{top}  {rest}".format(
                 column_name_len=column_name_len,
-                column_name=column_name,
-                non_nan=sum(df[column_name].notnull()),
-                unique=len(df[column_name].unique()),
-                top=column_info_meta[column_name]["value_list"][0],
-                count=column_info_meta[column_name]["top_count_val"],
+                column_name=column_stats.name,
+                non_nan=column_stats.non_nan,
+                unique=_format_unique(column_stats),
+                top=_format_top(column_stats),
                 rest=rest_str,
             )
         )
 
-    print("\n## Other Columns")
-    print(
+    lines.append("\n## Other Columns")
+    lines.append(
         "{column_name:<{column_name_len}}: Non-nan   unique   top (count)".format(
             column_name_len=column_name_len, column_name="Column name"
         )
     )
-    for column_name in column_info["other"]:
-        rest_str = str(column_info_meta[column_name]["value_list"][1:])[:40]
-        print(
+    for column_stats in stats.by_kind("other"):
+        lines.append(
             "{column_name:<{column_name_len}}: {non_nan:>7}   {unique:>6}   "
-            "{top} ({count})".format(
+            "{top}".format(
                 column_name_len=column_name_len,
-                column_name=column_name,
-                non_nan=sum(df[column_name].notnull()),
-                unique=len(df[column_name].unique()),
-                top=column_info_meta[column_name]["value_list"][0],
-                count=column_info_meta[column_name]["top_count_val"],
+                column_name=column_stats.name,
+                non_nan=column_stats.non_nan,
+                unique=_format_unique(column_stats),
+                top=_format_top(column_stats),
             )
         )
 
+    lines.extend(_format_correlations(stats))
+    return "\n".join(lines)
+
+
+def _format_unique(column_stats: ColumnStats) -> str:
+    """Format the number of unique values, marked with ~ if estimated."""
+    if not column_stats.is_counted:
+        return "unknown"
+    if column_stats.approximate:
+        return f"~{column_stats.unique}"
+    return str(column_stats.unique)
+
+
+def _format_top(column_stats: ColumnStats) -> str:
+    """Format the most common value and its count, marked with ~ if estimated."""
+    if not column_stats.is_counted:
+        return "unknown"
+    top = column_stats.value_list[0] if column_stats.value_list else None
+    count = column_stats.top_count_val
+    if column_stats.approximate and count is not None:
+        return f"{top} (~{count})"
+    return f"{top} ({count})"
+
+
+def _format_correlations(stats: DatasetStats) -> List[str]:
+    titles = {
+        "pearson": "Pearson Correlations",
+        "spearman": "Spearman Correlations",
+        "cramers_v": "Cramér's V",
+    }
+    lines = []
+    for method, matrix in stats.correlations.items():
+        pairs = get_strongest_pairs(matrix)
+        if len(pairs) == 0:
+            continue
+        lines.append(f"\n## {titles.get(method, method)} (strongest pairs)")
+        for column_a, column_b, value in pairs:
+            lines.append(f"{column_a} ~ {column_b}: {value:>6.3f}")
+    return lines
+
+
+def get_column_types(stats: DatasetStats) -> Dict[str, Any]:
+    """
+    Get the type names of all columns whose kind is known.
+
+    Parameters
+    ----------
+    stats : DatasetStats
+
+    Returns
+    -------
+    column_types : Dict[str, Any]
+        Maps column names to type names
+    """
     column_types = {}
-    for column_type, columns in column_info.items():
-        for column_name in columns:
-            if column_type == "other":
-                column_type = "str"
-            column_types[column_name] = column_type
+    for column_stats in stats.columns.values():
+        column_type = column_stats.kind
+        if column_type is None:
+            continue
+        if column_type == "other":
+            column_type = "str"
+        column_types[column_stats.name] = column_type
     return column_types
 
 
+def _numeric_fields(column_stats: ColumnStats) -> Dict[str, Any]:
+    return {
+        "non_nan": column_stats.non_nan,
+        "mean": column_stats.mean,
+        "std": column_stats.std,
+        "min": column_stats.min,
+        "q25": column_stats.q25,
+        "q50": column_stats.q50,
+        "q75": column_stats.q75,
+        "max": column_stats.max,
+    }
+
+
 def _generate_column_info(
-    df: pd.DataFrame, dtype: Dict[str, Any]
+    df: pd.DataFrame, dtype: Dict[str, Any], sketch_error: Optional[float] = None
 ) -> Tuple[Dict[str, List], Dict[str, Any]]:
     """
     Generate information about a column.
@@ -146,6 +387,8 @@ def _generate_column_info(
     ----------
     df : pd.DataFrame
     dtype : Dict[str, Any]
+    sketch_error : Optional[float]
+        See describe_pandas_df
 
     Returns
     -------
@@ -158,68 +401,134 @@ def _generate_column_info(
         "other": [],
         "time": [],
     }
-    float_types = ["float64"]
-    integer_types = ["int64", "uint8"]
-    time_types = ["datetime64[ns]"]
-    other_types = ["object", "category"]
     column_info_meta: Dict[str, Any] = {}
     for column_name in df:
         column_info_meta[column_name] = {}
-        counter_obj = df[column_name].value_counts()
+        if sketch_error is None:
+            counter_obj = df[column_name].value_counts()
+            value_count = len(counter_obj)
+            column_info_meta[column_name]["approximate"] = False
+        else:
+            sketch = sketch_value_counts(df[column_name], sketch_error)
+            counter_obj = sketch.top_values()
+            value_count = sketch.distinct_count()
+            column_info_meta[column_name]["approximate"] = not sketch.is_exact
         value_list = counter_obj.keys().tolist()
-        value_count = len(value_list)
-        is_suspicious_cat = (
-            value_count <= 50
-            and str(df[column_name].dtype) != "category"
-            and column_name not in dtype
+        warn_if_suspicious_category(
+            column_name, df[column_name].dtype, value_list, value_count, dtype
         )
-        if is_suspicious_cat:
-            logger.warning(
-                f"Column '{column_name}' has only {value_count} different "
-                f"values ({value_list}). "
-                "You might want to make it a 'category'"
-            )
         if len(value_list) > 0:
             top_count_val = counter_obj.tolist()[0]
         else:
             top_count_val = None
         column_info_meta[column_name]["top_count_val"] = top_count_val
+        column_info_meta[column_name]["top_counts"] = [
+            int(count) for count in counter_obj.head(TOP_COUNTS)
+        ]
         column_info_meta[column_name]["value_list"] = value_list
         column_info_meta[column_name]["value_count"] = value_count
-        is_int_type = (
-            df[column_name].dtype in integer_types
-            or column_name in dtype
-            and dtype[column_name] in integer_types
-        )
-        is_float_type = (
-            df[column_name].dtype in float_types
-            or column_name in dtype
-            and dtype[column_name] in float_types
-        )
-        is_cat_type = (
-            str(df[column_name].dtype) == "category"
-            or column_name in dtype
-            and dtype[column_name] == "category"
-        )
-        is_time_type = str(df[column_name].dtype) in time_types
-        is_other_type = (
-            str(df[column_name].dtype) in other_types
-            or column_name in dtype
-            and dtype[column_name] in other_types
-        )
-        if is_int_type:
-            column_info["int"].append(column_name)
-        elif is_float_type:
-            column_info["float"].append(column_name)
-        elif is_cat_type:
-            column_info["category"].append(column_name)
-        elif is_other_type:
-            column_info["other"].append(column_name)
-        elif is_time_type:
-            column_info["time"].append(column_name)
-        else:
-            print(
-                "!!! describe_pandas_df does not know type "
-                f"'{df[column_name].dtype}'"
+        kind = get_column_kind(column_name, df[column_name].dtype, dtype)
+        if kind is None:
+            logger.warning(
+                f"describe_pandas_df does not know the type "
+                f"'{df[column_name].dtype}' of column '{column_name}'"
             )
+        else:
+            column_info[kind].append(column_name)
     return column_info, column_info_meta
+
+
+def warn_if_suspicious_category(
+    column_name: str,
+    column_dtype: Any,
+    value_list: List[Any],
+    value_count: int,
+    dtype: Dict[str, Any],
+) -> None:
+    """
+    Warn if a column has so few values that it should be a category.
+
+    Parameters
+    ----------
+    column_name : str
+    column_dtype : Any
+        The dtype pandas inferred
+    value_list : List[Any]
+        The values of the column, most common first
+    value_count : int
+        Number of different values of the column
+    dtype : Dict[str, Any]
+        Maps column names to types the user gave
+    """
+    is_suspicious_cat = (
+        value_count <= 50
+        and str(column_dtype) != "category"
+        and column_name not in dtype
+    )
+    if is_suspicious_cat:
+        logger.warning(
+            f"Column '{column_name}' has only {value_count} different "
+            f"values ({value_list}). "
+            "You might want to make it a 'category'"
+        )
+
+
+def get_column_kind(
+    column_name: str, column_dtype: Any, dtype: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Get the kind of column which decides how a column gets described.
+
+    Parameters
+    ----------
+    column_name : str
+    column_dtype : Any
+        The dtype pandas inferred
+    dtype : Dict[str, Any]
+        Maps column names to types the user gave
+
+    Returns
+    -------
+    kind : Optional[str]
+        One of 'int', 'float', 'category', 'other', 'time' or None if the
+        type is not known.
+
+    Examples
+    --------
+    >>> get_column_kind("a", "int64", {})
+    'int'
+    >>> get_column_kind("a", "object", {"a": "category"})
+    'category'
+    """
+    is_int_type = (
+        column_dtype in INTEGER_TYPES
+        or column_name in dtype
+        and dtype[column_name] in INTEGER_TYPES
+    )
+    is_float_type = (
+        column_dtype in FLOAT_TYPES
+        or column_name in dtype
+        and dtype[column_name] in FLOAT_TYPES
+    )
+    is_cat_type = (
+        str(column_dtype) == "category"
+        or column_name in dtype
+        and dtype[column_name] == "category"
+    )
+    is_time_type = str(column_dtype) in TIME_TYPES
+    is_other_type = (
+        str(column_dtype) in OTHER_TYPES
+        or column_name in dtype
+        and dtype[column_name] in OTHER_TYPES
+    )
+    if is_int_type:
+        return "int"
+    elif is_float_type:
+        return "float"
+    elif is_cat_type:
+        return "category"
+    elif is_other_type:
+        return "other"
+    elif is_time_type:
+        return "time"
+    return None
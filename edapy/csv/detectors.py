@@ -0,0 +1,200 @@
+"""
+Detect dates, booleans, identifiers and text in object columns.
+
+All detectors look at an evenly spaced sample of the non-null values and
+use vectorized pandas string operations, so detection costs at most one
+pass over the column.
+"""
+
+# Core Library
+import collections
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+# Third party
+import numpy as np
+import pandas as pd
+
+DETECTION_SAMPLE_SIZE = 1000
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%d.%m.%Y",
+    "%d.%m.%Y %H:%M",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%Y/%m/%d",
+    "%d-%m-%Y",
+    "%b %d, %Y",
+    "%d %b %Y",
+]
+BOOL_TOKENS = {
+    "true": True,
+    "false": False,
+    "yes": True,
+    "no": False,
+    "y": True,
+    "n": False,
+    "t": True,
+    "f": False,
+}
+IDENTIFIER_PATTERNS = {
+    "uuid": r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-"
+    r"[0-9a-fA-F]{12}",
+    # At least one digit and one letter, so that words like 'deadbeef' and
+    # numbers are no hex identifiers
+    "hex": r"(?:0x)?(?=[0-9a-fA-F]*[0-9])(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{8,}",
+    "integer": r"[0-9]{4,}",
+}
+TEXT_MIN_TOKENS = 4
+TEXT_MIN_LENGTH = 40
+MAX_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class Detection:
+    """
+    The type which was detected in the values of a column.
+
+    Parameters
+    ----------
+    type : str
+        One of 'date', 'bool', 'identifier' or 'text'
+    dtype : str
+        The cheapest dtype which can hold the values
+    date_format : Optional[str]
+        The strftime format of dates
+    """
+
+    type: str
+    dtype: str
+    date_format: Optional[str] = None
+
+
+# Formats which matched before are tried first
+_format_order: List[str] = list(DATE_FORMATS)
+_cache: "collections.OrderedDict[Tuple[str, int], Optional[Detection]]" = (
+    collections.OrderedDict()
+)
+
+
+def detect_type(
+    column: pd.Series,
+    column_name: Any = None,
+    sample_size: int = DETECTION_SAMPLE_SIZE,
+) -> Optional[Detection]:
+    """
+    Detect dates, booleans, identifiers or text in an object column.
+
+    The result is cached per column name and sample.
+
+    Parameters
+    ----------
+    column : pd.Series
+    column_name : Any
+        Part of the cache key
+    sample_size : int
+        Number of non-null values which are checked
+
+    Returns
+    -------
+    detection : Optional[Detection]
+        None if no detector matched all sampled values
+
+    Examples
+    --------
+    >>> detect_type(pd.Series(["2017-01-01", "2017-06-01", None]))
+    Detection(type='date', dtype='datetime64[ns]', date_format='%Y-%m-%d')
+    >>> detect_type(pd.Series(["yes", "no", "yes"]))
+    Detection(type='bool', dtype='boolean', date_format=None)
+    >>> detect_type(pd.Series(["Germany", "France"])) is None
+    True
+    """
+    sample = _sample_values(column, sample_size)
+    if len(sample) == 0:
+        return None
+    key = (
+        str(column_name),
+        int(pd.util.hash_pandas_object(sample, index=False).sum()),
+    )
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    detection = (
+        _detect_bool(sample)
+        or _detect_date(sample)
+        or _detect_identifier(sample)
+        or _detect_text(sample)
+    )
+    _cache[key] = detection
+    if len(_cache) > MAX_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return detection
+
+
+def to_bool(column: pd.Series) -> pd.Series:
+    """
+    Convert a column of bool tokens like 'yes' and 'no' to the boolean dtype.
+
+    Examples
+    --------
+    >>> to_bool(pd.Series(["Yes", "no", None])).tolist()
+    [True, False, <NA>]
+    """
+    lowered = column.astype("string").str.strip().str.lower()
+    return lowered.map(BOOL_TOKENS).astype("boolean")
+
+
+def _sample_values(column: pd.Series, sample_size: int) -> pd.Series:
+    """Get up to sample_size evenly spaced non-null values as stripped strings."""
+    if len(column) > 2 * sample_size:
+        positions = np.linspace(0, len(column) - 1, 2 * sample_size).astype(int)
+        column = column.iloc[np.unique(positions)]
+    sample = column.dropna()
+    if len(sample) > sample_size:
+        positions = np.linspace(0, len(sample) - 1, sample_size).astype(int)
+        sample = sample.iloc[np.unique(positions)]
+    return sample.astype(str).str.strip().reset_index(drop=True)
+
+
+def _detect_bool(sample: pd.Series) -> Optional[Detection]:
+    lowered = sample.str.lower()
+    if lowered.nunique() <= 2 and lowered.isin(BOOL_TOKENS.keys()).all():
+        return Detection(type="bool", dtype="boolean")
+    return None
+
+
+def _detect_date(sample: pd.Series) -> Optional[Detection]:
+    if not sample.str.contains(r"\d", regex=True).all():
+        return None
+    head = sample.iloc[:20]
+    for date_format in _format_order:
+        if pd.to_datetime(head, format=date_format, errors="coerce").isnull().any():
+            continue
+        if pd.to_datetime(sample, format=date_format, errors="coerce").isnull().any():
+            continue
+        _format_order.remove(date_format)
+        _format_order.insert(0, date_format)
+        return Detection(type="date", dtype="datetime64[ns]", date_format=date_format)
+    return None
+
+
+def _detect_identifier(sample: pd.Series) -> Optional[Detection]:
+    for pattern in IDENTIFIER_PATTERNS.values():
+        if sample.str.fullmatch(pattern).all():
+            return Detection(type="identifier", dtype="object")
+    return None
+
+
+def _detect_text(sample: pd.Series) -> Optional[Detection]:
+    mean_tokens = (sample.str.count(r"\s+") + 1).mean()
+    mean_length = sample.str.len().mean()
+    if mean_tokens >= TEXT_MIN_TOKENS or mean_length >= TEXT_MIN_LENGTH:
+        return Detection(type="text", dtype="object")
+    return None
@@ -0,0 +1,175 @@
+"""Detect the dialect of a CSV file from a sample of its head."""
+
+# Core Library
+import codecs
+import csv
+import functools
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+# First party
+from edapy.csv.compression import open_decompressed
+
+SAMPLE_SIZE = 64 * 1024
+# The first bytes of columnar files
+FILE_FORMAT_MAGIC = {b"PAR1": "parquet", b"ARROW1": "feather", b"FEA1": "feather"}
+
+
+@dataclass(frozen=True)
+class CsvDialect:
+    """Everything which is needed to parse a CSV file."""
+
+    delimiter: str = ","
+    quotechar: str = '"'
+    escapechar: Optional[str] = None
+    has_header: bool = True
+    encoding: str = "utf-8"
+
+    def read_csv_kwargs(self) -> Dict[str, Any]:
+        """Get the arguments for pd.read_csv to parse a file of this dialect."""
+        return {
+            "sep": self.delimiter,
+            "quotechar": self.quotechar,
+            "escapechar": self.escapechar,
+            "header": 0 if self.has_header else None,
+            "encoding": self.encoding,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the dialect as it is stored in the csv_meta of the types YAML."""
+        return asdict(self)
+
+
+def sniff_dialect(csv_path: str, sample_size: int = SAMPLE_SIZE) -> CsvDialect:
+    """
+    Detect the dialect of a CSV file.
+
+    Only the first sample_size bytes are read, after decompressing them if
+    the file is compressed. The result is cached until the modification
+    time or the size of the file changes.
+
+    Parameters
+    ----------
+    csv_path : str
+    sample_size : int
+
+    Returns
+    -------
+    dialect : CsvDialect
+    """
+    csv_path = os.path.abspath(csv_path)
+    stat = os.stat(csv_path)
+    return _sniff_dialect(csv_path, stat.st_mtime_ns, stat.st_size, sample_size)
+
+
+@functools.lru_cache(maxsize=256)
+def _sniff_dialect(
+    csv_path: str, mtime_ns: int, size: int, sample_size: int
+) -> CsvDialect:
+    with open_decompressed(csv_path) as fp:
+        head = fp.read(sample_size)
+    encoding = detect_encoding(head)
+    sample = codecs.getincrementaldecoder(encoding)(errors="replace").decode(head)
+    if len(head) == sample_size and "\n" in sample:
+        # Drop the last line, as it is probably incomplete
+        sample = sample[: sample.rfind("\n") + 1]
+    sniffer = csv.Sniffer()
+    try:
+        dialect = sniffer.sniff(sample)
+    except csv.Error:
+        return CsvDialect(encoding=encoding)
+    quotechar = dialect.quotechar or '"'
+    escapechar = None
+    if f"\\{quotechar}" in sample:
+        escapechar = "\\"
+    rows = list(csv.reader(sample.splitlines()[:20], dialect))
+    has_header = len(rows) > 0 and (
+        _looks_like_header(rows[0]) or sniffer.has_header(sample)
+    )
+    return CsvDialect(
+        delimiter=dialect.delimiter,
+        quotechar=quotechar,
+        escapechar=escapechar,
+        has_header=has_header,
+        encoding=encoding,
+    )
+
+
+def sniff_file_format(path: str) -> str:
+    """
+    Check if a file is a CSV file or a Parquet, Feather or Arrow IPC file.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    file_format : str
+        'csv', 'parquet' or 'feather'
+    """
+    with open(path, "rb") as fp:
+        head = fp.read(max(len(magic) for magic in FILE_FORMAT_MAGIC))
+    for magic, file_format in FILE_FORMAT_MAGIC.items():
+        if head.startswith(magic):
+            return file_format
+    return "csv"
+
+
+def detect_encoding(head: bytes) -> str:
+    """
+    Guess the encoding of a file from its first bytes.
+
+    Parameters
+    ----------
+    head : bytes
+
+    Returns
+    -------
+    encoding : str
+
+    Examples
+    --------
+    >>> detect_encoding("Größe".encode("utf-8"))
+    'utf-8'
+    >>> detect_encoding("Größe".encode("latin-1"))
+    'latin-1'
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return "latin-1"
+    return "utf-8"
+
+
+def _looks_like_header(row: List[str]) -> bool:
+    """
+    Check if a row could be a header: unique, non-empty, non-numeric cells.
+
+    csv.Sniffer.has_header often misses headers of columns which contain
+    strings, so this is used in addition to it.
+
+    Examples
+    --------
+    >>> _looks_like_header(["country", "population"])
+    True
+    >>> _looks_like_header(["Germany", "82521653"])
+    False
+    """
+    cells = [cell.strip() for cell in row]
+    if len(set(cells)) != len(cells):
+        return False
+    for cell in cells:
+        if cell == "":
+            return False
+        try:
+            float(cell)
+            return False
+        except ValueError:
+            pass
+    return True
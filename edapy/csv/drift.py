@@ -0,0 +1,566 @@
+"""
+Compare the profiles of two versions of a dataset.
+
+Everything is computed from DatasetStats, so two profiled files are
+compared without reading them again:
+
+* Changes of the kind or dtype of a column and of its share of nulls
+* Shifts of the mean and of the quantiles of numeric columns
+* The population stability index (PSI) and the Kolmogorov-Smirnov (KS)
+  statistic of numeric columns. They are computed from the histograms of
+  both profiles, whose bins are aligned, so that integer columns are
+  compared value by value. For profiles without histograms, the
+  distribution of a column is approximated by linear interpolation between
+  its minimum, its quantiles and its maximum, so more percentiles give
+  more precise values.
+* New and vanished values of columns with at most MAX_CATEGORIES different
+  values. Profiles of big files may only know the most common values, so a
+  value can seem to be new while it only became more common.
+"""
+
+# Core Library
+import importlib.util
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Third party
+import numpy as np
+import yaml
+
+# First party
+from edapy.csv.stats import ColumnStats, DatasetStats, to_builtin
+
+logger = logging.getLogger(__name__)
+# Percentiles which edapy csv diff computes for files it profiles itself
+DRIFT_PERCENTILES = [1, 5, 10, 20, 30, 40, 60, 70, 80, 90, 95, 99]
+# A PSI above 0.2 is commonly considered a significant shift
+PSI_THRESHOLD = 0.2
+NULL_RATE_THRESHOLD = 0.05
+# Empty bins would make the PSI infinite
+PSI_EPSILON = 1e-4
+MAX_LISTED_VALUES = 20
+# Columns with more different values, e.g. identifiers, always get new values
+MAX_CATEGORIES = 1000
+
+
+@dataclass
+class ColumnDrift:
+    """Differences between two profiles of a column."""
+
+    name: str
+    status: str
+    old_kind: Optional[str] = None
+    new_kind: Optional[str] = None
+    old_dtype: Optional[str] = None
+    new_dtype: Optional[str] = None
+    old_null_rate: Optional[float] = None
+    new_null_rate: Optional[float] = None
+    mean_shift: Optional[float] = None
+    mean_shift_std: Optional[float] = None
+    quantile_shifts: Dict[float, float] = field(default_factory=dict)
+    psi: Optional[float] = None
+    ks: Optional[float] = None
+    nb_new_values: int = 0
+    nb_vanished_values: int = 0
+    new_values: List[Any] = field(default_factory=list)
+    vanished_values: List[Any] = field(default_factory=list)
+    drifted: bool = False
+
+    @property
+    def type_changed(self) -> bool:
+        """True if the kind or the dtype of a column in both profiles differ."""
+        return self.status == "common" and (
+            self.old_kind != self.new_kind or self.old_dtype != self.new_dtype
+        )
+
+    @property
+    def null_rate_delta(self) -> Optional[float]:
+        """Change of the share of missing values."""
+        if self.old_null_rate is None or self.new_null_rate is None:
+            return None
+        return self.new_null_rate - self.old_null_rate
+
+
+@dataclass
+class DatasetDrift:
+    """Differences between two profiles of a dataset."""
+
+    old_nb_rows: int
+    new_nb_rows: int
+    columns: Dict[str, ColumnDrift] = field(default_factory=dict)
+
+    @property
+    def drifted(self) -> List[ColumnDrift]:
+        """Get the columns which changed significantly."""
+        return [column for column in self.columns.values() if column.drifted]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the differences as builtin types which JSON and YAML can hold."""
+        return {
+            "old_nb_rows": int(self.old_nb_rows),
+            "new_nb_rows": int(self.new_nb_rows),
+            "columns": [
+                to_builtin(
+                    dict(
+                        asdict(column),
+                        type_changed=column.type_changed,
+                        null_rate_delta=column.null_rate_delta,
+                    )
+                )
+                for column in self.columns.values()
+            ],
+        }
+
+
+def diff_stats(
+    old: DatasetStats,
+    new: DatasetStats,
+    psi_threshold: float = PSI_THRESHOLD,
+    null_rate_threshold: float = NULL_RATE_THRESHOLD,
+) -> DatasetDrift:
+    """
+    Compare the profiles of two versions of a dataset.
+
+    Parameters
+    ----------
+    old : DatasetStats
+    new : DatasetStats
+    psi_threshold : float
+        Numeric columns with a higher PSI are marked as drifted
+    null_rate_threshold : float
+        Columns whose share of nulls changes by more are marked as drifted
+
+    Returns
+    -------
+    drift : DatasetDrift
+        Columns which were added or removed, whose type changed or which
+        have new or vanished values are marked as drifted, too
+
+    Examples
+    --------
+    >>> old = DatasetStats(10, {"a": ColumnStats("a", "int", "int64")})
+    >>> new = DatasetStats(12, {"b": ColumnStats("b", "int", "int64")})
+    >>> [(c.name, c.status) for c in diff_stats(old, new).drifted]
+    [('a', 'removed'), ('b', 'added')]
+    """
+    _warn_if_only_quartiles(old, "old")
+    _warn_if_only_quartiles(new, "new")
+    drift = DatasetDrift(old_nb_rows=old.nb_rows, new_nb_rows=new.nb_rows)
+    for name, old_column in old.columns.items():
+        if name in new.columns:
+            drift.columns[name] = diff_column(
+                old_column,
+                new.columns[name],
+                old.nb_rows,
+                new.nb_rows,
+                psi_threshold,
+                null_rate_threshold,
+            )
+        else:
+            drift.columns[name] = _describe_column(
+                ColumnDrift(name, "removed", drifted=True), old_column, "old", old
+            )
+    for name, new_column in new.columns.items():
+        if name not in old.columns:
+            drift.columns[name] = _describe_column(
+                ColumnDrift(name, "added", drifted=True), new_column, "new", new
+            )
+    return drift
+
+
+def diff_column(
+    old: ColumnStats,
+    new: ColumnStats,
+    old_nb_rows: int,
+    new_nb_rows: int,
+    psi_threshold: float = PSI_THRESHOLD,
+    null_rate_threshold: float = NULL_RATE_THRESHOLD,
+) -> ColumnDrift:
+    """
+    Compare the profiles of a column which exists in both datasets.
+
+    See diff_stats for the parameters.
+
+    Returns
+    -------
+    drift : ColumnDrift
+    """
+    drift = ColumnDrift(old.name, "common")
+    _describe_column(drift, old, "old", DatasetStats(old_nb_rows))
+    _describe_column(drift, new, "new", DatasetStats(new_nb_rows))
+    old_mean, new_mean, old_std = map(_as_float, [old.mean, new.mean, old.std])
+    if old_mean is not None and new_mean is not None:
+        drift.mean_shift = new_mean - old_mean
+        if old_std is not None and old_std > 0:
+            drift.mean_shift_std = drift.mean_shift / old_std
+    old_quantiles = get_quantiles(old)
+    new_quantiles = get_quantiles(new)
+    for q in sorted(set(old_quantiles) & set(new_quantiles) - {0.0, 1.0}):
+        drift.quantile_shifts[q] = new_quantiles[q] - old_quantiles[q]
+    shares = get_histogram_shares(old, new)
+    if shares is not None:
+        drift.psi = _population_stability_index(*shares)
+        drift.ks = float(np.max(np.abs(np.cumsum(shares[0] - shares[1]))))
+    elif len(old_quantiles) >= 2 and len(new_quantiles) >= 2:
+        old_cdf = _as_cdf(old_quantiles)
+        new_cdf = _as_cdf(new_quantiles)
+        drift.psi = population_stability_index(old_cdf, new_cdf)
+        drift.ks = kolmogorov_smirnov(old_cdf, new_cdf)
+    if _is_categorical(old) and _is_categorical(new):
+        new_values = _sorted(set(new.value_list) - set(old.value_list))
+        vanished_values = _sorted(set(old.value_list) - set(new.value_list))
+        drift.nb_new_values = len(new_values)
+        drift.nb_vanished_values = len(vanished_values)
+        drift.new_values = new_values[:MAX_LISTED_VALUES]
+        drift.vanished_values = vanished_values[:MAX_LISTED_VALUES]
+    null_rate_delta = drift.null_rate_delta
+    drift.drifted = (
+        drift.type_changed
+        or (null_rate_delta is not None and abs(null_rate_delta) > null_rate_threshold)
+        or (drift.psi is not None and drift.psi > psi_threshold)
+        or drift.nb_new_values > 0
+        or drift.nb_vanished_values > 0
+    )
+    return drift
+
+
+def get_quantiles(column_stats: ColumnStats) -> Dict[float, float]:
+    """
+    Get all known quantiles of a column, including the minimum and maximum.
+
+    Parameters
+    ----------
+    column_stats : ColumnStats
+
+    Returns
+    -------
+    quantiles : Dict[float, float]
+        Maps probabilities between 0 and 1 to values
+
+    Examples
+    --------
+    >>> get_quantiles(ColumnStats("a", "int", "int64", min=0, q50=4, max=9))
+    {0.0: 0.0, 0.5: 4.0, 1.0: 9.0}
+    """
+    candidates: Dict[float, Optional[float]] = {
+        0.0: column_stats.min,
+        0.25: column_stats.q25,
+        0.5: column_stats.q50,
+        0.75: column_stats.q75,
+        1.0: column_stats.max,
+    }
+    for percentile, value in column_stats.percentiles.items():
+        candidates[percentile / 100] = value
+    quantiles = {q: _as_float(value) for q, value in sorted(candidates.items())}
+    return {q: value for q, value in quantiles.items() if value is not None}
+
+
+def population_stability_index(
+    old_cdf: Tuple[np.ndarray, np.ndarray], new_cdf: Tuple[np.ndarray, np.ndarray]
+) -> float:
+    """
+    Compute the PSI of two distributions, binned at the quantiles of the old.
+
+    Values of the new distribution below the old minimum or above the old
+    maximum get their own bins.
+
+    Parameters
+    ----------
+    old_cdf : Tuple[np.ndarray, np.ndarray]
+        Values and their cumulative probabilities, see _as_cdf
+    new_cdf : Tuple[np.ndarray, np.ndarray]
+
+    Returns
+    -------
+    psi : float
+    """
+    # Repeated quantiles, e.g. of integer columns, are one edge
+    edges = np.unique(old_cdf[0])
+    old_probabilities = _evaluate_cdf(old_cdf, edges, "right")
+    new_probabilities = _evaluate_cdf(new_cdf, edges, "right")
+    return _population_stability_index(
+        np.diff(old_probabilities, prepend=0.0, append=1.0),
+        np.diff(new_probabilities, prepend=0.0, append=1.0),
+    )
+
+
+def _population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Compute the PSI of the shares of values in the same bins."""
+    expected = np.maximum(expected, PSI_EPSILON)
+    actual = np.maximum(actual, PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def get_histogram_shares(
+    old: ColumnStats, new: ColumnStats
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Get the shares of the values of a column in the bins of both histograms.
+
+    The bins of edapy.csv.sketches.Histogram are powers of two wide and
+    start at multiples of their width, so the narrower bins are merged into
+    the wider ones without approximation.
+
+    Parameters
+    ----------
+    old : ColumnStats
+    new : ColumnStats
+
+    Returns
+    -------
+    old_shares, new_shares : Optional[Tuple[np.ndarray, np.ndarray]]
+        Shares of the values in the same bins, sorted by value. None if one
+        of the profiles has no histogram
+
+    Examples
+    --------
+    >>> old = ColumnStats("a", "int", "int64", histogram_edges=[0, 1, 2],
+    ...                   histogram_counts=[1, 3])
+    >>> new = ColumnStats("a", "int", "int64", histogram_edges=[0, 2, 4],
+    ...                   histogram_counts=[1, 1])
+    >>> get_histogram_shares(old, new)
+    (array([1., 0.]), array([0.5, 0.5]))
+    """
+    if len(old.histogram_counts) == 0 or len(new.histogram_counts) == 0:
+        return None
+    width = max(_get_bin_width(old), _get_bin_width(new))
+    old_bins = np.floor(np.array(old.histogram_edges[:-1]) / width)
+    new_bins = np.floor(np.array(new.histogram_edges[:-1]) / width)
+    bins = np.union1d(old_bins, new_bins)
+    shares = []
+    for column_bins, counts in [
+        (old_bins, old.histogram_counts),
+        (new_bins, new.histogram_counts),
+    ]:
+        merged = np.zeros(len(bins))
+        np.add.at(merged, np.searchsorted(bins, column_bins), counts)
+        shares.append(merged / merged.sum())
+    return shares[0], shares[1]
+
+
+def _get_bin_width(column_stats: ColumnStats) -> float:
+    edges = column_stats.histogram_edges
+    # Edges at the limits of float64 are clipped, so round to a power of two
+    return float(2.0 ** np.round(np.log2(edges[1] - edges[0])))
+
+
+def kolmogorov_smirnov(
+    old_cdf: Tuple[np.ndarray, np.ndarray], new_cdf: Tuple[np.ndarray, np.ndarray]
+) -> float:
+    """
+    Compute the largest difference of two cumulative distribution functions.
+
+    Both functions are piecewise linear with jumps at repeated quantiles, so
+    the largest difference is at one of their knots, just before or at it.
+
+    Parameters
+    ----------
+    old_cdf : Tuple[np.ndarray, np.ndarray]
+        Values and their cumulative probabilities, see _as_cdf
+    new_cdf : Tuple[np.ndarray, np.ndarray]
+
+    Returns
+    -------
+    ks : float
+        Between 0 and 1
+    """
+    knots = np.union1d(old_cdf[0], new_cdf[0])
+    return float(
+        max(
+            np.max(
+                np.abs(
+                    _evaluate_cdf(old_cdf, knots, side)
+                    - _evaluate_cdf(new_cdf, knots, side)
+                )
+            )
+            for side in ["left", "right"]
+        )
+    )
+
+
+def _as_cdf(quantiles: Dict[float, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the knots of the cumulative distribution function of quantiles."""
+    probabilities = np.array(list(quantiles.keys()))
+    # Estimated quantiles are not always monotonic
+    values = np.maximum.accumulate(np.array(list(quantiles.values())))
+    return values, probabilities
+
+
+def _evaluate_cdf(
+    cdf: Tuple[np.ndarray, np.ndarray], x: np.ndarray, side: str
+) -> np.ndarray:
+    """
+    Evaluate a cumulative distribution function, interpolating between knots.
+
+    With side='left', the limit from the left is evaluated, which differs
+    at jumps. Below the first knot, the function is 0, above the last it
+    is 1.
+    """
+    values, probabilities = cdf
+    if side == "left":
+        index = np.searchsorted(values, x, side="left")
+    else:
+        index = np.searchsorted(values, x, side="right")
+    inner = (index > 0) & (index < len(values))
+    result = np.where(index >= len(values), 1.0, 0.0)
+    # For inner points, values[index - 1] <= x < values[index] (side='right')
+    # or values[index - 1] < x <= values[index] (side='left')
+    lower = index[inner] - 1
+    upper = index[inner]
+    share = (x[inner] - values[lower]) / (values[upper] - values[lower])
+    result[inner] = probabilities[lower] + share * (
+        probabilities[upper] - probabilities[lower]
+    )
+    return result
+
+
+def _describe_column(
+    drift: ColumnDrift, column_stats: ColumnStats, prefix: str, stats: DatasetStats
+) -> ColumnDrift:
+    """Set the kind, the dtype and the share of nulls of one profile."""
+    setattr(drift, f"{prefix}_kind", column_stats.kind)
+    setattr(drift, f"{prefix}_dtype", column_stats.dtype)
+    if stats.nb_rows > 0:
+        setattr(drift, f"{prefix}_null_rate", column_stats.nb_null / stats.nb_rows)
+    return drift
+
+
+def _warn_if_only_quartiles(stats: DatasetStats, label: str) -> None:
+    """Warn if the PSI and KS of numeric columns are based on quartiles only."""
+    rough_columns = [
+        column.name
+        for column in stats.columns.values()
+        if column.kind in ["int", "float"]
+        and len(column.histogram_counts) == 0
+        and len(column.percentiles) == 0
+    ]
+    if len(rough_columns) > 0:
+        logger.warning(
+            f"The {label} profile has neither histograms nor percentiles besides "
+            f"the quartiles of {rough_columns}, so PSI and KS are rough. "
+            "Profile the file with edapy csv diff or with "
+            "edapy csv predict --percentiles"
+        )
+
+
+def _is_categorical(column_stats: ColumnStats) -> bool:
+    return (
+        column_stats.kind in ["category", "other"]
+        and 0 < column_stats.value_count <= MAX_CATEGORIES
+        # Profiles keep only the most common values of larger columns
+        and len(column_stats.value_list) == column_stats.value_count
+    )
+
+
+def _as_float(value: Optional[float]) -> Optional[float]:
+    """Convert a statistic to float, None if it is unknown."""
+    if value is None or np.isnan(value):
+        return None
+    return float(value)
+
+
+def _sorted(values: set) -> List[Any]:
+    return sorted(values, key=lambda value: (str(type(value)), str(value)))
+
+
+def read_profile(path: str) -> Optional[DatasetStats]:
+    """
+    Read a profile which edapy csv predict --output-format wrote.
+
+    Parameters
+    ----------
+    path : str
+        A JSON, YAML or Arrow (Feather) file
+
+    Returns
+    -------
+    stats : Optional[DatasetStats]
+        None if the file is no profile, e.g. a CSV or a Parquet file
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path) as fp:
+            return DatasetStats.from_dict(json.load(fp))
+    if extension in [".yaml", ".yml"]:
+        with open(path) as fp:
+            return DatasetStats.from_dict(yaml.safe_load(fp))
+    if importlib.util.find_spec("pyarrow") is None:
+        return None
+    # First party
+    from edapy.csv.arrow import STATS_SCHEMA, stats_from_table
+    from edapy.csv.dialect import sniff_file_format
+
+    if sniff_file_format(path) != "feather":
+        return None
+    # Third party
+    import pyarrow.feather as feather
+
+    table = feather.read_table(path)
+    if not table.schema.equals(STATS_SCHEMA):
+        return None
+    return stats_from_table(table)
+
+
+def format_drift(drift: DatasetDrift, only_drifted: bool = False) -> str:
+    """
+    Format the differences of two profiles as text.
+
+    Parameters
+    ----------
+    drift : DatasetDrift
+    only_drifted : bool
+        Leave out columns which did not change significantly
+
+    Returns
+    -------
+    report : str
+    """
+    lines = [
+        f"Number of datapoints: {drift.old_nb_rows} -> {drift.new_nb_rows}",
+        f"Drifted columns: {len(drift.drifted)} of {len(drift.columns)}",
+    ]
+    for column in drift.columns.values():
+        if only_drifted and not column.drifted:
+            continue
+        marker = " (drift)" if column.drifted else ""
+        lines.append(f"\n## {column.name}{marker}")
+        if column.status != "common":
+            lines.append(f"Column was {column.status}")
+            continue
+        if column.type_changed:
+            lines.append(
+                f"Type: {column.old_kind} ({column.old_dtype}) -> "
+                f"{column.new_kind} ({column.new_dtype})"
+            )
+        if column.old_null_rate is not None and column.new_null_rate is not None:
+            lines.append(
+                f"Null rate: {column.old_null_rate:.2%} -> {column.new_null_rate:.2%}"
+            )
+        if column.mean_shift is not None:
+            shift = f"Mean shift: {column.mean_shift:+.4g}"
+            if column.mean_shift_std is not None:
+                shift += f" ({column.mean_shift_std:+.2f} std)"
+            lines.append(shift)
+        if column.quantile_shifts:
+            lines.append(
+                "Quantile shifts: "
+                + ", ".join(
+                    f"{q * 100:g}%: {shift:+.4g}"
+                    for q, shift in column.quantile_shifts.items()
+                )
+            )
+        if column.psi is not None and column.ks is not None:
+            lines.append(f"PSI: {column.psi:.4f}  KS: {column.ks:.4f}")
+        if column.nb_new_values > 0:
+            lines.append(
+                f"New values ({column.nb_new_values}): {column.new_values}"[:200]
+            )
+        if column.nb_vanished_values > 0:
+            lines.append(
+                f"Vanished values ({column.nb_vanished_values}): "
+                f"{column.vanished_values}"[:200]
+            )
+    return "\n".join(lines)
@@ -0,0 +1,264 @@
+"""Recommend the narrowest dtype which can hold the values of each column."""
+
+# Core Library
+import importlib.util
+from typing import Any, Dict, List, Optional, Tuple
+
+# Third party
+import numpy as np
+
+# First party
+from edapy.csv.detectors import BOOL_TOKENS
+from edapy.csv.stats import ColumnStats, DatasetStats
+
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+MAX_DECLARED_CATEGORIES = 1000
+INTEGER_DTYPES = ["int8", "int16", "int32", "int64"]
+UNSIGNED_DTYPES = ["uint8", "uint16", "uint32", "uint64"]
+# Bytes of a Python str object without its characters, plus the pointer
+OBJECT_OVERHEAD = 49 + 8
+
+
+def recommend_dtype(
+    column_stats: ColumnStats,
+    column_type: Optional[str] = None,
+    date_format: Optional[str] = None,
+) -> str:
+    """
+    Get the narrowest dtype which can hold all values of a column.
+
+    Parameters
+    ----------
+    column_stats : ColumnStats
+    column_type : Optional[str]
+        The type from the types YAML, e.g. 'date'. It may be guessed from
+        the column name only, so string columns only become dates if their
+        date_format is known and booleans if all values are bool tokens
+    date_format : Optional[str]
+        The detected format of dates, e.g. '%Y-%m-%d'
+
+    Returns
+    -------
+    dtype : str
+        A dtype pd.read_csv understands, except for 'datetime64[ns]' and
+        'boolean' for string columns, which have to be converted after
+        reading
+
+    Examples
+    --------
+    >>> recommend_dtype(ColumnStats("a", "int", "int64", min=0, max=200))
+    'uint8'
+    >>> recommend_dtype(ColumnStats("a", "float", "float64", nb_null=1,
+    ...                             min=-3, max=7, has_frac=False,
+    ...                             is_integral=True))
+    'Int8'
+    """
+    dtype = column_stats.dtype
+    if dtype == "bool" or dtype.startswith("datetime64"):
+        return dtype
+    if dtype == "object":
+        return _recommend_object_dtype(column_stats, column_type, date_format)
+    if not (dtype.startswith("int") or dtype.startswith("uint") or dtype == "float64"):
+        return dtype
+    if column_stats.min is None or column_stats.max is None:
+        return "float32" if dtype.startswith("float") else dtype
+    if np.isnan(column_stats.min) or np.isnan(column_stats.max):
+        # Unknown, e.g. for statistics from the metadata of a Parquet file
+        return dtype
+    if dtype.startswith("float") and column_stats.has_frac is None:
+        return dtype
+    if dtype.startswith("float") and (
+        column_stats.has_frac or not column_stats.is_integral
+    ):
+        # Integer dtypes would round away even tiny fractions. Rare values
+        # lose precision first, so all values have to be known
+        if _has_all_values(column_stats) and _fits_float32(column_stats.value_list):
+            return "float32"
+        return dtype
+    integer_dtype = _smallest_integer_dtype(column_stats.min, column_stats.max)
+    if column_stats.nb_null > 0:
+        # Nullable extension types, as NaN does not fit into numpy integers
+        return integer_dtype.capitalize().replace("Uint", "UInt")
+    return integer_dtype
+
+
+def recommend_dtypes(columns: List[Dict[str, Any]], stats: DatasetStats) -> None:
+    """
+    Add the recommended dtype to the column entries of a types YAML.
+
+    Categorical columns with at most MAX_DECLARED_CATEGORIES values which
+    were all counted also get their 'categories', so that loading does not
+    need to find them. Entries which have a recommended dtype already, e.g.
+    from the metadata of a converted file, keep it.
+
+    Parameters
+    ----------
+    columns : List[Dict[str, Any]]
+        As generated by edapy.csv.interactive_type_finder.find_type
+    stats : DatasetStats
+    """
+    for entry in columns:
+        if entry["name"] not in stats.columns or "recommended_dtype" in entry:
+            continue
+        column_stats = stats.columns[entry["name"]]
+        entry["recommended_dtype"] = recommend_dtype(
+            column_stats, entry.get("type"), entry.get("format")
+        )
+        if (
+            entry["recommended_dtype"] == "category"
+            and _has_all_values(column_stats)
+            and column_stats.value_count <= MAX_DECLARED_CATEGORIES
+        ):
+            entry["categories"] = sorted(
+                str(value) for value in column_stats.value_list
+            )
+
+
+def project_memory(stats: DatasetStats, recommended: Dict[Any, str]) -> Tuple[int, int]:
+    """
+    Estimate the memory of a dataframe with the parsed and recommended dtypes.
+
+    Parameters
+    ----------
+    stats : DatasetStats
+    recommended : Dict[Any, str]
+        Maps column names to recommended dtypes
+
+    Returns
+    -------
+    original_bytes, optimized_bytes : Tuple[int, int]
+    """
+    original, optimized = 0, 0
+    for column_name, column_stats in stats.columns.items():
+        original += estimate_memory(column_stats, column_stats.dtype, stats.nb_rows)
+        optimized += estimate_memory(
+            column_stats,
+            recommended.get(column_name, column_stats.dtype),
+            stats.nb_rows,
+        )
+    return original, optimized
+
+
+def estimate_memory(column_stats: ColumnStats, dtype: str, nb_rows: int) -> int:
+    """
+    Estimate the bytes a column needs with the given dtype.
+
+    Strings are estimated from the mean length of the most common values.
+
+    Parameters
+    ----------
+    column_stats : ColumnStats
+    dtype : str
+    nb_rows : int
+
+    Returns
+    -------
+    nb_bytes : int
+
+    Examples
+    --------
+    >>> estimate_memory(ColumnStats("a", "int", "int64"), "int16", 1000)
+    2000
+    """
+    if dtype == "category":
+        codes = np.dtype(_smallest_integer_dtype(0, column_stats.value_count))
+        categories = column_stats.value_count * _string_bytes(column_stats)
+        return nb_rows * codes.itemsize + categories
+    if dtype == "object":
+        return nb_rows * _string_bytes(column_stats)
+    if dtype.startswith("string"):
+        # Offsets and validity bits of the Arrow array, plus the characters
+        mean_length = _string_bytes(column_stats) - OBJECT_OVERHEAD
+        return int(nb_rows * (4 + 1 / 8 + column_stats.non_nan / nb_rows * mean_length))
+    if dtype == "boolean":
+        return nb_rows * 2
+    if dtype[0].isupper():
+        # Values and a mask of nullable extension types
+        return nb_rows * (np.dtype(dtype.lower()).itemsize + 1)
+    return nb_rows * np.dtype(dtype).itemsize
+
+
+def _recommend_object_dtype(
+    column_stats: ColumnStats, column_type: Optional[str], date_format: Optional[str]
+) -> str:
+    if column_type == "date" and date_format is not None:
+        return "datetime64[ns]"
+    if column_type == "bool" and _has_only_bool_tokens(column_stats):
+        return "boolean"
+    if (
+        column_stats.is_counted
+        and column_stats.value_count <= CATEGORY_MAX_UNIQUE_RATIO * column_stats.non_nan
+    ):
+        return "category"
+    if importlib.util.find_spec("pyarrow") is not None:
+        return "string[pyarrow]"
+    return "object"
+
+
+def _has_all_values(column_stats: ColumnStats) -> bool:
+    """Check if value_list holds all values, not only the most common ones."""
+    return (
+        column_stats.is_counted
+        and not column_stats.approximate
+        and len(column_stats.value_list) == column_stats.value_count
+    )
+
+
+def _has_only_bool_tokens(column_stats: ColumnStats) -> bool:
+    """Check if all values were counted and each is a token like 'yes'."""
+    return _has_all_values(column_stats) and all(
+        str(value).strip().lower() in BOOL_TOKENS for value in column_stats.value_list
+    )
+
+
+def _smallest_integer_dtype(min_: float, max_: float) -> str:
+    """
+    Get the smallest numpy integer dtype which holds min_ and max_.
+
+    Examples
+    --------
+    >>> _smallest_integer_dtype(-1, 127)
+    'int8'
+    >>> _smallest_integer_dtype(0, 70000)
+    'uint32'
+    """
+    candidates = UNSIGNED_DTYPES if min_ >= 0 else INTEGER_DTYPES
+    for candidate in candidates:
+        info = np.iinfo(candidate)
+        if info.min <= min_ and max_ <= info.max:
+            return candidate
+    return "int64"
+
+
+def _fits_float32(values: List[Any]) -> bool:
+    """
+    Check if the values keep their decimal representation as float32.
+
+    This is guaranteed for values with at most 6 significant digits.
+
+    Examples
+    --------
+    >>> _fits_float32([95.38, 0.5, 0])
+    True
+    >>> _fits_float32([82521653.5])
+    False
+    """
+    array = np.asarray(values, dtype=np.float64)
+    array = array[np.isfinite(array) & (array != 0)]
+    if len(array) == 0:
+        return True
+    if np.abs(array).max() > np.finfo(np.float32).max:
+        return False
+    digits = np.finfo(np.float32).precision
+    scale = 10.0 ** (digits - np.ceil(np.log10(np.abs(array))))
+    rounded = np.round(array * scale) / scale
+    return bool(np.all(np.abs(rounded - array) <= 1e-12 * np.abs(array)))
+
+
+def _string_bytes(column_stats: ColumnStats) -> int:
+    """Estimate the bytes of a Python str of this column, plus its pointer."""
+    examples = column_stats.value_list[:1000]
+    if len(examples) == 0:
+        return OBJECT_OVERHEAD
+    mean_length = np.mean([len(str(value)) for value in examples])
+    return OBJECT_OVERHEAD + int(np.ceil(mean_length))
@@ -0,0 +1,178 @@
+"""
+Profile append-only CSV files incrementally.
+
+The state of a profile is the mergeable accumulator, the byte offset up to
+which the file was read and hashes of the head and of the bytes before that
+offset. If the file only grew, the next run parses the appended tail and
+merges it into the accumulator, so its cost is proportional to the number
+of new bytes. If the file was rewritten or truncated, everything is
+profiled again.
+"""
+
+# Core Library
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Third party
+import pandas as pd
+
+# First party
+from edapy.csv.cache import CACHE_VERSION
+from edapy.csv.compression import detect_compression
+from edapy.csv.dialect import CsvDialect, sniff_dialect
+from edapy.csv.sharding import (
+    DEFAULT_CHUNKSIZE,
+    find_data_start,
+    find_last_record_border,
+    profile_shard,
+)
+from edapy.csv.streaming import AccumulatorConfig, DatasetAccumulator
+
+logger = logging.getLogger(__name__)
+
+HEAD_HASH_SIZE = 64 * 1024
+TAIL_HASH_SIZE = 4 * 1024
+
+
+@dataclass
+class IncrementalState:
+    """
+    A profile of the first bytes of a CSV file which can be continued.
+
+    Parameters
+    ----------
+    offset : int
+        End of the last record which was profiled
+    head_size : int
+        Number of bytes at the start of the file which head_hash covers
+    head_hash : str
+    tail_hash : str
+        Hash of the TAIL_HASH_SIZE bytes before offset
+    names : List[str]
+        The column names
+    accumulator : DatasetAccumulator
+    """
+
+    offset: int
+    head_size: int
+    head_hash: str
+    tail_hash: str
+    names: List[str]
+    accumulator: DatasetAccumulator
+
+
+def state_key(csv_path: str, options: Dict[str, Any]) -> str:
+    """
+    Get the key of the incremental state of a file with the given options.
+
+    Unlike edapy.csv.cache.ProfileCache.key, the key does not depend on the
+    content of the file, so that the state is found after the file grew.
+
+    Parameters
+    ----------
+    csv_path : str
+    options : Dict[str, Any]
+        Everything which changes the accumulator, e.g. the dialect
+
+    Returns
+    -------
+    key : str
+    """
+    options_str = json.dumps(options, sort_keys=True, default=str)
+    path = os.path.abspath(csv_path)
+    return hashlib.sha256(
+        f"{CACHE_VERSION}\0incremental\0{path}\0{options_str}".encode()
+    ).hexdigest()
+
+
+def profile_csv_incremental(
+    csv_path: str,
+    state: Optional[IncrementalState] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    dialect: Optional[CsvDialect] = None,
+    config: Optional[AccumulatorConfig] = None,
+) -> IncrementalState:
+    """
+    Profile the records which were appended to a CSV file since the last run.
+
+    A record which is not terminated by a newline yet is left for the next
+    run, as it might still be written.
+
+    Parameters
+    ----------
+    csv_path : str
+    state : Optional[IncrementalState]
+        The state of the last run. Everything is profiled if it is None or
+        if the file was not only appended to since then.
+    chunksize : int
+        Number of rows which are read at once
+    dialect : Optional[CsvDialect]
+        Sniffed from the head of the file if it is not given
+    config : Optional[AccumulatorConfig]
+
+    Returns
+    -------
+    state : IncrementalState
+        The state after this run. It shares the accumulator with the given
+        state, which is updated in place.
+    """
+    if dialect is None:
+        dialect = sniff_dialect(csv_path)
+    if dialect.encoding == "utf-16":
+        raise ValueError("UTF-16 encoded files can not be profiled incrementally")
+    if detect_compression(csv_path) is not None:
+        raise ValueError("Compressed files can not be profiled incrementally")
+    read_kwargs = dialect.read_csv_kwargs()
+    if state is not None and not _is_continuation(csv_path, state, config):
+        logger.info(f"'{csv_path}' was rewritten, profiling it completely")
+        state = None
+    if state is None:
+        names = pd.read_csv(csv_path, nrows=0, **read_kwargs).columns.tolist()
+        start = find_data_start(csv_path, dialect.quotechar, dialect.has_header)
+        accumulator = DatasetAccumulator(config)
+        head_size = min(os.path.getsize(csv_path), HEAD_HASH_SIZE)
+        head_hash = _hash_range(csv_path, 0, head_size)
+    else:
+        names = state.names
+        start = state.offset
+        accumulator = state.accumulator
+        head_size, head_hash = state.head_size, state.head_hash
+    end = find_last_record_border(csv_path, start, dialect.quotechar)
+    if end > start:
+        logger.info(f"Profiling {end - start} new bytes of '{csv_path}'")
+        del read_kwargs["header"]
+        accumulator.merge(
+            profile_shard(csv_path, start, end, names, read_kwargs, chunksize, config)
+        )
+    return IncrementalState(
+        offset=end,
+        head_size=head_size,
+        head_hash=head_hash,
+        tail_hash=_hash_range(csv_path, max(end - TAIL_HASH_SIZE, 0), end),
+        names=names,
+        accumulator=accumulator,
+    )
+
+
+def _is_continuation(
+    csv_path: str, state: IncrementalState, config: Optional[AccumulatorConfig]
+) -> bool:
+    """Check if the file still starts with the bytes the state was made of."""
+    if state.accumulator.config != config:
+        return False
+    if os.path.getsize(csv_path) < state.offset:
+        return False
+    if _hash_range(csv_path, 0, state.head_size) != state.head_hash:
+        return False
+    tail_start = max(state.offset - TAIL_HASH_SIZE, 0)
+    return _hash_range(csv_path, tail_start, state.offset) == state.tail_hash
+
+
+def _hash_range(path: str, start: int, end: int) -> str:
+    with open(path, "rb") as fp:
+        fp.seek(start)
+        return hashlib.sha256(fp.read(end - start)).hexdigest()
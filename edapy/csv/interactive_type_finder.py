@@ -62,57 +62,238 @@ To be considered:
 
 # Core Library
 import collections
-import numbers
 import operator
 from contextlib import suppress
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 # Third party
 import numpy as np
 import pandas as pd
 
+# First party
+from edapy.csv.detectors import Detection, detect_type
+from edapy.csv.sketches import sketch_value_counts
+from edapy.csv.stats import ColumnStats, DatasetStats, has_frac  # noqa: F401
+
 types = ["int", "float", "category", "date", "bool", "text", "identifier"]
 
 
-def find_type(df) -> List[Dict]:
+def find_type(
+    df,
+    sketch_error: Optional[float] = None,
+    sample_size: Optional[int] = None,
+    seed: int = 0,
+) -> List[Dict]:
     """
     Figure out the types of a pandas dataframe.
 
     Parameters
     ----------
     df : Pandas dataframe
+    sketch_error : Optional[float]
+        If given, the examples and the number of unique values are estimated
+        with sketches of this relative error instead of being counted
+        exactly. Columns where this made a difference get
+        'approximate: True'.
+    sample_size : Optional[int]
+        If given and the dataframe has more rows, the types are inferred
+        from a random sample of this many rows. Each column then gets a
+        'confidence', see type_confidence. Minimum and maximum are always
+        computed on all rows.
+    seed : int
+        Seed of the random sample
 
     Returns
     -------
     columns : List[Dict]
         One dict for each column
     """
+    sampled = sample_size is not None and len(df) > sample_size
+    if sampled:
+        rows = np.random.default_rng(seed).choice(len(df), sample_size, replace=False)
+        sample = df.iloc[np.sort(rows)]
+    else:
+        sample = df
     columns = []
     for column_name in df:
-        examples = df[column_name].value_counts().head(3).index.tolist()
-        processed_examples = []
-        for el in examples:
-            if isinstance(el, bool):
-                el = el  # do nothing
-            if isinstance(el, (float, int, np.float32, np.float64, np.int64)):
-                with suppress(Exception):
-                    el = el.item()  # type: ignore
-            elif not isinstance(el, (bool,)):
-                el = str(el)
-            processed_examples.append(el)
-        entry: Dict[str, Any] = collections.OrderedDict()
-        entry["name"] = column_name
-        probabilities = get_type_probabilities(df[column_name], column_name)
-        entry["type"] = argmax(probabilities)
-        entry["dtype"] = str(df[column_name].dtype)
-        entry["examples"] = processed_examples
-        if np.issubdtype(df[column_name].dtype, np.number):
-            entry["min"] = float(df[column_name].min())
-            entry["max"] = float(df[column_name].max())
+        column = sample[column_name]
+        is_numeric = np.issubdtype(column.dtype, np.number)
+        has_fraction = bool(is_numeric) and has_frac(column)
+        approximate = False
+        if sketch_error is None:
+            value_counts = column.value_counts()
+            examples = value_counts.head(3).index.tolist()
+            unique_values = len(value_counts)
+        else:
+            sketch = sketch_value_counts(column, sketch_error)
+            examples = sketch.top_values().head(3).index.tolist()
+            unique_values = sketch.distinct_count()
+            approximate = not sketch.is_exact
+        detection = None
+        if column.dtype == object:
+            detection = detect_type(column, column_name)
+        probabilities = _get_type_probabilities(
+            column.dtype, column_name, unique_values, has_fraction, detection
+        )
+        min_max = None
+        if is_numeric:
+            min_max = (df[column_name].min(), df[column_name].max())
+        entry = _make_entry(
+            column_name,
+            column.dtype,
+            examples,
+            probabilities,
+            min_max,
+            approximate,
+            detection,
+        )
+        if sampled:
+            entry["confidence"] = type_confidence(
+                len(column) - int(column.isnull().sum()),
+                np.issubdtype(column.dtype, np.floating) and not has_fraction,
+                unique_values <= 2,
+            )
         columns.append(entry)
     return columns
 
 
+def type_confidence(
+    nb_sampled: int, needs_no_fraction: bool, needs_few_values: bool
+) -> float:
+    """
+    Get the confidence in a type which was inferred from a sample.
+
+    A fraction or a third different value in the sample settles the type,
+    but their absence does not prove that the rest of the column has none.
+    If the type depends on such an absence, the confidence is the share of
+    rows which agree with it in the worst case which is consistent with the
+    sample at 95 % (the rule of three: 1 - 3 / nb_sampled).
+
+    Parameters
+    ----------
+    nb_sampled : int
+        Number of non-null values in the sample
+    needs_no_fraction : bool
+        True if the type assumes that no value has a fraction
+    needs_few_values : bool
+        True if the type assumes that there are at most two different values
+
+    Returns
+    -------
+    confidence : float
+        Between 0 and 1
+
+    Examples
+    --------
+    >>> type_confidence(1000, needs_no_fraction=False, needs_few_values=False)
+    1.0
+    >>> type_confidence(1000, needs_no_fraction=True, needs_few_values=False)
+    0.997
+    """
+    if not (needs_no_fraction or needs_few_values):
+        return 1.0
+    if nb_sampled == 0:
+        return 0.0
+    return max(0.0, 1 - 3 / nb_sampled)
+
+
+def find_type_from_stats(stats: DatasetStats) -> List[Dict]:
+    """
+    Figure out the types of columns from precomputed statistics.
+
+    This gives the same result as find_type, but does not need the data.
+
+    Parameters
+    ----------
+    stats : DatasetStats
+
+    Returns
+    -------
+    columns : List[Dict]
+        One dict for each column
+    """
+    columns = []
+    for column_stats in stats.columns.values():
+        detection = None
+        if column_stats.dtype == "object":
+            detection = detect_type(
+                pd.Series(column_stats.value_list, dtype=object), column_stats.name
+            )
+        probabilities = _get_type_probabilities(
+            column_stats.dtype,
+            column_stats.name,
+            _get_unique_values(column_stats),
+            _has_fraction(column_stats),
+            detection,
+        )
+        min_max = None
+        if column_stats.min is not None and column_stats.max is not None:
+            min_max = (column_stats.min, column_stats.max)
+        columns.append(
+            _make_entry(
+                column_stats.name,
+                column_stats.dtype,
+                column_stats.value_list[:3],
+                probabilities,
+                min_max,
+                column_stats.approximate,
+                detection,
+            )
+        )
+    return columns
+
+
+def _get_unique_values(column_stats: ColumnStats) -> int:
+    """Get the number of unique values or an upper bound if they were not counted."""
+    if column_stats.is_counted:
+        return column_stats.value_count
+    # Not counted, e.g. for statistics from the metadata of a Parquet file
+    if column_stats.dtype == "bool":
+        return 2
+    return column_stats.non_nan
+
+
+def _has_fraction(column_stats: ColumnStats) -> bool:
+    """Check for fractions. Floats are assumed to have them if it is unknown."""
+    if column_stats.has_frac is None:
+        return column_stats.dtype.startswith("float") and column_stats.non_nan > 0
+    return column_stats.has_frac
+
+
+def _make_entry(
+    column_name: str,
+    column_dtype: Any,
+    examples: List[Any],
+    probabilities: Dict[str, float],
+    min_max: Optional[Tuple[Any, Any]],
+    approximate: bool = False,
+    detection: Optional[Detection] = None,
+) -> Dict[str, Any]:
+    processed_examples = []
+    for el in examples:
+        if isinstance(el, bool):
+            el = el  # do nothing
+        if isinstance(el, (float, int, np.float32, np.float64, np.int64)):
+            with suppress(Exception):
+                el = el.item()  # type: ignore
+        elif not isinstance(el, (bool,)):
+            el = str(el)
+        processed_examples.append(el)
+    entry: Dict[str, Any] = collections.OrderedDict()
+    entry["name"] = column_name
+    entry["type"] = argmax(probabilities)
+    entry["dtype"] = str(column_dtype)
+    entry["examples"] = processed_examples
+    if min_max is not None:
+        entry["min"] = float(min_max[0])
+        entry["max"] = float(min_max[1])
+    if detection is not None and detection.date_format is not None:
+        entry["format"] = detection.date_format
+    if approximate:
+        entry["approximate"] = True
+    return entry
+
+
 def argmax(dict_: Dict):
     """
     Get the argmax.
@@ -155,35 +336,6 @@ def normalize(dict_: Dict) -> Dict:
     return dict_
 
 
-def has_frac(df_column: pd.Series) -> bool:
-    """
-    Check if one of the values is a fraction.
-
-    Parameters
-    ----------
-    df_column : pd.Series
-
-    Returns
-    -------
-    has_fraction : bool
-
-    Examples
-    --------
-    >>> has_frac(pd.Series([1.0, 2.0]))
-    False
-    >>> has_frac(pd.Series([1.0, 2.1]))
-    True
-    """
-    epsilon = 10**-4
-    for el in df_column.tolist():
-        if not isinstance(el, numbers.Number):
-            return False
-        rounded = round(el)  # type: ignore
-        if abs(el - rounded) > epsilon:
-            return True
-    return False
-
-
 def get_type_probabilities(column: pd.Series, column_name: str) -> Dict[str, float]:
     """
     Estimate how likely the different types are.
@@ -198,29 +350,47 @@ def get_type_probabilities(column: pd.Series, column_name: str) -> Dict[str, flo
     type_probabilites : Dict[str, float]
         maps (type name => probability)
     """
+    return _get_type_probabilities(
+        column.dtype,
+        column_name,
+        column.nunique(),
+        np.issubdtype(column.dtype, np.number) and has_frac(column),
+        detect_type(column, column_name) if column.dtype == object else None,
+    )
+
+
+def _get_type_probabilities(
+    column_dtype: Any,
+    column_name: str,
+    unique_values: int,
+    has_fraction: bool,
+    detection: Optional[Detection] = None,
+) -> Dict[str, float]:
     type_probs = {type_name: 1.0 / len(types) for type_name in types}
-    unique_values = len(column.value_counts())
     if unique_values > 2:
         type_probs["bool"] = 0
     else:
         type_probs["bool"] *= 2
-    if np.issubdtype(column.dtype, np.number):
-        if has_frac(column):
+    if np.issubdtype(column_dtype, np.number):
+        if has_fraction:
             type_probs["int"] = 0
             type_probs["category"] /= 2
             type_probs["date"] /= 2
-        if np.issubdtype(column.dtype, np.int64):
+        if np.issubdtype(column_dtype, np.int64):
             type_probs["int"] *= 2
     else:
         type_probs["float"] = 0
         type_probs["int"] = 0
-        column_lower = column_name.lower()
+        column_lower = str(column_name).lower()
         if "date" in column_lower or "time" in column_lower:
             type_probs["date"] *= 2
         if "_id" in column_lower or column_lower == "id":
             type_probs["identifier"] *= 2
         if "description" in column_lower:
             type_probs["text"] *= 2
+        if detection is not None:
+            # All sampled values matched, which beats any hint from the name
+            type_probs[detection.type] *= 8
     return normalize(type_probs)
 
 
@@ -0,0 +1,237 @@
+"""Load CSV files with the arguments the types YAML gives for each column."""
+
+# Core Library
+import dataclasses
+import functools
+import importlib.util
+import inspect
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+# Third party
+import pandas as pd
+import yaml
+
+# First party
+from edapy.csv.compression import open_csv
+from edapy.csv.detectors import to_bool
+from edapy.csv.dialect import CsvDialect
+
+# pandas < 2.0 can not parse dates with an explicit format while reading
+READ_CSV_HAS_DATE_FORMAT = "date_format" in inspect.signature(pd.read_csv).parameters
+
+
+@dataclass
+class ReadPlan:
+    """
+    The arguments for pd.read_csv and the conversions after reading.
+
+    Parameters
+    ----------
+    read_kwargs : Dict[str, Any]
+    date_formats : Dict[str, str]
+        Maps columns to the format of the dates they contain, for columns
+        which pd.read_csv can not parse itself
+    bool_columns : List[str]
+        Columns with bool tokens like 'yes' and 'no'
+    """
+
+    read_kwargs: Dict[str, Any]
+    date_formats: Dict[str, str] = field(default_factory=dict)
+    bool_columns: List[str] = field(default_factory=list)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert the columns which pd.read_csv could not."""
+        for column_name, date_format in self.date_formats.items():
+            df[column_name] = pd.to_datetime(
+                df[column_name], format=date_format, errors="coerce"
+            )
+        for column_name in self.bool_columns:
+            df[column_name] = to_bool(df[column_name])
+        return df
+
+
+def load_csv(
+    csv_path: str,
+    yaml_path: str,
+    usecols: Optional[Sequence[str]] = None,
+    chunksize: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Load a CSV file as a Pandas dataframe.
+
+    Columns are loaded with their 'recommended_dtype' if the YAML has one.
+    Otherwise, string columns of the type 'category' are loaded as
+    categoricals. String columns of the type 'date' with a 'format' are
+    converted to datetime64 and 'bool' columns to the nullable boolean
+    dtype. All of these need less memory than the dtypes pandas infers.
+    If the YAML lists the 'categories' of a column, values which are not
+    among them are loaded as missing.
+
+    Parameters
+    ----------
+    csv_path : str
+    yaml_path : str
+    usecols : Optional[Sequence[str]]
+        Only load these columns
+    chunksize : Optional[int]
+        If given, return an iterator over dataframes of this many rows
+    engine : Optional[str]
+        'c' or 'pyarrow'. By default, pyarrow is used if it is installed
+        and supports the file
+
+    Returns
+    -------
+    df : Union[pd.DataFrame, Iterator[pd.DataFrame]]
+    """
+    stat = os.stat(yaml_path)
+    csv_info = _read_types(os.path.abspath(yaml_path), stat.st_mtime_ns)
+    plan = compile_types(csv_info, usecols=usecols, chunksize=chunksize, engine=engine)
+    if chunksize is None:
+        with open_csv(csv_path) as source:
+            return plan.apply(pd.read_csv(source, **plan.read_kwargs))
+    return _iter_chunks(csv_path, plan, chunksize)
+
+
+def compile_types(
+    csv_info: Dict[str, Any],
+    usecols: Optional[Sequence[str]] = None,
+    chunksize: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> ReadPlan:
+    """
+    Compile the content of a types YAML into arguments for pd.read_csv.
+
+    Parameters
+    ----------
+    csv_info : Dict[str, Any]
+        The content of the types YAML. Missing value markers can be given
+        for all columns as 'na_values' in the 'csv_meta' and for single
+        columns as 'na_values' of the column.
+    usecols : Optional[Sequence[str]]
+        Only load these columns
+    chunksize : Optional[int]
+        The pyarrow engine can not read in chunks
+    engine : Optional[str]
+        'c' or 'pyarrow'. Chosen automatically by default
+
+    Returns
+    -------
+    plan : ReadPlan
+    """
+    csv_meta = csv_info.get("csv_meta", {})
+    fields = {field.name for field in dataclasses.fields(CsvDialect)}
+    dialect = CsvDialect(**{key: csv_meta[key] for key in fields & csv_meta.keys()})
+    columns = csv_info["columns"]
+    if usecols is not None:
+        unknown = set(usecols) - {col["name"] for col in columns}
+        if unknown:
+            raise ValueError(f"Columns {sorted(unknown)} are not in the types YAML")
+        columns = [col for col in columns if col["name"] in usecols]
+    # Copies, as the lists of the cached types YAML must not grow
+    na_values: Dict[str, List[str]] = {
+        col["name"]: list(col["na_values"]) for col in columns if "na_values" in col
+    }
+    if engine is None:
+        engine = _choose_engine(dialect, chunksize, na_values)
+    read_kwargs = {
+        key: value
+        for key, value in dialect.read_csv_kwargs().items()
+        if value is not None
+    }
+    read_kwargs["engine"] = engine
+    if not dialect.has_header:
+        read_kwargs["names"] = [col["name"] for col in csv_info["columns"]]
+    if usecols is not None:
+        read_kwargs["usecols"] = [col["name"] for col in columns]
+    plan = ReadPlan(read_kwargs=read_kwargs)
+    _add_dtypes(plan, columns)
+    if na_values:
+        for col in columns:
+            na_values.setdefault(col["name"], []).extend(csv_meta.get("na_values", []))
+        read_kwargs["na_values"] = na_values
+    elif "na_values" in csv_meta:
+        read_kwargs["na_values"] = list(csv_meta["na_values"])
+    return plan
+
+
+def _add_dtypes(plan: ReadPlan, columns: List[Dict[str, Any]]) -> None:
+    """
+    Add the dtypes of the columns to a ReadPlan.
+
+    Dates are parsed by pd.read_csv if it supports date_format and by the
+    plan otherwise. Dates without a format stay strings. Booleans are
+    always converted by the plan.
+    """
+    dtype: Dict[str, Any] = {}
+    parse_dates: List[str] = []
+    date_format: Dict[str, str] = {}
+    for col in columns:
+        name = col["name"]
+        column_dtype = _get_load_dtype(col)
+        if col["dtype"] == "object" and column_dtype == "datetime64[ns]":
+            if col.get("format") is None:
+                # Strings which are no dates in a known format are kept
+                dtype[name] = "object"
+            elif READ_CSV_HAS_DATE_FORMAT:
+                parse_dates.append(name)
+                date_format[name] = col["format"]
+            else:
+                plan.date_formats[name] = col["format"]
+            continue
+        if col["dtype"] == "object" and column_dtype == "boolean":
+            plan.bool_columns.append(name)
+            continue
+        dtype[name] = column_dtype
+    plan.read_kwargs["dtype"] = dtype
+    if parse_dates:
+        plan.read_kwargs["parse_dates"] = parse_dates
+        plan.read_kwargs["date_format"] = date_format
+
+
+def _get_load_dtype(col: Dict[str, Any]) -> Any:
+    """Get the dtype a column of the types YAML is loaded with."""
+    if col.get("type") == "date" and "format" in col and col["dtype"] == "object":
+        return "datetime64[ns]"
+    if (
+        col.get("type") == "bool"
+        and col["dtype"] == "object"
+        and col.get("recommended_dtype", "boolean") == "boolean"
+    ):
+        return "boolean"
+    column_dtype = col.get("recommended_dtype", col["dtype"])
+    if col.get("type") == "category" and col["dtype"] == "object":
+        column_dtype = col.get("recommended_dtype", "category")
+    if column_dtype == "category" and "categories" in col:
+        return pd.CategoricalDtype(col["categories"])
+    return column_dtype
+
+
+def _choose_engine(
+    dialect: CsvDialect, chunksize: Optional[int], na_values: Dict[str, List[str]]
+) -> str:
+    """Use pyarrow, unless it is not installed or can not read the file."""
+    if (
+        chunksize is None
+        and dialect.escapechar is None
+        and not na_values
+        and importlib.util.find_spec("pyarrow") is not None
+    ):
+        return "pyarrow"
+    return "c"
+
+
+def _iter_chunks(csv_path: str, plan: ReadPlan, chunksize: int):
+    with open_csv(csv_path) as source:
+        with pd.read_csv(source, chunksize=chunksize, **plan.read_kwargs) as reader:
+            for chunk in reader:
+                yield plan.apply(chunk)
+
+
+@functools.lru_cache(maxsize=64)
+def _read_types(yaml_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Read a types YAML. Parsed files are cached until they change."""
+    with open(yaml_path) as stream:
+        return yaml.safe_load(stream)
@@ -0,0 +1,296 @@
+"""Profile a CSV file in parallel by splitting it into byte ranges."""
+
+# Core Library
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# Third party
+import pandas as pd
+
+# First party
+from edapy.csv.compression import detect_compression
+from edapy.csv.dialect import CsvDialect, sniff_dialect
+from edapy.csv.streaming import AccumulatorConfig, DatasetAccumulator
+
+DEFAULT_CHUNKSIZE = 100000
+
+
+def find_shards(
+    csv_path: str,
+    nb_shards: int,
+    quotechar: Optional[str] = '"',
+    has_header: bool = True,
+    block_size: int = 2**20,
+) -> List[Tuple[int, int]]:
+    """
+    Split a CSV file into byte ranges which start and end at record borders.
+
+    A newline only ends a record if an even number of quote characters
+    precedes it. As this parity can only be known by looking at everything
+    before a position, the file is scanned sequentially up to the last
+    border. Counting bytes is much cheaper than parsing, so this is not the
+    bottleneck. Escape characters other than doubled quotes are not
+    supported.
+
+    Parameters
+    ----------
+    csv_path : str
+    nb_shards : int
+    quotechar : Optional[str]
+        None if values are never quoted
+    has_header : bool
+    block_size : int
+        Number of bytes which are scanned at once
+
+    Returns
+    -------
+    shards : List[Tuple[int, int]]
+        (start, end) byte offsets. The header line is not part of any shard.
+    """
+    file_size = os.path.getsize(csv_path)
+    quote = quotechar.encode("utf8") if quotechar else None
+    with open(csv_path, "rb") as fp:
+        data_start = 0
+        if has_header:
+            data_start = _find_record_borders(fp, [0], quote, block_size)[0]
+        data_size = file_size - data_start
+        targets = [data_start + data_size * i // nb_shards for i in range(1, nb_shards)]
+        fp.seek(0)
+        borders = _find_record_borders(fp, targets, quote, block_size)
+    offsets = sorted({data_start, file_size} | set(borders))
+    return [(start, end) for start, end in zip(offsets, offsets[1:]) if start < end]
+
+
+def _find_record_borders(
+    fp, targets: List[int], quote: Optional[bytes], block_size: int
+) -> List[int]:
+    """
+    Find the first record border at or after each of the targets.
+
+    fp has to be positioned at the start of the file.
+    """
+    borders: List[int] = []
+    remaining = sorted(targets)
+    pos = 0
+    in_quotes = False
+    while remaining:
+        block = fp.read(block_size)
+        if not block:
+            break
+        # Parity of quotes between the block start and `checked`
+        checked, parity = 0, in_quotes
+        while remaining and remaining[0] < pos + len(block):
+            newline = block.find(b"\n", max(remaining[0] - pos, checked))
+            if newline == -1:
+                break
+            if quote is not None:
+                parity ^= block.count(quote, checked, newline) % 2 == 1
+            checked = newline
+            if not parity:
+                borders.append(pos + newline + 1)
+                remaining.pop(0)
+            else:
+                checked = newline + 1
+        if quote is not None:
+            in_quotes = parity ^ (block.count(quote, checked) % 2 == 1)
+        pos += len(block)
+    return borders + [pos] * len(remaining)
+
+
+def find_data_start(
+    csv_path: str, quotechar: Optional[str] = '"', has_header: bool = True
+) -> int:
+    """
+    Get the byte offset of the first record after the header.
+
+    Parameters
+    ----------
+    csv_path : str
+    quotechar : Optional[str]
+    has_header : bool
+
+    Returns
+    -------
+    offset : int
+    """
+    if not has_header:
+        return 0
+    quote = quotechar.encode("utf8") if quotechar else None
+    with open(csv_path, "rb") as fp:
+        return _find_record_borders(fp, [0], quote, 2**20)[0]
+
+
+def find_last_record_border(
+    csv_path: str,
+    start: int,
+    quotechar: Optional[str] = '"',
+    block_size: int = 2**20,
+) -> int:
+    """
+    Get the end of the last complete record after a record border.
+
+    Bytes after the last newline which is not quoted belong to a record
+    which is still being written.
+
+    Parameters
+    ----------
+    csv_path : str
+    start : int
+        A record border, e.g. the end of the previously read records
+    quotechar : Optional[str]
+    block_size : int
+
+    Returns
+    -------
+    end : int
+        start if there is no complete record after start
+    """
+    quote = quotechar.encode("utf8") if quotechar else None
+    border = start
+    in_quotes = False
+    pos = start
+    with open(csv_path, "rb") as fp:
+        fp.seek(start)
+        while True:
+            block = fp.read(block_size)
+            if not block:
+                break
+            checked = 0
+            newline = block.find(b"\n")
+            while newline != -1:
+                if quote is not None:
+                    in_quotes ^= block.count(quote, checked, newline) % 2 == 1
+                checked = newline
+                if not in_quotes:
+                    border = pos + newline + 1
+                newline = block.find(b"\n", newline + 1)
+            if quote is not None:
+                in_quotes ^= block.count(quote, checked) % 2 == 1
+            pos += len(block)
+    return border
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view on the bytes [start, end) of a file."""
+
+    def __init__(self, path: str, start: int, end: int):
+        self._fp = open(path, "rb")
+        self._fp.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        nb_read = self._fp.readinto(memoryview(buffer)[:size])
+        self._remaining -= nb_read
+        return nb_read
+
+    def close(self) -> None:
+        self._fp.close()
+        super().close()
+
+
+def profile_shard(
+    csv_path: str,
+    start: int,
+    end: int,
+    names: List[str],
+    read_kwargs: Dict[str, Any],
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    config: Optional[AccumulatorConfig] = None,
+) -> DatasetAccumulator:
+    """
+    Profile the records in a byte range of a CSV file.
+
+    Parameters
+    ----------
+    csv_path : str
+    start : int
+    end : int
+    names : List[str]
+        The column names from the header of the file
+    read_kwargs : Dict[str, Any]
+        Passed to pd.read_csv, e.g. the delimiter
+    chunksize : int
+        Number of rows which are read at once
+    config : Optional[AccumulatorConfig]
+
+    Returns
+    -------
+    accumulator : DatasetAccumulator
+    """
+    accumulator = DatasetAccumulator(config)
+    with io.BufferedReader(_ByteRange(csv_path, start, end)) as fp:
+        reader = pd.read_csv(
+            fp, header=None, names=names, chunksize=chunksize, **read_kwargs
+        )
+        with reader:
+            for chunk in reader:
+                accumulator.update(chunk)
+    return accumulator
+
+
+def profile_csv_parallel(
+    csv_path: str,
+    jobs: int,
+    chunksize: Optional[int] = None,
+    dialect: Optional[CsvDialect] = None,
+    config: Optional[AccumulatorConfig] = None,
+) -> DatasetAccumulator:
+    """
+    Profile a CSV file with multiple processes.
+
+    Parameters
+    ----------
+    csv_path : str
+    jobs : int
+        Number of processes
+    chunksize : Optional[int]
+        Number of rows each process reads at once
+    dialect : Optional[CsvDialect]
+        Sniffed from the head of the file if it is not given
+    config : Optional[AccumulatorConfig]
+
+    Returns
+    -------
+    accumulator : DatasetAccumulator
+        The same as edapy.csv.streaming.profile_csv_chunked would give
+    """
+    if chunksize is None:
+        chunksize = DEFAULT_CHUNKSIZE
+    if dialect is None:
+        dialect = sniff_dialect(csv_path)
+    if dialect.encoding == "utf-16":
+        raise ValueError("UTF-16 encoded files can not be split into shards")
+    if detect_compression(csv_path) is not None:
+        raise ValueError("Compressed files can not be split into shards")
+    read_kwargs = dialect.read_csv_kwargs()
+    names = pd.read_csv(csv_path, nrows=0, **read_kwargs).columns.tolist()
+    del read_kwargs["header"]
+    shards = find_shards(
+        csv_path, jobs, quotechar=dialect.quotechar, has_header=dialect.has_header
+    )
+    accumulator = DatasetAccumulator(config)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                profile_shard,
+                csv_path,
+                start,
+                end,
+                names,
+                read_kwargs,
+                chunksize,
+                config,
+            )
+            for start, end in shards
+        ]
+        for future in futures:
+            accumulator.merge(future.result())
+    return accumulator
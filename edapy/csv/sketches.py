@@ -0,0 +1,619 @@
+"""Mergeable sketches which summarize a column in bounded memory."""
+
+# Core Library
+from typing import List, Optional, Tuple
+
+# Third party
+import numpy as np
+import pandas as pd
+
+HISTOGRAM_BINS = 64
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """
+    Hash the non-null values of a column to 64 bit integers.
+
+    Numeric values are hashed as float64, so that the same number gets the
+    same hash no matter if it was parsed as an integer or as a float.
+
+    Parameters
+    ----------
+    values : pd.Series
+
+    Returns
+    -------
+    hashes : np.ndarray
+        dtype uint64
+    """
+    values = values.dropna()
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        values = values.astype(np.float64)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class HyperLogLog:
+    """
+    Estimate the number of distinct values.
+
+    The relative standard error is about 1.04 / sqrt(2**precision).
+
+    Examples
+    --------
+    >>> hll = HyperLogLog()
+    >>> hll.update(pd.Series(range(1000)))
+    >>> 950 < hll.estimate() < 1050
+    True
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(2**precision, dtype=np.uint8)
+
+    def update(self, values: pd.Series) -> None:
+        """Add the non-null values of a column."""
+        self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """Add values which were already hashed with hash_values."""
+        if len(hashes) == 0:
+            return
+        nb_rest_bits = 64 - self.precision
+        index = (hashes >> np.uint64(nb_rest_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << nb_rest_bits) - 1)
+        bit_length = np.zeros(len(rest), dtype=np.int64)
+        nonzero = rest > 0
+        bit_length[nonzero] = (
+            np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64) + 1
+        )
+        rank = np.minimum(nb_rest_bits - bit_length + 1, 255).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Merge another sketch with the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge HyperLogLog of precision {other.precision} "
+                f"into one of precision {self.precision}"
+            )
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """Get the estimated number of distinct values."""
+        nb_registers = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / nb_registers)
+        raw = (
+            alpha
+            * nb_registers**2
+            / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        )
+        nb_zero = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * nb_registers and nb_zero > 0:
+            raw = nb_registers * np.log(nb_registers / nb_zero)
+        return int(round(raw))
+
+
+class KllSketch:
+    """
+    Estimate quantiles of numeric values in bounded memory.
+
+    This is the KLL sketch of Karnin, Lang and Liberty. It keeps at most 3 * k
+    values, and the rank of a returned quantile is off by about 1.7 / k of
+    the number of values. As long as no more than k values were added,
+    quantiles are exact.
+
+    Examples
+    --------
+    >>> sketch = KllSketch(k=200)
+    >>> sketch.update(np.arange(100001, dtype=float))
+    >>> abs(sketch.quantile([0.5])[0] - 50000) < 0.02 * 100000
+    True
+    """
+
+    def __init__(self, k: int = 1000, seed: Optional[int] = 0):
+        self.k = k
+        self.nb_seen = 0
+        self.compactors = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add numeric values. NaN values are ignored."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.nb_seen += len(values)
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+
+    def merge(self, other: "KllSketch") -> None:
+        """Merge another sketch into this one."""
+        self.nb_seen += other.nb_seen
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self._compress()
+
+    def quantile(self, q) -> np.ndarray:
+        """Estimate quantiles of all values seen so far."""
+        q = np.asarray(q, dtype=np.float64)
+        if self.nb_seen == 0:
+            return np.full(q.shape, np.nan)
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate(
+            [
+                np.full(len(level_items), 2**level, dtype=np.float64)
+                for level, level_items in enumerate(self.compactors)
+            ]
+        )
+        order = np.argsort(items, kind="mergesort")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = q * (cumulative[-1] - 1)
+        positions = np.searchsorted(cumulative - 1, ranks, side="left")
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self) -> None:
+        while sum(map(len, self.compactors)) > sum(
+            self._capacity(level) for level in range(len(self.compactors))
+        ):
+            level = next(
+                level
+                for level, items in enumerate(self.compactors)
+                if len(items) >= self._capacity(level)
+            )
+            if level + 1 == len(self.compactors):
+                self.compactors.append(np.empty(0, dtype=np.float64))
+            items = np.sort(self.compactors[level])
+            # An odd item stays at this level, the others are halved
+            kept, items = items[: len(items) % 2], items[len(items) % 2 :]
+            offset = int(self._rng.integers(2))
+            self.compactors[level + 1] = np.concatenate(
+                [self.compactors[level + 1], items[offset::2]]
+            )
+            self.compactors[level] = kept
+
+
+class QuantileSummary:
+    """
+    Exact quantiles for up to max_exact values, a KllSketch above that.
+
+    Parameters
+    ----------
+    max_exact : int
+        Number of values up to which all values are kept
+    k : int
+        Size of the KllSketch
+    """
+
+    def __init__(self, max_exact: int = 1000000, k: int = 1000):
+        self.max_exact = max_exact
+        self.k = k
+        self.chunks: List[np.ndarray] = []
+        self.nb_values = 0
+        self.sketch: Optional[KllSketch] = None
+
+    @property
+    def is_exact(self) -> bool:
+        """Check if the quantiles are exact."""
+        return self.sketch is None
+
+    def update(self, values: np.ndarray) -> None:
+        """Add non-null numeric values."""
+        if self.sketch is not None:
+            self.sketch.update(values)
+            return
+        self.chunks.append(np.asarray(values, dtype=np.float64))
+        self.nb_values += len(values)
+        if self.nb_values > self.max_exact:
+            self._switch_to_sketch()
+
+    def merge(self, other: "QuantileSummary") -> None:
+        """Merge the summary of another part of the same column."""
+        if other.sketch is None:
+            for values in other.chunks:
+                self.update(values)
+            return
+        self._switch_to_sketch()
+        self.sketch.merge(other.sketch)  # type: ignore
+
+    def quantile(self, q) -> np.ndarray:
+        """Get the (estimated) quantiles of all values seen so far."""
+        if self.sketch is not None:
+            return self.sketch.quantile(q)
+        if self.nb_values == 0:
+            return np.full(np.shape(q), np.nan)
+        return np.quantile(np.concatenate(self.chunks), q)
+
+    def _switch_to_sketch(self) -> None:
+        if self.sketch is not None:
+            return
+        self.sketch = KllSketch(k=self.k)
+        for values in self.chunks:
+            self.sketch.update(values)
+        self.chunks = []
+
+
+def precision_for_error(error: float) -> int:
+    """
+    Get the HyperLogLog precision which gives a relative error of `error`.
+
+    Examples
+    --------
+    >>> precision_for_error(0.01)
+    14
+    """
+    precision = int(np.ceil(2 * np.log2(1.04 / error)))
+    return min(max(precision, 4), 18)
+
+
+class MisraGries:
+    """
+    Find the most frequent values with at most `capacity` counters.
+
+    Each count is underestimated by at most nb_seen / (capacity + 1). Every
+    value which occurs more often than that is guaranteed to be kept. The
+    remaining counters hold the next most common values seen so far, as
+    long as their count is positive.
+
+    Examples
+    --------
+    >>> heavy_hitters = MisraGries(capacity=2)
+    >>> heavy_hitters.update_counts(pd.Series({"a": 10, "b": 5, "c": 1}))
+    >>> heavy_hitters.counters.to_dict()
+    {'a': 9, 'b': 4}
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.nb_seen = 0
+        self.is_exact = True
+        self.counters = pd.Series(dtype=np.int64)
+
+    def update_counts(self, value_counts: pd.Series) -> None:
+        """Add values, given as a Series which maps values to counts."""
+        self.nb_seen += int(value_counts.sum())
+        self._reduce(self.counters.add(value_counts, fill_value=0))
+
+    def merge(self, other: "MisraGries") -> None:
+        """Merge another summary into this one."""
+        self.nb_seen += other.nb_seen
+        self.is_exact = self.is_exact and other.is_exact
+        self._reduce(self.counters.add(other.counters, fill_value=0))
+
+    def _reduce(self, counters: pd.Series) -> None:
+        counters = counters.astype(np.int64)
+        if len(counters) > self.capacity:
+            values = counters.to_numpy()
+            threshold = np.partition(values, -(self.capacity + 1))[-(self.capacity + 1)]
+            counters = counters.nlargest(self.capacity, keep="first") - threshold
+            counters = counters[counters > 0]
+            self.is_exact = False
+        self.counters = counters.sort_values(ascending=False, kind="mergesort")
+
+
+class CountMinSketch:
+    """
+    Estimate how often values occur.
+
+    Counts are overestimated by at most epsilon * nb_seen with probability
+    1 - delta.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01, seed: int = 0):
+        self.log_width = int(np.ceil(np.log2(np.e / epsilon)))
+        depth = int(np.ceil(np.log(1 / delta)))
+        self.table = np.zeros((depth, 2**self.log_width), dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        # Odd multipliers for multiplicative hashing, one per row
+        self._multipliers = rng.integers(
+            1, 2**63, size=depth, dtype=np.uint64
+        ) * np.uint64(2) + np.uint64(1)
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        products = hashes[np.newaxis, :] * self._multipliers[:, np.newaxis]
+        return (products >> np.uint64(64 - self.log_width)).astype(np.int64)
+
+    def update_hashes(self, hashes: np.ndarray, counts: np.ndarray) -> None:
+        """Add values which were hashed with hash_values, with their counts."""
+        width = self.table.shape[1]
+        for row, columns in enumerate(self._columns(hashes)):
+            self.table[row] += np.bincount(
+                columns, weights=counts, minlength=width
+            ).astype(np.int64)
+
+    def estimate_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        """Estimate the counts of values which were hashed with hash_values."""
+        columns = self._columns(hashes)
+        rows = np.arange(self.table.shape[0])[:, np.newaxis]
+        return self.table[rows, columns].min(axis=0)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        """Merge a sketch with the same epsilon, delta and seed."""
+        self.table += other.table
+
+
+class BoundedValueCounts:
+    """
+    Exact value counts as long as there are at most `capacity` values.
+
+    Above that, only the most common values are kept and the number of
+    distinct values is estimated with a HyperLogLog sketch.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self.is_exact = True
+        self.counters = pd.Series(dtype=np.int64)
+        self.distinct = HyperLogLog()
+
+    def update(self, values: pd.Series) -> None:
+        """Add the non-null values of a column."""
+        value_counts = values.value_counts()
+        self.distinct.update_hashes(hash_values(value_counts.index.to_series()))
+        self._merge(value_counts, exact=True)
+
+    def merge(self, other: "BoundedValueCounts") -> None:
+        """Merge the counts of another part of the same column."""
+        self.distinct.merge(other.distinct)
+        self._merge(other.counters, other.is_exact)
+
+    def distinct_count(self) -> int:
+        """Get the number of distinct values."""
+        if self.is_exact:
+            return len(self.counters)
+        return max(self.distinct.estimate(), len(self.counters))
+
+    def top_values(self) -> pd.Series:
+        """Get the most common values with their counts, most common first."""
+        return self.counters
+
+    def _merge(self, value_counts: pd.Series, exact: bool) -> None:
+        merged = self.counters.add(value_counts, fill_value=0).astype(np.int64)
+        merged = merged.sort_values(ascending=False, kind="mergesort")
+        if len(merged) > self.capacity:
+            merged = merged.iloc[: self.capacity]
+            exact = False
+        self.counters = merged
+        self.is_exact = self.is_exact and exact
+
+
+class FrequencySketch:
+    """
+    Approximate distinct count and most common values in bounded memory.
+
+    Combines a HyperLogLog sketch for the distinct count, Misra-Gries for
+    finding the most common values and Count-Min for estimating their
+    counts. All errors are about `error` relative to the number of values.
+    As long as the column has at most 1 / error different values, all
+    results are exact.
+
+    Examples
+    --------
+    >>> sketch = FrequencySketch(error=0.1)
+    >>> sketch.update(pd.Series(["a"] * 50 + [str(i) for i in range(50)]))
+    >>> sketch.is_exact
+    False
+    >>> sketch.top_values().index[0]
+    'a'
+    """
+
+    def __init__(self, error: float = 0.01):
+        self.error = error
+        self.distinct = HyperLogLog(precision=precision_for_error(error))
+        self.heavy_hitters = MisraGries(capacity=int(np.ceil(1 / error)))
+        self.counts = CountMinSketch(epsilon=error)
+
+    @property
+    def is_exact(self) -> bool:
+        """Check if the value counts are still exact."""
+        return self.heavy_hitters.is_exact
+
+    def update(self, values: pd.Series) -> None:
+        """Add the non-null values of a column."""
+        value_counts = values.value_counts()
+        hashes = hash_values(value_counts.index.to_series())
+        self.distinct.update_hashes(hashes)
+        self.heavy_hitters.update_counts(value_counts)
+        self.counts.update_hashes(hashes, value_counts.to_numpy())
+
+    def merge(self, other: "FrequencySketch") -> None:
+        """Merge the sketch of another part of the same column."""
+        self.distinct.merge(other.distinct)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        self.counts.merge(other.counts)
+
+    def distinct_count(self) -> int:
+        """Get the (estimated) number of distinct values."""
+        if self.is_exact:
+            return len(self.heavy_hitters.counters)
+        return max(self.distinct.estimate(), len(self.heavy_hitters.counters))
+
+    def top_values(self) -> pd.Series:
+        """
+        Get the most common values with their counts, most common first.
+
+        If the counts are not exact, only values which occur more often than
+        the error bound of Misra-Gries are returned, so columns without
+        frequent values give none.
+        """
+        counters = self.heavy_hitters.counters
+        if self.is_exact or len(counters) == 0:
+            return counters
+        estimates = self.counts.estimate_hashes(hash_values(counters.index.to_series()))
+        top = pd.Series(estimates, index=counters.index, dtype=np.int64)
+        error_bound = self.heavy_hitters.nb_seen / (self.heavy_hitters.capacity + 1)
+        top = top[top > error_bound]
+        return top.sort_values(ascending=False, kind="mergesort")
+
+
+def sketch_value_counts(
+    column: pd.Series, error: float, batch_size: int = 2**20
+) -> FrequencySketch:
+    """
+    Summarize the values of a column with a FrequencySketch.
+
+    The column is processed in batches, so that no hash table with all
+    distinct values of the column is ever built.
+
+    Parameters
+    ----------
+    column : pd.Series
+    error : float
+    batch_size : int
+
+    Returns
+    -------
+    sketch : FrequencySketch
+    """
+    sketch = FrequencySketch(error=error)
+    for start in range(0, len(column), batch_size):
+        sketch.update(column.iloc[start : start + batch_size])
+    return sketch
+
+
+class Histogram:
+    """
+    Histogram with a fixed number of bins whose range grows with the values.
+
+    The bin width is a power of two and the bins start at a multiple of it.
+    When values fall outside of the bins, the width is doubled and pairs of
+    bins are added up, until all values fit. Bins of any two histograms are
+    aligned, so histograms of different chunks merge exactly, and a chunked
+    histogram equals the histogram of all values at once.
+
+    Parameters
+    ----------
+    nb_bins : int
+        An even number of bins
+    integer : bool
+        Bins are at least 1 wide, so that no bin lies between two integers
+
+    Examples
+    --------
+    >>> histogram = Histogram(nb_bins=4, integer=True)
+    >>> histogram.update(np.array([0, 1, 1, 3]))
+    >>> histogram.counts.tolist(), histogram.edges().tolist()
+    ([1, 2, 0, 1], [0.0, 1.0, 2.0, 3.0, 4.0])
+    >>> histogram.update(np.array([6]))
+    >>> histogram.counts.tolist(), histogram.edges().tolist()
+    ([3, 1, 0, 1], [0.0, 2.0, 4.0, 6.0, 8.0])
+    """
+
+    # Relative resolution of the first bins of non-integer values
+    RESOLUTION_BITS = 20
+    # The widest bins, as the largest power of two which is a float64
+    MAX_WIDTH_EXPONENT = 1023
+
+    def __init__(self, nb_bins: int = HISTOGRAM_BINS, integer: bool = False):
+        self.counts = np.zeros(nb_bins, dtype=np.int64)
+        self.integer = integer
+        # The first bin starts at offset * width. Bins are computed from
+        # offset and width, so values near the float64 limits never
+        # overflow to inf.
+        self.offset: Optional[int] = None
+        self.width: Optional[float] = None
+
+    def update(self, values: np.ndarray) -> None:
+        """Add numeric values. NaN and infinite values are ignored."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        self._cover(float(values.min()), float(values.max()))
+        assert self.offset is not None and self.width is not None
+        # Both are integers in float64, whose difference is exact here
+        index = np.floor(values / self.width) - float(self.offset)
+        index = index.astype(np.int64)
+        index = np.clip(index, 0, len(self.counts) - 1)
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+    def merge(self, other: "Histogram") -> None:
+        """Merge the histogram of other values."""
+        used = np.flatnonzero(other.counts)
+        if other.offset is None or other.width is None or len(used) == 0:
+            return
+        lower_edges = other.edges()[used]
+        # Each bin of other lies in one bin of this histogram
+        self._cover(float(lower_edges[0]), float(lower_edges[-1]), other.width)
+        assert self.offset is not None and self.width is not None
+        index = self._rebin(other.offset, used, other.width)
+        np.add.at(self.counts, index, other.counts[used])
+
+    def trimmed(self) -> Tuple[List[float], List[int]]:
+        """
+        Get the edges and counts from the first to the last non-empty bin.
+
+        Returns
+        -------
+        edges, counts : Tuple[List[float], List[int]]
+            There is one more edge than there are counts
+        """
+        used = np.flatnonzero(self.counts)
+        if len(used) == 0:
+            return [], []
+        edges = self.edges()[used[0] : used[-1] + 2]
+        return edges.tolist(), self.counts[used[0] : used[-1] + 1].tolist()
+
+    def edges(self) -> np.ndarray:
+        """
+        Get the edges of the bins, one more than there are bins.
+
+        Edges beyond the float64 range are clipped to it.
+        """
+        if self.offset is None or self.width is None:
+            return np.empty(0)
+        with np.errstate(over="ignore"):
+            edges = (self.offset + np.arange(len(self.counts) + 1)) * self.width
+        limit = np.finfo(np.float64).max
+        return np.clip(edges, -limit, limit)
+
+    def _cover(self, low: float, high: float, min_width: float = 0.0) -> None:
+        """Move and widen the bins until they cover the values low to high."""
+        nb_bins = len(self.counts)
+        if self.offset is None or self.width is None:
+            magnitude = max(abs(low), abs(high))
+            resolution = 1.0 if self.integer else 2.0**-1022
+            if magnitude > 0 and not self.integer:
+                # Not below the smallest normal float64, as for magnitude 0
+                resolution = 2.0 ** max(
+                    np.floor(np.log2(magnitude)) - self.RESOLUTION_BITS, -1022
+                )
+            # Halves, as the range of huge values can exceed the float64 range
+            needed = max((high / 2 - low / 2) / nb_bins * 2, resolution)
+            exponent = min(np.ceil(np.log2(needed)), self.MAX_WIDTH_EXPONENT)
+            self.width = float(2.0**exponent)
+            self.offset = int(np.floor(low / self.width))
+        used = np.flatnonzero(self.counts)
+        if len(used) > 0:
+            lower_edges = self.edges()[used]
+            low = min(low, float(lower_edges[0]))
+            high = max(high, float(lower_edges[-1]))
+        width = max(self.width, min_width)
+        max_width = 2.0**self.MAX_WIDTH_EXPONENT
+        # Written as "not <", so that inf - inf = NaN also widens the bins
+        with np.errstate(over="ignore", invalid="ignore"):
+            while width < max_width and not (
+                np.floor(high / width) - np.floor(low / width) < nb_bins
+            ):
+                width *= 2
+        old_offset, old_width = self.offset, self.width
+        self.offset, self.width = int(np.floor(low / width)), width
+        if self.offset == old_offset and self.width == old_width:
+            return
+        # The old bins are aligned with the new ones, so each lies in one
+        index = self._rebin(old_offset, used, old_width)
+        counts = np.zeros_like(self.counts)
+        np.add.at(counts, index, self.counts[used])
+        self.counts = counts
+
+    def _rebin(self, offset: int, used: np.ndarray, width: float) -> np.ndarray:
+        """Get the indices of the used bins of a histogram with narrower bins."""
+        assert self.offset is not None and self.width is not None
+        # Both widths are powers of two, so this is a shift of the bin
+        # number. Offsets of integer bins can exceed int64.
+        shift = int(np.log2(self.width) - np.log2(width))
+        index = [((offset + int(bin_)) >> shift) - self.offset for bin_ in used]
+        return np.clip(np.array(index, dtype=np.int64), 0, len(self.counts) - 1)
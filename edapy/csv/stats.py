@@ -0,0 +1,315 @@
+"""Compute column statistics of a dataframe in a vectorized way."""
+
+# Core Library
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+# Third party
+import numpy as np
+import pandas as pd
+
+# First party
+from edapy.csv.sketches import Histogram, KllSketch
+
+QUARTILES = [0.25, 0.50, 0.75]
+EXACT_QUANTILE_MAX_ROWS = 1000000
+FRACTION_BLOCK_SIZE = 2**16
+# Number of most common values whose counts are kept, e.g. for bar charts
+TOP_COUNTS = 20
+# Number of most common values which are kept, so that profiles of columns
+# with unique values stay small
+MAX_VALUE_LIST = 10000
+
+
+@dataclass
+class ColumnStats:
+    """Statistics of a single column."""
+
+    name: str
+    kind: Optional[str]
+    dtype: str
+    non_nan: int = 0
+    nb_null: int = 0
+    value_count: int = 0
+    value_list: List[Any] = field(default_factory=list)
+    top_count_val: Optional[int] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    min: Optional[float] = None
+    q25: Optional[float] = None
+    q50: Optional[float] = None
+    q75: Optional[float] = None
+    max: Optional[float] = None
+    has_frac: Optional[bool] = None
+    # All values are whole numbers, without the tolerance of has_frac
+    is_integral: Optional[bool] = None
+    approximate: bool = False
+    percentiles: Dict[float, float] = field(default_factory=dict)
+    quantiles_approximate: bool = False
+    # Counts of the first values of value_list
+    top_counts: List[int] = field(default_factory=list)
+    # Histogram of numeric columns, with one more edge than counts
+    histogram_edges: List[float] = field(default_factory=list)
+    histogram_counts: List[int] = field(default_factory=list)
+
+    @property
+    def unique(self) -> int:
+        """Number of different values, counting a missing value as one."""
+        return self.value_count + (1 if self.nb_null > 0 else 0)
+
+    @property
+    def is_counted(self) -> bool:
+        """Check if the values were counted, which Parquet metadata does not."""
+        return self.value_count > 0 or self.non_nan == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the statistics as builtin types which JSON and YAML can hold.
+
+        NaN becomes None and values which are no numbers or strings, e.g.
+        timestamps, become strings.
+        """
+        return {key: to_builtin(value) for key, value in asdict(self).items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ColumnStats":
+        """Create the statistics from the output of to_dict."""
+        data = dict(data)
+        data["percentiles"] = {
+            float(percentile): value
+            for percentile, value in data.get("percentiles", {}).items()
+        }
+        return cls(**data)
+
+
+@dataclass
+class DatasetStats:
+    """Statistics of all columns of a dataframe."""
+
+    nb_rows: int
+    columns: Dict[str, ColumnStats] = field(default_factory=dict)
+    # Maps 'pearson', 'spearman' and 'cramers_v' to matrices, if computed
+    correlations: Dict[str, pd.DataFrame] = field(default_factory=dict, compare=False)
+
+    def by_kind(self, kind: str) -> List[ColumnStats]:
+        """Get the statistics of all columns of the given kind."""
+        return [stats for stats in self.columns.values() if stats.kind == kind]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the statistics as builtin types which JSON and YAML can hold.
+
+        Examples
+        --------
+        >>> DatasetStats(2, {"a": ColumnStats("a", "int", "int64")}).to_dict()
+        ... # doctest: +ELLIPSIS
+        {'nb_rows': 2, 'columns': [{'name': 'a', 'kind': 'int', ...}]}
+        """
+        data = {
+            "nb_rows": int(self.nb_rows),
+            "columns": [stats.to_dict() for stats in self.columns.values()],
+        }
+        if self.correlations:
+            data["correlations"] = {
+                method: to_builtin(matrix.to_dict())
+                for method, matrix in self.correlations.items()
+            }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DatasetStats":
+        """Create the statistics from the output of to_dict."""
+        columns = [ColumnStats.from_dict(column) for column in data["columns"]]
+        correlations = {
+            method: pd.DataFrame(matrix).reindex(
+                index=list(matrix), columns=list(matrix)
+            )
+            for method, matrix in data.get("correlations", {}).items()
+        }
+        return cls(
+            nb_rows=data["nb_rows"],
+            columns={column.name: column for column in columns},
+            correlations=correlations,
+        )
+
+
+def to_builtin(value: Any) -> Any:
+    """
+    Convert numpy scalars and containers of them to builtin types.
+
+    Examples
+    --------
+    >>> to_builtin({0.5: np.float32(1.5), "b": [np.int64(2), float("nan")]})
+    {0.5: 1.5, 'b': [2, None]}
+    """
+    if isinstance(value, dict):
+        return {to_builtin(key): to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def compute_stats(
+    df: pd.DataFrame,
+    column_info: Dict[str, List],
+    column_info_meta: Dict[str, Any],
+    percentiles: Sequence[float] = (),
+    exact_quantile_max_rows: int = EXACT_QUANTILE_MAX_ROWS,
+) -> DatasetStats:
+    """
+    Compute the statistics of all columns of a dataframe.
+
+    The null mask is computed once for the whole dataframe and all moments,
+    extremes and quartiles are computed for all numeric columns at once.
+    Dataframes with more than exact_quantile_max_rows rows get quantiles
+    from a KllSketch instead of sorting each column.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    column_info : Dict[str, List]
+        Maps column kinds to column names, as generated by
+        edapy.csv.describe._generate_column_info. Columns which are not
+        listed get the kind None.
+    column_info_meta : Dict[str, Any]
+        Value counts of each column, as generated by
+        edapy.csv.describe._generate_column_info
+    percentiles : Sequence[float]
+        Additional percentiles to compute, e.g. [1, 99, 99.9]
+    exact_quantile_max_rows : int
+
+    Returns
+    -------
+    stats : DatasetStats
+    """
+    null_counts = df.isnull().sum()
+    kinds = {
+        column_name: kind
+        for kind, column_names in column_info.items()
+        for column_name in column_names
+    }
+    stats = DatasetStats(nb_rows=len(df))
+    for column_name in df:
+        meta = column_info_meta[column_name]
+        nb_null = int(null_counts[column_name])
+        stats.columns[column_name] = ColumnStats(
+            name=column_name,
+            kind=kinds.get(column_name),
+            dtype=str(df[column_name].dtype),
+            non_nan=len(df) - nb_null,
+            nb_null=nb_null,
+            value_count=meta["value_count"],
+            value_list=meta["value_list"][:MAX_VALUE_LIST],
+            top_count_val=meta["top_count_val"],
+            approximate=meta.get("approximate", False),
+            top_counts=meta.get("top_counts", []),
+        )
+    numeric_columns = column_info["int"] + column_info["float"]
+    if len(numeric_columns) > 0:
+        _add_numeric_stats(
+            df[numeric_columns], stats, percentiles, exact_quantile_max_rows
+        )
+    return stats
+
+
+def _add_numeric_stats(
+    numeric_df: pd.DataFrame,
+    stats: DatasetStats,
+    percentiles: Sequence[float],
+    exact_quantile_max_rows: int,
+) -> None:
+    """Add moments, extremes and quantiles of numeric columns to stats."""
+    moments = pd.DataFrame(
+        {
+            "mean": numeric_df.mean(),
+            "std": numeric_df.std(),
+            "min": numeric_df.min(),
+            "max": numeric_df.max(),
+        }
+    )
+    q = QUARTILES + [percentile / 100 for percentile in percentiles]
+    approximate = len(numeric_df) > exact_quantile_max_rows
+    if approximate:
+        quantiles = _sketch_quantiles(numeric_df, q, exact_quantile_max_rows)
+    else:
+        quantiles = numeric_df.quantile(q)
+    for column_name in numeric_df:
+        column_stats = stats.columns[column_name]
+        column_stats.mean = moments.at[column_name, "mean"]
+        column_stats.std = moments.at[column_name, "std"]
+        column_stats.min = moments.at[column_name, "min"]
+        column_stats.max = moments.at[column_name, "max"]
+        column_stats.has_frac = has_frac(numeric_df[column_name])
+        column_stats.is_integral = not has_frac(numeric_df[column_name], epsilon=0)
+        column_quantiles = quantiles[column_name].tolist()
+        column_stats.q25, column_stats.q50, column_stats.q75 = column_quantiles[:3]
+        column_stats.percentiles = dict(zip(percentiles, column_quantiles[3:]))
+        column_stats.quantiles_approximate = approximate
+        histogram = Histogram(integer=not column_stats.has_frac)
+        histogram.update(
+            numeric_df[column_name].to_numpy(dtype="float64", na_value=float("nan"))
+        )
+        column_stats.histogram_edges, column_stats.histogram_counts = (
+            histogram.trimmed()
+        )
+
+
+def _sketch_quantiles(
+    numeric_df: pd.DataFrame, q: List[float], batch_size: int
+) -> pd.DataFrame:
+    """Estimate quantiles of all columns with a KllSketch per column."""
+    quantiles = {}
+    for column_name in numeric_df:
+        sketch = KllSketch()
+        values = numeric_df[column_name].to_numpy(
+            dtype="float64", na_value=float("nan")
+        )
+        for start in range(0, len(values), batch_size):
+            sketch.update(values[start : start + batch_size])
+        quantiles[column_name] = sketch.quantile(q)
+    return pd.DataFrame(quantiles, index=q)
+
+
+def has_frac(df_column: pd.Series, epsilon: float = 10**-4) -> bool:
+    """
+    Check if one of the values is a fraction.
+
+    Parameters
+    ----------
+    df_column : pd.Series
+    epsilon : float
+        Values which are closer to a whole number count as whole numbers
+
+    Returns
+    -------
+    has_fraction : bool
+
+    Examples
+    --------
+    >>> has_frac(pd.Series([1.0, 2.0]))
+    False
+    >>> has_frac(pd.Series([1.0, 2.1]))
+    True
+    >>> has_frac(pd.Series([1.0, None]))
+    False
+    >>> has_frac(pd.Series([1.00001])), has_frac(pd.Series([1.00001]), epsilon=0)
+    (False, True)
+    """
+    if not np.issubdtype(df_column.dtype, np.number) or np.issubdtype(
+        df_column.dtype, np.integer
+    ):
+        return False
+    values = np.asarray(df_column, dtype=np.float64)
+    # Blocks, so that columns with fractions are detected early. NaN and inf
+    # never compare as fractions.
+    for start in range(0, len(values), FRACTION_BLOCK_SIZE):
+        fractions = np.abs(np.modf(values[start : start + FRACTION_BLOCK_SIZE])[0])
+        if np.any((fractions > epsilon) & (fractions < 1 - epsilon)):
+            return True
+    return False
@@ -0,0 +1,402 @@
+"""Profile CSV files which are larger than the memory chunk by chunk."""
+
+# Core Library
+import collections
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Union
+
+# Third party
+import numpy as np
+import pandas as pd
+
+# First party
+from edapy.csv.compression import open_csv
+from edapy.csv.correlations import CorrelationAccumulator
+from edapy.csv.describe import get_column_kind, warn_if_suspicious_category
+from edapy.csv.dialect import CsvDialect, sniff_dialect
+from edapy.csv.sketches import (
+    BoundedValueCounts,
+    FrequencySketch,
+    Histogram,
+    QuantileSummary,
+)
+from edapy.csv.stats import (
+    EXACT_QUANTILE_MAX_ROWS,
+    MAX_VALUE_LIST,
+    QUARTILES,
+    TOP_COUNTS,
+    ColumnStats,
+    DatasetStats,
+    has_frac,
+)
+
+
+@dataclass(frozen=True)
+class AccumulatorConfig:
+    """
+    Settings which decide how exact and how large accumulators are.
+
+    Parameters
+    ----------
+    max_tracked_values : int
+        Value counts are exact up to this many different values
+    sketch_error : Optional[float]
+        Use a FrequencySketch with this relative error for value counts
+    exact_quantile_max_rows : int
+        Quantiles are exact up to this many values, estimated with a
+        KllSketch above that
+    quantile_sketch_size : int
+        The k of the KllSketch
+    correlations : bool
+        Also accumulate the correlations of all pairs of columns
+    """
+
+    max_tracked_values: int = MAX_VALUE_LIST
+    sketch_error: Optional[float] = None
+    exact_quantile_max_rows: int = EXACT_QUANTILE_MAX_ROWS
+    quantile_sketch_size: int = 1000
+    correlations: bool = False
+
+
+class ColumnAccumulator:
+    """
+    Mergeable summary of a single column.
+
+    Mean and variance are updated with the parallel algorithm of Chan et al.,
+    so that accumulators of different chunks can be merged without loss of
+    precision. Value counts are exact as long as the column has at most
+    max_tracked_values different values. Above that, only the most common
+    values are kept and the number of distinct values comes from a
+    HyperLogLog sketch. If sketch_error is given, a FrequencySketch with
+    that error bound is used instead. Quantiles are exact up to
+    exact_quantile_max_rows values and estimated with a KllSketch above.
+    The Histogram has integer bins if the first numeric values have no
+    fractions.
+
+    Parameters
+    ----------
+    config : Optional[AccumulatorConfig]
+    """
+
+    def __init__(self, config: Optional[AccumulatorConfig] = None):
+        if config is None:
+            config = AccumulatorConfig()
+        self.frequencies: Union[BoundedValueCounts, FrequencySketch]
+        if config.sketch_error is None:
+            self.frequencies = BoundedValueCounts(capacity=config.max_tracked_values)
+        else:
+            self.frequencies = FrequencySketch(error=config.sketch_error)
+        self.dtype: Optional[str] = None
+        self.nb_rows = 0
+        self.nb_null = 0
+        self.nb_numeric = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.has_frac = False
+        self.has_exact_frac = False
+        self.quantiles = QuantileSummary(
+            max_exact=config.exact_quantile_max_rows,
+            k=config.quantile_sketch_size,
+        )
+        # Later chunks may have fractions, so float bins are always kept and
+        # integer bins only as long as no value had a fraction
+        self.histogram: Optional[Histogram] = None
+        self.integer_histogram: Optional[Histogram] = None
+
+    def update(self, column: pd.Series) -> None:
+        """Add a chunk of a column."""
+        self.dtype = _merge_dtypes(self.dtype, str(column.dtype))
+        self.nb_rows += len(column)
+        self.nb_null += int(column.isnull().sum())
+        self.frequencies.update(column)
+        if not _is_numeric(column.dtype):
+            return
+        non_null = column.dropna()
+        if len(non_null) == 0:
+            return
+        values = non_null.to_numpy(dtype=np.float64)
+        mean = values.mean()
+        self._merge_moments(
+            len(values),
+            float(mean),
+            float(((values - mean) ** 2).sum()),
+            float(values.min()),
+            float(values.max()),
+        )
+        chunk_has_exact_frac = has_frac(non_null, epsilon=0)
+        self.has_exact_frac = self.has_exact_frac or chunk_has_exact_frac
+        self.has_frac = self.has_frac or (chunk_has_exact_frac and has_frac(non_null))
+        self.quantiles.update(values)
+        if self.histogram is None:
+            self.histogram = Histogram()
+        self.histogram.update(values)
+        if self.has_frac:
+            self.integer_histogram = None
+            return
+        if self.integer_histogram is None:
+            self.integer_histogram = Histogram(integer=True)
+        self.integer_histogram.update(values)
+
+    def merge(self, other: "ColumnAccumulator") -> None:
+        """Merge the accumulator of another chunk of the same column."""
+        self.dtype = _merge_dtypes(self.dtype, other.dtype)
+        self.nb_rows += other.nb_rows
+        self.nb_null += other.nb_null
+        self.frequencies.merge(other.frequencies)  # type: ignore
+        self._merge_moments(
+            other.nb_numeric, other.mean, other.m2, other.min, other.max
+        )
+        self.has_frac = self.has_frac or other.has_frac
+        self.has_exact_frac = self.has_exact_frac or other.has_exact_frac
+        self.quantiles.merge(other.quantiles)
+        self.histogram = _merge_histograms(self.histogram, other.histogram)
+        if self.has_frac:
+            self.integer_histogram = None
+        else:
+            self.integer_histogram = _merge_histograms(
+                self.integer_histogram, other.integer_histogram
+            )
+
+    def to_column_stats(
+        self, name: str, kind: Optional[str], percentiles: Sequence[float] = ()
+    ) -> ColumnStats:
+        """
+        Get the statistics of the column.
+
+        Parameters
+        ----------
+        name : str
+        kind : Optional[str]
+            See edapy.csv.describe.get_column_kind
+        percentiles : Sequence[float]
+            Additional percentiles to compute, e.g. [1, 99, 99.9]
+
+        Returns
+        -------
+        column_stats : ColumnStats
+        """
+        top_values = self.frequencies.top_values()
+        column_stats = ColumnStats(
+            name=name,
+            kind=kind,
+            dtype=str(self.dtype),
+            non_nan=self.nb_rows - self.nb_null,
+            nb_null=self.nb_null,
+            value_count=self.frequencies.distinct_count(),
+            value_list=top_values.index.tolist(),
+            top_count_val=int(top_values.iloc[0]) if len(top_values) > 0 else None,
+            approximate=not self.frequencies.is_exact,
+            top_counts=[int(count) for count in top_values.head(TOP_COUNTS)],
+        )
+        if kind in ["int", "float"] and self.nb_numeric > 0:
+            column_stats.mean = self.mean
+            column_stats.std = (
+                np.sqrt(self.m2 / (self.nb_numeric - 1))
+                if self.nb_numeric > 1
+                else np.nan
+            )
+            column_stats.min = self.min
+            column_stats.max = self.max
+            quantiles = self.quantiles.quantile(
+                QUARTILES + [percentile / 100 for percentile in percentiles]
+            ).tolist()
+            column_stats.q25, column_stats.q50, column_stats.q75 = quantiles[:3]
+            column_stats.percentiles = dict(zip(percentiles, quantiles[3:]))
+            column_stats.quantiles_approximate = not self.quantiles.is_exact
+            column_stats.has_frac = self.has_frac
+            column_stats.is_integral = not self.has_exact_frac
+            histogram = self.histogram if self.has_frac else self.integer_histogram
+            if histogram is not None:
+                column_stats.histogram_edges, column_stats.histogram_counts = (
+                    histogram.trimmed()
+                )
+        return column_stats
+
+    def _merge_moments(
+        self,
+        nb_numeric: int,
+        mean: float,
+        m2: float,
+        min_: Optional[float],
+        max_: Optional[float],
+    ) -> None:
+        if nb_numeric == 0:
+            return
+        total = self.nb_numeric + nb_numeric
+        delta = mean - self.mean
+        self.mean += delta * nb_numeric / total
+        self.m2 += m2 + delta**2 * self.nb_numeric * nb_numeric / total
+        self.nb_numeric = total
+        self.min = min_ if self.min is None else min(self.min, min_)  # type: ignore
+        self.max = max_ if self.max is None else max(self.max, max_)  # type: ignore
+
+
+class DatasetAccumulator:
+    """
+    Mergeable summary of all columns of a CSV file.
+
+    Parameters
+    ----------
+    config : Optional[AccumulatorConfig]
+    """
+
+    def __init__(self, config: Optional[AccumulatorConfig] = None):
+        self.config = config
+        self.nb_rows = 0
+        self.columns: Dict[str, ColumnAccumulator] = collections.OrderedDict()
+        self.correlations: Optional[CorrelationAccumulator] = None
+        if config is not None and config.correlations:
+            self.correlations = CorrelationAccumulator()
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Add a chunk of rows."""
+        self.nb_rows += len(df)
+        for column_name in df:
+            self._get_column(column_name).update(df[column_name])
+        if self.correlations is not None:
+            kinds = {
+                column_name: get_column_kind(
+                    column_name, str(df[column_name].dtype), {}
+                )
+                for column_name in df
+            }
+            self.correlations.update(
+                df,
+                [name for name, kind in kinds.items() if kind in ["int", "float"]],
+                [name for name, kind in kinds.items() if kind in ["category", "other"]],
+            )
+
+    def merge(self, other: "DatasetAccumulator") -> None:
+        """Merge the accumulator of another chunk of the same file."""
+        self.nb_rows += other.nb_rows
+        for column_name, column in other.columns.items():
+            self._get_column(column_name).merge(column)
+        if self.correlations is not None and other.correlations is not None:
+            self.correlations.merge(other.correlations)
+
+    def to_stats(
+        self,
+        dtype: Optional[Dict[str, Any]] = None,
+        percentiles: Sequence[float] = (),
+    ) -> DatasetStats:
+        """
+        Get the statistics of all columns.
+
+        Parameters
+        ----------
+        dtype : Dict[str, Any]
+            Maps column names to types
+        percentiles : Sequence[float]
+            Additional percentiles to compute, e.g. [1, 99, 99.9]
+
+        Returns
+        -------
+        stats : DatasetStats
+        """
+        if dtype is None:
+            dtype = {}
+        stats = DatasetStats(nb_rows=self.nb_rows)
+        for column_name, column in self.columns.items():
+            column_stats = column.to_column_stats(
+                column_name,
+                get_column_kind(column_name, column.dtype, dtype),
+                percentiles,
+            )
+            warn_if_suspicious_category(
+                column_name,
+                column_stats.dtype,
+                column_stats.value_list,
+                column_stats.value_count,
+                dtype,
+            )
+            stats.columns[column_name] = column_stats
+        if self.correlations is not None:
+            stats.correlations = self.correlations.to_correlations()
+        return stats
+
+    def _get_column(self, column_name: str) -> ColumnAccumulator:
+        if column_name not in self.columns:
+            self.columns[column_name] = ColumnAccumulator(self.config)
+        return self.columns[column_name]
+
+
+def profile_csv_chunked(
+    csv_path: str,
+    chunksize: int,
+    dialect: Optional[CsvDialect] = None,
+    nrows: Optional[int] = None,
+    config: Optional[AccumulatorConfig] = None,
+    threads: int = 1,
+) -> DatasetAccumulator:
+    """
+    Profile a CSV file without loading it completely into memory.
+
+    Parameters
+    ----------
+    csv_path : str
+    chunksize : int
+        Number of rows which are read at once
+    dialect : Optional[CsvDialect]
+        Sniffed from the head of the file if it is not given
+    nrows : Optional[int]
+        Number of rows to read. By default, read all lines
+    config : Optional[AccumulatorConfig]
+    threads : int
+        Number of threads which decompress a compressed file, if its format
+        allows it
+
+    Returns
+    -------
+    accumulator : DatasetAccumulator
+    """
+    if dialect is None:
+        dialect = sniff_dialect(csv_path)
+    accumulator = DatasetAccumulator(config)
+    with open_csv(csv_path, threads) as source:
+        reader = pd.read_csv(
+            source, chunksize=chunksize, nrows=nrows, **dialect.read_csv_kwargs()
+        )
+        with reader:
+            for chunk in reader:
+                accumulator.update(chunk)
+    return accumulator
+
+
+def _is_numeric(column_dtype: Any) -> bool:
+    return pd.api.types.is_numeric_dtype(
+        column_dtype
+    ) and not pd.api.types.is_bool_dtype(column_dtype)
+
+
+def _merge_histograms(
+    histogram: Optional[Histogram], other: Optional[Histogram]
+) -> Optional[Histogram]:
+    """Merge other into histogram, either of which may not exist yet."""
+    if other is None:
+        return histogram
+    if histogram is None:
+        histogram = Histogram(integer=other.integer)
+    histogram.merge(other)
+    return histogram
+
+
+def _merge_dtypes(dtype_a: Optional[str], dtype_b: Optional[str]) -> Optional[str]:
+    """
+    Get the dtype pandas would have inferred for the union of two chunks.
+
+    Examples
+    --------
+    >>> _merge_dtypes("int64", "float64")
+    'float64'
+    >>> _merge_dtypes("bool", "object")
+    'object'
+    """
+    if dtype_a is None or dtype_a == dtype_b:
+        return dtype_b
+    if dtype_b is None:
+        return dtype_a
+    if _is_numeric(dtype_a) and _is_numeric(dtype_b):
+        return str(np.promote_types(dtype_a, dtype_b))
+    return "object"
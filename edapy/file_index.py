@@ -0,0 +1,252 @@
+"""
+Remember the results of scanning the files of a directory tree.
+
+A FileIndex is a SQLite database which maps the absolute path of each file
+to its size, its modification time and the row which scanning it gave.
+Files whose size and modification time did not change are not scanned
+again. Each row is committed as soon as its file is done, so an interrupted
+scan continues where it stopped. Files which were deleted are removed from
+the index at the end of a complete scan.
+"""
+
+# Core Library
+import json
+import logging
+import os
+import pickle
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+# Changed files which are scanned at once, e.g. by one process pool
+SCAN_BATCH_SIZE = 1000
+
+# Gets paths of files which have to be scanned and yields (path, row) pairs
+ScanFunction = Callable[[Iterable[str]], Iterable[Tuple[str, Dict[str, Any]]]]
+
+
+class FileIndex:
+    """
+    Rows of scanned files, keyed by path, size and modification time.
+
+    Parameters
+    ----------
+    db_path : str
+        The SQLite database, which is created if it does not exist
+    options : Dict[str, Any]
+        Everything which changes the rows, e.g. the columns. If they differ
+        from the options of the last scan, all files are scanned again.
+    """
+
+    def __init__(self, db_path: str, options: Dict[str, Any]):
+        self.db_path = os.path.abspath(os.path.expanduser(db_path))
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, "
+            "size INTEGER, mtime_ns INTEGER, run INTEGER, row BLOB)"
+        )
+        options_str = json.dumps(
+            {"version": INDEX_VERSION, "options": options}, sort_keys=True, default=str
+        )
+        if self._get_meta("options") != options_str:
+            if self._get_meta("options") is not None:
+                logger.info(f"The options changed, all files of {db_path} expired")
+            self.connection.execute("DELETE FROM files")
+            self._set_meta("options", options_str)
+        # Files which are seen in this scan get this run number
+        self.run = int(self._get_meta("run") or 0) + 1
+        self._set_meta("run", str(self.run))
+        self.connection.commit()
+
+    def get(self, path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """
+        Get the row of a file if the file did not change since it was scanned.
+
+        Parameters
+        ----------
+        path : str
+        stat : os.stat_result
+            The current size and modification time of the file
+
+        Returns
+        -------
+        row : Optional[Dict[str, Any]]
+        """
+        result = self.connection.execute(
+            "SELECT row FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        if result is None:
+            return None
+        try:
+            row = pickle.loads(result[0])
+        except Exception as exc:  # Broken or written by an older version
+            logger.warning(f"Scanning '{path}' again: {exc}")
+            return None
+        self.connection.execute(
+            "UPDATE files SET run = ? WHERE path = ?", (self.run, path)
+        )
+        return row
+
+    def put(self, path: str, stat: os.stat_result, row: Dict[str, Any]) -> None:
+        """Store and commit the row of a file which was just scanned."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+            (
+                path,
+                stat.st_size,
+                stat.st_mtime_ns,
+                self.run,
+                pickle.dumps(row, protocol=pickle.HIGHEST_PROTOCOL),
+            ),
+        )
+        self.connection.commit()
+
+    def prune(self, root: str) -> int:
+        """
+        Remove the files below root which were not seen in this scan.
+
+        Parameters
+        ----------
+        root : str
+            The directory which was scanned completely
+
+        Returns
+        -------
+        nb_removed : int
+        """
+        prefix = os.path.join(os.path.abspath(root), "")
+        cursor = self.connection.execute(
+            "DELETE FROM files WHERE run != ? AND substr(path, 1, ?) = ?",
+            (self.run, len(prefix), prefix),
+        )
+        self.connection.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Commit the files which were seen and close the database."""
+        self.connection.commit()
+        self.connection.close()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        result = self.connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return None if result is None else result[0]
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value)
+        )
+
+
+@contextmanager
+def open_index(
+    state_dir: Optional[str], name: str, options: Dict[str, Any]
+) -> Iterator[Optional[FileIndex]]:
+    """
+    Open the FileIndex {name}.sqlite in state_dir, or give None.
+
+    Parameters
+    ----------
+    state_dir : Optional[str]
+    name : str
+        e.g. the kind of the files
+    options : Dict[str, Any]
+        See FileIndex
+    """
+    if state_dir is None:
+        yield None
+        return
+    index = FileIndex(os.path.join(state_dir, f"{name}.sqlite"), options)
+    try:
+        yield index
+    finally:
+        index.close()
+
+
+def scan_files(
+    root: str,
+    paths: Iterable[str],
+    scan: ScanFunction,
+    index: Optional[FileIndex] = None,
+    retry: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    batch_size: int = SCAN_BATCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield a row for each file, scanning only the files which changed.
+
+    The rows of unchanged files are yielded from the index while walking
+    through the paths. Changed files are scanned in batches of batch_size
+    while walking, so the walk runs ahead of the scan by at most one batch,
+    and the rows of the scanned files are yielded as soon as scan gives
+    them.
+
+    Parameters
+    ----------
+    root : str
+        The directory in which paths were found
+    paths : Iterable[str]
+        Absolute paths of all files below root
+    scan : ScanFunction
+    index : Optional[FileIndex]
+        Without an index, all files are scanned
+    retry : Optional[Callable[[Dict[str, Any]], bool]]
+        Rows for which this is true, e.g. of timeouts, are not stored, so
+        that their files are scanned again the next time
+    batch_size : int
+
+    Yields
+    ------
+    row : Dict[str, Any]
+    """
+    if index is None:
+        for _, row in scan(paths):
+            yield row
+        return
+    batch: Dict[str, os.stat_result] = {}
+    nb_scanned = 0
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:  # Deleted during the scan or broken link
+            continue
+        indexed_row = index.get(path, stat)
+        if indexed_row is not None:
+            yield indexed_row
+            continue
+        batch[path] = stat
+        if len(batch) >= batch_size:
+            yield from _scan_batch(batch, scan, index, retry)
+            nb_scanned += len(batch)
+            batch = {}
+    yield from _scan_batch(batch, scan, index, retry)
+    nb_scanned += len(batch)
+    logger.info(f"Scanned {nb_scanned} new or changed files")
+    nb_removed = index.prune(root)
+    if nb_removed > 0:
+        logger.info(f"Removed {nb_removed} deleted files from the index")
+
+
+def _scan_batch(
+    stats: Dict[str, os.stat_result],
+    scan: ScanFunction,
+    index: FileIndex,
+    retry: Optional[Callable[[Dict[str, Any]], bool]],
+) -> Iterator[Dict[str, Any]]:
+    """Scan the files of a batch and store their rows."""
+    if len(stats) == 0:
+        return
+    for path, row in scan(list(stats)):
+        if retry is None or not retry(row):
+            index.put(path, stats[path], row)
+        yield row
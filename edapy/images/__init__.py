@@ -5,7 +5,7 @@ import csv
 import logging
 import os
 from collections import OrderedDict
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Third party
 import cfg_load
@@ -16,6 +16,7 @@ import pkg_resources
 
 # First party
 import edapy.images.exif
+from edapy.file_index import open_index, scan_files
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +39,15 @@ def entry_point() -> None:
     required=True,
     type=click.File("w"),
 )
-def find(path: str, output) -> None:
+@click.option(
+    "--state-dir",
+    help=(
+        "Directory with an index of the analyzed image files. Unchanged files "
+        "are taken from it and an interrupted run continues where it stopped"
+    ),
+    type=click.Path(file_okay=False),
+)
+def find(path: str, output, state_dir: Optional[str] = None) -> None:
     """
     Find all image files in a directory and get metadata of them.
 
@@ -46,23 +55,32 @@ def find(path: str, output) -> None:
     ----------
     path : str
     output : filepointer
+    state_dir : Optional[str]
+        See edapy.file_index.FileIndex
     """
-    data: List[Dict] = []
-
     filepath = pkg_resources.resource_filename("edapy", "config/images.yaml")
     cfg = cfg_load.load(filepath)
 
-    for dirpath, _dirnames, filenames in os.walk("."):
+    def scan(image_paths: Iterable[str]) -> Iterator[Tuple[str, Dict]]:
+        for image_path in image_paths:
+            yield image_path, get_image_info(image_path)
+
+    image_paths = find_images(path, cfg["file_extensions"])
+    with open_index(state_dir, "images", {"keys": cfg["keys"]}) as index:
+        write_csv(scan_files(path, image_paths, scan, index), output)
+
+
+def find_images(path: str, file_extensions: List[str]) -> Iterator[str]:
+    """Yield the absolute paths of all image files in a directory tree."""
+    for dirpath, _dirnames, filenames in os.walk(path):
         files_in_dir = [
             f
             for f in filenames
-            for ext in cfg["file_extensions"]
+            for ext in file_extensions
             if f.lower().endswith("." + ext)
         ]
         for filename in files_in_dir:
-            image_path = os.path.abspath(os.path.join(dirpath, filename))
-            data.append(get_image_info(image_path))
-    write_csv(data, output)
+            yield os.path.abspath(os.path.join(dirpath, filename))
 
 
 def get_image_info(image_path: str) -> Dict:
@@ -102,18 +120,24 @@ def get_image_info(image_path: str) -> Dict:
     return info
 
 
-def write_csv(data: List[Dict], output_filepointer, delimiter: str = ";") -> None:
+def write_csv(data: Iterable[Dict], output_filepointer, delimiter: str = ";") -> None:
     """
     Write data to a CSV file.
 
+    Each row is written as soon as it is generated. The columns are the
+    keys of the first row.
+
     Parameters
     ----------
-    data : List[Dict]
+    data : Iterable[Dict]
     output_filepointer : filepointer
     delimiter : str, optional (default: ';')
     """
-    writer = csv.DictWriter(
-        output_filepointer, fieldnames=data[0].keys(), delimiter=delimiter
-    )
-    writer.writeheader()
-    writer.writerows(data)
+    writer = None
+    for row in data:
+        if writer is None:
+            writer = csv.DictWriter(
+                output_filepointer, fieldnames=row.keys(), delimiter=delimiter
+            )
+            writer.writeheader()
+        writer.writerow(row)
@@ -5,19 +5,54 @@ import csv
 import logging
 import os
 import shutil
+import signal
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
-from difflib import SequenceMatcher
-from tempfile import mkstemp
-from typing import Dict, List, Optional
+from typing import (
+    BinaryIO,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 # Third party
 import click
+import numpy as np
 import pkg_resources
 import PyPDF2.utils
 from PyPDF2 import PdfFileReader
 
+# First party
+from edapy.file_index import open_index, scan_files
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_TIMEOUT = 120.0
+# Number of files which are submitted to each worker process in advance
+PENDING_PER_JOB = 4
+# pdftotext gets killed before the alarm interrupts the Python code
+TIMEOUT_GRACE = 1.0
+# Backends of get_text and count_characters
+TEXT_EXTRACTORS = ["pdftotext", "pypdf2"]
+# Odd base of the rolling hash modulo 2**64 and its multiplicative inverse
+HASH_BASE = 0x9E3779B97F4A7C15
+HASH_BASE_INVERSE = 0xF1DE83E19937733D
+# Candidates of a common substring which are compared as strings
+MAX_VERIFIED_CANDIDATES = 8
+
+
+class PdfTimeoutError(Exception):
+    """Analyzing a PDF file took longer than the timeout."""
+
 
 @dataclass
 class PdfInfo:
@@ -27,9 +62,66 @@ class PdfInfo:
     nb_pages: int = -1
     nb_toc_top_level: int = 0
     nb_characters: int = 0
+    is_timed_out: bool = False
+    # Only set if PdfScanConfig.watermark is set, see find_watermark
+    watermark: Optional[str] = None
     user_attributes: Dict[str, Optional[str]] = field(default_factory=dict)
 
 
+@dataclass(frozen=True)
+class PdfScanConfig:
+    """
+    Document information keys, loaded once for all PDF files of a scan.
+
+    Parameters
+    ----------
+    keys : Tuple[str, ...]
+        Keys which become columns of the user_attributes, in this order
+    ignore_keys : FrozenSet[str]
+        Keys which are neither columns nor logged as unknown
+    text_extractor : str
+        One of TEXT_EXTRACTORS, see count_characters
+    watermark : bool
+        Find the text which is on all pages, see find_watermark
+    """
+
+    keys: Tuple[str, ...] = ()
+    ignore_keys: FrozenSet[str] = frozenset()
+    text_extractor: str = "pdftotext"
+    watermark: bool = False
+    known_keys: FrozenSet[str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.text_extractor not in TEXT_EXTRACTORS:
+            raise ValueError(
+                f"Unknown text extractor '{self.text_extractor}', "
+                f"use one of {TEXT_EXTRACTORS}"
+            )
+        object.__setattr__(
+            self, "known_keys", frozenset(self.keys) | frozenset(self.ignore_keys)
+        )
+
+    @classmethod
+    def load(
+        cls,
+        keys_path: str = "~/.edapy/pdf_keys.csv",
+        ignore_keys_path: str = "~/.edapy/pdf_ignore_keys.csv",
+        text_extractor: str = "pdftotext",
+        watermark: bool = False,
+    ) -> "PdfScanConfig":
+        """Read the keys from the config files, see get_flat_cfg_file."""
+        return cls(
+            keys=tuple(get_flat_cfg_file(path=keys_path)),
+            ignore_keys=frozenset(get_flat_cfg_file(path=ignore_keys_path)),
+            text_extractor=text_extractor,
+            watermark=watermark,
+        )
+
+
+# The configuration of the scan in a worker process, see _init_worker
+_worker_config: Optional[PdfScanConfig] = None
+
+
 @click.group(name="pdf")
 def entry_point() -> None:
     """Analyze PDF files."""
@@ -48,7 +140,52 @@ def entry_point() -> None:
     required=True,
     type=click.File("w"),
 )
-def find(path: str, output) -> None:
+@click.option(
+    "--jobs",
+    help="Number of processes which analyze PDF files in parallel",
+    default=1,
+    show_default=True,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--timeout",
+    help="Seconds after which the analysis of a single PDF file is stopped",
+    default=DEFAULT_TIMEOUT,
+    show_default=True,
+    type=click.FloatRange(min=0, min_open=True),
+)
+@click.option(
+    "--text-extractor",
+    help=(
+        "Count the characters with the pdftotext binary or with PyPDF2 in "
+        "the same process, which is faster but extracts less text"
+    ),
+    default="pdftotext",
+    show_default=True,
+    type=click.Choice(TEXT_EXTRACTORS),
+)
+@click.option(
+    "--watermark",
+    help="Add a column with the longest text which is on all pages",
+    is_flag=True,
+)
+@click.option(
+    "--state-dir",
+    help=(
+        "Directory with an index of the analyzed PDF files. Unchanged files "
+        "are taken from it and an interrupted run continues where it stopped"
+    ),
+    type=click.Path(file_okay=False),
+)
+def find(
+    path: str,
+    output,
+    jobs: int = 1,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    text_extractor: str = "pdftotext",
+    watermark: bool = False,
+    state_dir: Optional[str] = None,
+) -> None:
     """
     Find all PDF files in a directory and get metadata of them.
 
@@ -56,23 +193,184 @@ def find(path: str, output) -> None:
     ----------
     path : str
     output : filepointer
+    jobs : int (default: 1)
+    timeout : Optional[float]
+        Seconds per PDF file
+    text_extractor : str (default: "pdftotext")
+    watermark : bool (default: False)
+    state_dir : Optional[str]
+        See edapy.file_index.FileIndex
     """
-    data: List[PdfInfo] = []
-    for dirpath, _dirnames, filenames in os.walk("."):
+    config = PdfScanConfig.load(text_extractor=text_extractor, watermark=watermark)
+    exclude = [] if watermark else ["watermark"]
+
+    def scan(pdf_paths: Iterable[str]) -> Iterator[Tuple[str, Dict]]:
+        for info in scan_pdfs(pdf_paths, config, jobs=jobs, timeout=timeout):
+            row = asdict(info)
+            yield info.path, {key: row[key] for key in row if key not in exclude}
+
+    options = {
+        "keys": config.keys,
+        "text_extractor": text_extractor,
+        "watermark": watermark,
+    }
+    with open_index(state_dir, "pdf", options) as index:
+        rows = scan_files(
+            path,
+            find_pdfs(path),
+            scan,
+            index,
+            # A larger --timeout may be enough the next time
+            retry=lambda row: row["is_timed_out"],
+        )
+        write_csv(rows, output)
+
+
+def find_pdfs(path: str) -> Iterator[str]:
+    """Yield the absolute paths of all PDF files in a directory tree."""
+    for dirpath, _dirnames, filenames in os.walk(path):
         for filename in [f for f in filenames if f.lower().endswith(".pdf")]:
-            pdf_path = os.path.abspath(os.path.join(dirpath, filename))
-            data.append(get_pdf_info(pdf_path))
-    write_csv([asdict(row) for row in data], output)
+            yield os.path.abspath(os.path.join(dirpath, filename))
+
+
+def scan_pdfs(
+    pdf_paths: Iterable[str],
+    config: Optional[PdfScanConfig] = None,
+    jobs: int = 1,
+    timeout: Optional[float] = None,
+) -> Iterator[PdfInfo]:
+    """
+    Get meta information of PDF files, with multiple processes if jobs > 1.
+
+    At most PENDING_PER_JOB files per process are submitted in advance, so
+    the directory walk does not run ahead of the analysis. With multiple
+    processes, the information is yielded in the order in which the files
+    are done. The config is sent to each process once, not with each file.
+
+    Parameters
+    ----------
+    pdf_paths : Iterable[str]
+    config : Optional[PdfScanConfig]
+        Loaded from the config files if it is not given
+    jobs : int (default: 1)
+    timeout : Optional[float]
+        Seconds per PDF file, see scan_pdf
+
+    Yields
+    ------
+    info : PdfInfo
+    """
+    if config is None:
+        config = PdfScanConfig.load()
+    if jobs == 1:
+        for pdf_path in pdf_paths:
+            yield scan_pdf(pdf_path, config, timeout)
+        return
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(config,)
+    ) as executor:
+        pending: Set[Future] = set()
+        for pdf_path in pdf_paths:
+            if len(pending) >= jobs * PENDING_PER_JOB:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(_scan_pdf_in_worker, pdf_path, timeout))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _init_worker(config: PdfScanConfig) -> None:
+    global _worker_config
+    _worker_config = config
+
+
+def _scan_pdf_in_worker(pdf_path: str, timeout: Optional[float]) -> PdfInfo:
+    return scan_pdf(pdf_path, _worker_config, timeout)
+
+
+def scan_pdf(
+    pdf_path: str,
+    config: Optional[PdfScanConfig] = None,
+    timeout: Optional[float] = None,
+) -> PdfInfo:
+    """
+    Get meta information of a PDF file within a timeout.
+
+    pdftotext is killed when the timeout is over. Parsing the PDF is
+    interrupted by SIGALRM shortly after that, which is not available on
+    Windows.
+
+    Parameters
+    ----------
+    pdf_path : str
+    config : Optional[PdfScanConfig]
+    timeout : Optional[float]
+        Seconds. PDF files which take longer are marked with is_timed_out
+
+    Returns
+    -------
+    info : PdfInfo
+    """
+    alarm = None if timeout is None else timeout + TIMEOUT_GRACE
+    try:
+        with _time_limit(alarm):
+            return get_pdf_info(pdf_path, config, timeout=timeout)
+    except (PdfTimeoutError, subprocess.TimeoutExpired):
+        logger.warning(f"Timeout after {timeout}s for PDF '{pdf_path}'")
+        return PdfInfo(path=pdf_path, is_errornous=True, is_timed_out=True)
+
+
+@contextmanager
+def _time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """Raise PdfTimeoutError in the main thread after the given seconds."""
+    if seconds is None or not hasattr(signal, "SIGALRM"):
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise PdfTimeoutError(f"Timeout after {seconds}s")
+
+    previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
 
 
-def get_pdf_info(pdf_path: str) -> PdfInfo:
-    """Get meta information of a PDF file."""
+def get_pdf_info(
+    pdf_path: str,
+    config: Optional[PdfScanConfig] = None,
+    timeout: Optional[float] = None,
+) -> PdfInfo:
+    """
+    Get meta information of a PDF file.
+
+    Parameters
+    ----------
+    pdf_path : str
+    config : Optional[PdfScanConfig]
+        Loaded from the config files if it is not given. Pass it when
+        analyzing many files
+    timeout : Optional[float]
+        Seconds. pdftotext raises subprocess.TimeoutExpired if it does not
+        finish before
+
+    Returns
+    -------
+    info : PdfInfo
+    """
+    start = time.monotonic()
     info: PdfInfo = PdfInfo(path=pdf_path)
 
-    keys = get_flat_cfg_file(path="~/.edapy/pdf_keys.csv")
-    ignore_keys = get_flat_cfg_file(path="~/.edapy/pdf_ignore_keys.csv")
+    if config is None:
+        config = PdfScanConfig.load()
 
-    for key in keys:
+    for key in config.keys:
         info.user_attributes[key] = None
     info.is_errornous = False
     info.is_encrypted = False
@@ -81,25 +379,8 @@ def get_pdf_info(pdf_path: str) -> PdfInfo:
     info.nb_characters = 0
 
     with open(pdf_path, "rb") as fp:
-        try:
-            pdf_toread = PdfFileReader(fp, strict=False)
-        except PyPDF2.utils.PdfReadError:
-            info.is_errornous = True
-            return info
-        except KeyError as e:
-            logger.warning(
-                "https://github.com/mstamy2/PyPDF2/issues/388 for "
-                f" PDF '{pdf_path}': {e}"
-            )
-            return info
-        except OSError as e:
-            logger.warning(f"OSError for PDF '{pdf_path}': {e}")
-            return info
-        except AssertionError as e:
-            logger.warning(f"AssertionError for PDF '{pdf_path}': {e}")
-            return info
-        except TypeError as e:
-            logger.warning(f"TypeError for PDF '{pdf_path}': {e}")
+        pdf_toread = _open_reader(fp, info)
+        if pdf_toread is None:
             return info
 
         try:
@@ -112,16 +393,39 @@ def get_pdf_info(pdf_path: str) -> PdfInfo:
         except TypeError as e:
             logger.error(f"{pdf_path}: TypeError {e}")
 
-        info_t = enhance_pdf_info(info, pdf_toread, pdf_path, keys, ignore_keys)
+        if timeout is not None:
+            timeout = max(timeout - (time.monotonic() - start), 0)
+        info_t = enhance_pdf_info(info, pdf_toread, pdf_path, config, timeout=timeout)
     return info_t
 
 
+def _open_reader(fp: BinaryIO, info: PdfInfo) -> Optional[PdfFileReader]:
+    """Open a PDF file with PyPDF2, None if it can not be read."""
+    pdf_path = info.path
+    try:
+        return PdfFileReader(fp, strict=False)
+    except PyPDF2.utils.PdfReadError:
+        info.is_errornous = True
+    except KeyError as e:
+        logger.warning(
+            "https://github.com/mstamy2/PyPDF2/issues/388 for "
+            f" PDF '{pdf_path}': {e}"
+        )
+    except OSError as e:
+        logger.warning(f"OSError for PDF '{pdf_path}': {e}")
+    except AssertionError as e:
+        logger.warning(f"AssertionError for PDF '{pdf_path}': {e}")
+    except TypeError as e:
+        logger.warning(f"TypeError for PDF '{pdf_path}': {e}")
+    return None
+
+
 def enhance_pdf_info(
     info: PdfInfo,
     pdf_toread: PdfFileReader,
     pdf_path: str,
-    keys: List[str],
-    ignore_keys: List[str],
+    config: PdfScanConfig,
+    timeout: Optional[float] = None,
 ) -> PdfInfo:
     """
     Add information about a PDF.
@@ -140,8 +444,9 @@ def enhance_pdf_info(
     info : PdfInfo
     pdf_toread: PdfFileReader
     pdf_path: str
-    keys:
-    ignore_keys: List[str]
+    config: PdfScanConfig
+    timeout: Optional[float]
+        Seconds for extracting the text
 
     Returns
     -------
@@ -151,16 +456,20 @@ def enhance_pdf_info(
         pdf_info = pdf_toread.getDocumentInfo()
 
         info.nb_pages = pdf_toread.getNumPages()
-        text_content = get_text_pdftotextbin(pdf_path)
-        info.nb_characters = len(text_content)
+        if config.watermark:
+            page_texts = get_page_texts(
+                pdf_path, pdf_toread, extractor=config.text_extractor, timeout=timeout
+            )
+            info.nb_characters = sum(len(text) for text in page_texts)
+            info.watermark = find_watermark(page_texts)
+        else:
+            info.nb_characters = count_characters(
+                pdf_path, pdf_toread, extractor=config.text_extractor, timeout=timeout
+            )
 
         if pdf_info is not None:
             for key in pdf_info:
-                log = (
-                    key not in keys
-                    and key not in ignore_keys
-                    and not key.startswith("/FL#")
-                )
+                log = key not in config.known_keys and not key.startswith("/FL#")
                 if log:
                     logger.error(
                         "Unknown key '{key}' "
@@ -168,87 +477,342 @@ def enhance_pdf_info(
                             pdf=pdf_path, key=key, value=pdf_info[key]
                         )
                     )
-            for key in keys:
+            for key in config.keys:
                 info.user_attributes[key] = pdf_info.get(key, None)
     except PyPDF2.utils.PdfReadError:
         info.is_encrypted = True
     return info
 
 
-def get_watermark(pdf_filename: str, nb_pages: int) -> Optional[str]:
+def get_watermark(
+    pdf_filename: str,
+    nb_pages: Optional[int] = None,
+    extractor: str = "pdftotext",
+    timeout: Optional[float] = None,
+) -> Optional[str]:
     """
     Find potential watermark.
 
+    The text of all pages is extracted at once, see get_page_texts.
+
     Parameters
     ----------
     pdf_filename : str
-    nb_pages : int
+    nb_pages : Optional[int]
+        Only compare the first nb_pages pages
+    extractor : str (default: "pdftotext")
+        One of TEXT_EXTRACTORS
+    timeout : Optional[float]
+        Seconds for pdftotext
 
     Returns
     -------
     watermark : Optional[str]
+        None for documents with less than two pages
     """
-    last_watermark = None
-    last_text = None
-    text = None
-    for page in range(nb_pages):
-        last_text = text
-        text = get_text_pdftotextbin(pdf_filename, page=page)
-        if last_text is None:
-            continue
-        match = SequenceMatcher(None, text, last_text).find_longest_match(
-            0, len(text), 0, len(last_text)
-        )
-        possible_watermark = text[match.a : match.a + match.size]
-        if (last_watermark is None) or (possible_watermark in last_watermark):
-            last_watermark = possible_watermark
+    page_texts = get_page_texts(pdf_filename, extractor=extractor, timeout=timeout)
+    return find_watermark(page_texts[:nb_pages])
+
+
+def find_watermark(page_texts: Sequence[str]) -> Optional[str]:
+    r"""
+    Find the longest text which is on all pages.
+
+    Examples
+    --------
+    >>> find_watermark(["Intro\nDRAFT v2\f", "DRAFT v2\nEnd\f"])
+    'DRAFT v2'
+    >>> find_watermark(["A single page"]) is None
+    True
+    """
+    if len(page_texts) < 2:
+        return None
+    return find_common_substring([text.rstrip("\f") for text in page_texts])
+
+
+def find_common_substring(texts: Sequence[str]) -> str:
+    """
+    Find the longest string which is a substring of all texts.
+
+    The length is found by a binary search. For each length, the rolling
+    hashes of all substrings of all texts are computed at once with numpy.
+    The hashes of the shortest text which occur in all other texts are
+    compared as strings to exclude hash collisions. This takes
+    O(n log(m)) for n characters in total and a shortest text of length m.
+
+    Parameters
+    ----------
+    texts : Sequence[str]
+
+    Returns
+    -------
+    common_substring : str
+        The first one in the shortest text, if there are several
+
+    Examples
+    --------
+    >>> find_common_substring(["xabcy", "abcz", "zzabc"])
+    'abc'
+    >>> find_common_substring(["ab", "cd"])
+    ''
+    """
+    if len(texts) == 0:
+        return ""
+    texts = sorted(texts, key=len)
+    if len(texts) == 1 or len(texts[0]) == 0:
+        return texts[0]
+    lengths = np.array([len(text) for text in texts])
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    # UTF-32 has one code unit per character
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(
+        np.uint64
+    )
+    text_ids = np.repeat(np.arange(len(texts)), lengths)
+    text_ends = offsets[1:][text_ids]
+    # prefix[i] is the sum of codes[j] * HASH_BASE**j for j < i, so
+    # (prefix[i + k] - prefix[i]) * HASH_BASE_INVERSE**i is the hash of the
+    # substring of length k at i. uint64 arrays wrap around on overflow.
+    # prefix is padded, so that it can be sliced for all i and k.
+    positions = np.arange(len(codes))
+    inverse_powers = _uint64_powers(HASH_BASE_INVERSE, len(codes))
+    prefix = np.zeros(len(codes) + 1 + len(texts[0]), dtype=np.uint64)
+    np.cumsum(
+        codes * _uint64_powers(HASH_BASE, len(codes)), out=prefix[1:][: len(codes)]
+    )
+    prefix[len(codes) + 1 :] = prefix[len(codes)]
+    # The shortest text, then blocks of 1, 2, 4, ... texts. The first blocks
+    # leave few candidates, which are cheap to look up in the large blocks.
+    blocks = [(0, 1)]
+    while blocks[-1][1] < len(texts):
+        first = blocks[-1][1]
+        blocks.append((first, min(2 * first, len(texts))))
+
+    def find_common(length: int) -> Optional[str]:
+        candidates = shortest_hashes = np.array([], dtype=np.uint64)
+        for first, last in blocks:
+            start, end = offsets[first], offsets[last]
+            hashes = (
+                prefix[start + length : end + length] - prefix[start:end]
+            ) * inverse_powers[start:end]
+            is_valid = positions[start:end] + length <= text_ends[start:end]
+            hashes = hashes[is_valid]
+            if first == 0:
+                candidates = np.unique(hashes)
+                shortest_hashes = hashes
+                continue
+            indices = np.minimum(
+                np.searchsorted(candidates, hashes), len(candidates) - 1
+            )
+            found = candidates[indices] == hashes
+            # Keep the candidates which are found in all texts of the block
+            block_ids = text_ids[start:end][is_valid][found] - first
+            pairs = np.unique(indices[found] * (last - first) + block_ids)
+            counts = np.bincount(pairs // (last - first), minlength=len(candidates))
+            candidates = candidates[counts == last - first]
+            if len(candidates) == 0:
+                return None
+        verified_hashes = candidates[:MAX_VERIFIED_CANDIDATES]
+        for start in np.flatnonzero(np.isin(shortest_hashes, verified_hashes)):
+            substring = texts[0][start : start + length]
+            if all(substring in text for text in texts[1:]):
+                return substring
+        return None
+
+    common_substring = ""
+    low, high = 1, len(texts[0])
+    while low <= high:
+        middle = (low + high) // 2
+        found_substring = find_common(middle)
+        if found_substring is None:
+            high = middle - 1
         else:
-            last_watermark = ""
-    return last_watermark
+            common_substring, low = found_substring, middle + 1
+    return common_substring
+
 
+def _uint64_powers(base: int, n: int) -> np.ndarray:
+    """Get base**0, ..., base**(n - 1) modulo 2**64."""
+    factors = np.full(n, base, dtype=np.uint64)
+    factors[:1] = 1
+    return np.cumprod(factors, dtype=np.uint64)
 
-def get_text_pdftotextbin(pdf_filename: str, page: Optional[int] = None) -> str:
+
+def get_page_texts(
+    pdf_path: str,
+    pdf_toread: Optional[PdfFileReader] = None,
+    extractor: str = "pdftotext",
+    timeout: Optional[float] = None,
+) -> List[str]:
+    """
+    Extract the text of each page of a PDF file in one pass.
+
+    pdftotext runs once for all pages and ends each page with a form feed,
+    so the lengths of the pages add up to the length of get_text.
+
+    Parameters
+    ----------
+    pdf_path : str
+    pdf_toread : Optional[PdfFileReader]
+        The opened PDF file, which the pypdf2 extractor reuses
+    extractor : str (default: "pdftotext")
+        One of TEXT_EXTRACTORS
+    timeout : Optional[float]
+        Seconds for pdftotext
+
+    Returns
+    -------
+    page_texts : List[str]
+    """
+    if extractor == "pdftotext":
+        text = get_text_pdftotextbin(pdf_path, timeout=timeout)
+        page_texts = [page_text + "\f" for page_text in text.split("\f")]
+        page_texts[-1] = page_texts[-1][:-1]
+        if page_texts[-1] == "":
+            page_texts.pop()
+        return page_texts
+    elif extractor == "pypdf2":
+        return list(_iter_page_texts_pypdf2(pdf_path, pdf_toread))
+    raise ValueError(f"Unknown text extractor '{extractor}'")
+
+
+def get_text(
+    pdf_path: str,
+    pdf_toread: Optional[PdfFileReader] = None,
+    extractor: str = "pdftotext",
+    page: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Extract the text of a PDF file.
+
+    Parameters
+    ----------
+    pdf_path : str
+    pdf_toread : Optional[PdfFileReader]
+        The opened PDF file, which the pypdf2 extractor reuses
+    extractor : str (default: "pdftotext")
+        One of TEXT_EXTRACTORS
+    page : Optional[int]
+        Only extract the text of this page, starting at 0
+    timeout : Optional[float]
+        Seconds for pdftotext
+
+    Returns
+    -------
+    text : str
+    """
+    if extractor == "pdftotext":
+        # pdftotext counts pages from 1
+        pdftotext_page = None if page is None else page + 1
+        return get_text_pdftotextbin(pdf_path, page=pdftotext_page, timeout=timeout)
+    elif extractor == "pypdf2":
+        return "".join(_iter_page_texts_pypdf2(pdf_path, pdf_toread, page))
+    raise ValueError(f"Unknown text extractor '{extractor}'")
+
+
+def count_characters(
+    pdf_path: str,
+    pdf_toread: Optional[PdfFileReader] = None,
+    extractor: str = "pdftotext",
+    timeout: Optional[float] = None,
+) -> int:
+    """
+    Count the characters of the text of a PDF file.
+
+    This gives len(get_text(...)) without building the text: The UTF-8
+    output of pdftotext is counted as bytes and the pypdf2 extractor counts
+    page by page.
+
+    Parameters
+    ----------
+    pdf_path : str
+    pdf_toread : Optional[PdfFileReader]
+        The opened PDF file, which the pypdf2 extractor reuses
+    extractor : str (default: "pdftotext")
+        One of TEXT_EXTRACTORS
+    timeout : Optional[float]
+        Seconds for pdftotext
+
+    Returns
+    -------
+    nb_characters : int
+    """
+    if extractor == "pdftotext":
+        return count_utf8_characters(_run_pdftotext(pdf_path, timeout=timeout))
+    elif extractor == "pypdf2":
+        return sum(len(text) for text in _iter_page_texts_pypdf2(pdf_path, pdf_toread))
+    raise ValueError(f"Unknown text extractor '{extractor}'")
+
+
+def count_utf8_characters(data: bytes) -> int:
+    """
+    Count the characters of UTF-8 encoded bytes without decoding them.
+
+    Every byte except the continuation bytes 0b10xxxxxx starts a character.
+
+    Examples
+    --------
+    >>> count_utf8_characters("Größe €".encode("utf8"))
+    7
+    """
+    values = np.frombuffer(data, dtype=np.uint8)
+    return int(np.count_nonzero((values & 0xC0) != 0x80))
+
+
+def get_text_pdftotextbin(
+    pdf_filename: str, page: Optional[int] = None, timeout: Optional[float] = None
+) -> str:
     """
     Extract text from PDF with pdftotext.
 
     Parameters
     ----------
     pdf_filename : str
+    page : Optional[int]
+        Only extract the text of this page, starting at 1
+    timeout : Optional[float]
+        Seconds after which pdftotext is killed and
+        subprocess.TimeoutExpired is raised
 
     Returns
     -------
     str
     """
-    # Core Library
-    import codecs
-    import subprocess
-
-    _, tmp_filename = mkstemp(prefix="edapy_file_pdf_batch_analyze_", suffix=".txt")
-    with codecs.open(os.devnull, "wb", encoding="utf8") as devnull:
-        if page is None:
-            subprocess.check_call(
-                ["pdftotext", pdf_filename, tmp_filename],
-                stdout=devnull,
-                stderr=subprocess.STDOUT,
-            )
-        else:
-            subprocess.check_call(
-                [
-                    "pdftotext",
-                    f"{pdf_filename}",
-                    "-f",
-                    str(page),
-                    "-l",
-                    str(page),
-                    tmp_filename,
-                ],
-                stdout=devnull,
-                stderr=subprocess.STDOUT,
+    return _run_pdftotext(pdf_filename, page=page, timeout=timeout).decode("utf8")
+
+
+def _run_pdftotext(
+    pdf_filename: str, page: Optional[int] = None, timeout: Optional[float] = None
+) -> bytes:
+    """Get the UTF-8 encoded text which pdftotext writes to stdout."""
+    command = ["pdftotext", "-enc", "UTF-8", pdf_filename, "-"]
+    if page is not None:
+        command[1:1] = ["-f", str(page), "-l", str(page)]
+    process = subprocess.run(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        timeout=timeout,
+        check=True,
+    )
+    return process.stdout
+
+
+def _iter_page_texts_pypdf2(
+    pdf_path: str,
+    pdf_toread: Optional[PdfFileReader] = None,
+    page: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield the text of each page, extracted by PyPDF2 in this process."""
+    if pdf_toread is None:
+        with open(pdf_path, "rb") as fp:
+            yield from _iter_page_texts_pypdf2(
+                pdf_path, PdfFileReader(fp, strict=False), page
             )
-    with codecs.open(tmp_filename, "r", encoding="utf8") as f:
-        contents = f.read()
-    os.remove(tmp_filename)
-    return contents
+        return
+    pages = range(pdf_toread.getNumPages()) if page is None else [page]
+    for page_number in pages:
+        yield pdf_toread.getPage(page_number).extractText()
 
 
 def get_flat_cfg_file(path: str = "~/.edapy/pdf_ignore_keys.csv") -> List[str]:
@@ -279,22 +843,27 @@ def get_flat_cfg_file(path: str = "~/.edapy/pdf_ignore_keys.csv") -> List[str]:
     return ignore_keys
 
 
-def write_csv(data: List[Dict], output_filepointer, delimiter: str = ";") -> None:
+def write_csv(data: Iterable[Dict], output_filepointer, delimiter: str = ";") -> None:
     """
     Write data to a CSV file.
 
+    Each row is written as soon as it is generated. The columns are the
+    keys of the first row.
+
     Parameters
     ----------
-    data : List[Mapping]
+    data : Iterable[Mapping]
     output_filepointer : filepointer
     delimiter : str, optional (default: ';')
     """
-    boolean_columns = ["is_encrypted", "is_errornous"]
-    for i in range(len(data)):
+    boolean_columns = ["is_encrypted", "is_errornous", "is_timed_out"]
+    writer = None
+    for row in data:
         for col in boolean_columns:
-            data[i][col] = int(data[i][col])
-    writer = csv.DictWriter(
-        output_filepointer, fieldnames=data[0].keys(), delimiter=delimiter
-    )
-    writer.writeheader()
-    writer.writerows(data)
+            row[col] = int(row[col])
+        if writer is None:
+            writer = csv.DictWriter(
+                output_filepointer, fieldnames=row.keys(), delimiter=delimiter
+            )
+            writer.writeheader()
+        writer.writerow(row)
@@ -14,7 +14,9 @@ requires_tests = [
     "pytest-mccabe",
     "simplejson",
 ]
-requires_all = requires_tests
+requires_arrow = ["pyarrow>=7.0.0"]
+requires_zstd = ["zstandard"]
+requires_all = requires_tests + requires_arrow + requires_zstd
 
 
 # If you adjust any of the following, run `pip-compile` to update the
@@ -22,7 +24,12 @@ requires_all = requires_tests
 # You can find `pip-compile` in https://github.com/jazzband/pip-tools
 
 setup(
-    extras_require={"all": requires_all, "tests": requires_tests},
+    extras_require={
+        "all": requires_all,
+        "arrow": requires_arrow,
+        "tests": requires_tests,
+        "zstd": requires_zstd,
+    },
     install_requires=[
         "cfg_load>=0.3.1",
         "click>=6.7",
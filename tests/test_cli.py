@@ -27,3 +27,23 @@ def test_cli_images_find():
     result = runner.invoke(cli.entry_point, command)
     assert result.exit_code == 0, "edapy " + " ".join(command)
     os.remove(out_file)
+
+
+def test_cli_csv_predict_chunked():
+    runner = CliRunner()
+    csv_path = resource_filename(__name__, "data/example.csv")
+    _, csv_types_path = tempfile.mkstemp(prefix="edapy_types_", suffix=".yaml")
+    os.remove(csv_types_path)
+    command = [
+        "csv",
+        "predict",
+        "--csv_path",
+        csv_path,
+        "--types",
+        csv_types_path,
+        "--chunksize",
+        "2",
+    ]
+    result = runner.invoke(cli.entry_point, command)
+    assert result.exit_code == 0, "edapy " + " ".join(command)
+    os.remove(csv_types_path)
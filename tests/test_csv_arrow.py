@@ -0,0 +1,53 @@
+# Third party
+import pandas as pd
+import pytest
+from pkg_resources import resource_filename
+
+# First party
+from edapy.csv.describe import _generate_column_info
+from edapy.csv.stats import compute_stats
+
+pa = pytest.importorskip("pyarrow")
+
+# First party
+from edapy.csv.arrow import (  # noqa: E402
+    STATS_SCHEMA,
+    profile_table,
+    read_csv_arrow,
+    stats_to_table,
+)
+
+
+def test_profile_table_equals_pandas():
+    csv_path = resource_filename(__name__, "data/example.csv")
+    df = pd.read_csv(csv_path)
+    expected = compute_stats(df, *_generate_column_info(df, {}))
+    stats = profile_table(read_csv_arrow(csv_path))
+    assert stats.nb_rows == expected.nb_rows
+    for column_name, column_stats in expected.columns.items():
+        arrow_stats = stats.columns[column_name]
+        assert arrow_stats.kind == column_stats.kind
+        assert arrow_stats.dtype == column_stats.dtype
+        assert arrow_stats.non_nan == column_stats.non_nan
+        assert arrow_stats.value_count == column_stats.value_count
+        for field in ["mean", "std", "min", "q25", "q50", "q75", "max"]:
+            assert getattr(arrow_stats, field) == pytest.approx(
+                getattr(column_stats, field), nan_ok=True
+            )
+
+
+def test_read_csv_arrow_nrows():
+    csv_path = resource_filename(__name__, "data/example.csv")
+    assert read_csv_arrow(csv_path, nrows=2).num_rows == 2
+
+
+def test_stats_to_table():
+    csv_path = resource_filename(__name__, "data/example.csv")
+    stats = profile_table(read_csv_arrow(csv_path), percentiles=[99])
+    table = stats_to_table(stats)
+    assert table.schema == STATS_SCHEMA
+    assert table.column("name").to_pylist() == list(stats.columns)
+    assert set(table.column("nb_rows").to_pylist()) == {stats.nb_rows}
+    # Profiles of different files can be stacked
+    other = stats_to_table(profile_table(pa.table({"x": ["a", "b"]})))
+    assert pa.concat_tables([table, other]).num_rows == len(stats.columns) + 1
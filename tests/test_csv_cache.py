@@ -0,0 +1,53 @@
+# Core Library
+import os
+import shutil
+
+# Third party
+from click.testing import CliRunner
+from pkg_resources import resource_filename
+
+# First party
+import edapy.csv
+from edapy.cli import entry_point
+from edapy.csv.cache import ProfileCache, fingerprint
+
+
+def test_fingerprint_changes_with_content(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("a,b\n1,2\n")
+    before = fingerprint(str(path))
+    assert fingerprint(str(path)) == before
+    path.write_text("a,b\n1,3\n")
+    os.utime(path, ns=(0, 0))
+    assert fingerprint(str(path)) != before
+
+
+def test_profile_cache_evicts_least_recently_used(tmp_path):
+    cache = ProfileCache(str(tmp_path), max_size=2500)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, b"x" * 1000)
+        os.utime(cache._path(key), ns=(i * 10**9, i * 10**9))
+        if key == "b":
+            cache.get("a")
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_cli_reuses_cached_profile(tmp_path, monkeypatch):
+    csv_path = str(tmp_path / "example.csv")
+    shutil.copy(resource_filename(__name__, "data/example.csv"), csv_path)
+    command = ["csv", "predict", "--csv_path", csv_path, "--cache-dir", str(tmp_path)]
+    runner = CliRunner()
+    first = runner.invoke(entry_point, command + ["--types", str(tmp_path / "1.yaml")])
+    assert first.exit_code == 0
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The CSV was profiled again")
+
+    monkeypatch.setattr(edapy.csv, "_profile_csv", fail)
+    second = runner.invoke(entry_point, command + ["--types", str(tmp_path / "2.yaml")])
+    assert second.exit_code == 0
+    # Warnings of the profiling are not repeated
+    assert first.output.endswith(second.output)
+    assert (tmp_path / "1.yaml").read_text() == (tmp_path / "2.yaml").read_text()
@@ -0,0 +1,111 @@
+# Third party
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pytest
+from click.testing import CliRunner
+
+# First party
+from edapy.cli import entry_point
+from edapy.csv.arrow import profile_table
+from edapy.csv.columnar import (
+    profile_columnar,
+    read_embedded_types,
+    read_parquet_statistics,
+)
+from edapy.csv.dialect import sniff_file_format
+from edapy.csv.interactive_type_finder import find_type_from_stats
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(0)
+    b = rng.normal(size=1000)
+    b[::7] = np.nan
+    df = pd.DataFrame(
+        {
+            "a": rng.integers(-5, 100, 1000).astype("int16"),
+            "b": b,
+            "c": rng.choice(["red", "green", "blue"], 1000),
+        }
+    )
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def test_sniff_file_format(table, tmp_path):
+    pq.write_table(table, tmp_path / "a.data")
+    feather.write_feather(table, tmp_path / "b.data")
+    (tmp_path / "c.data").write_text("a,b\n1,2\n")
+    assert sniff_file_format(str(tmp_path / "a.data")) == "parquet"
+    assert sniff_file_format(str(tmp_path / "b.data")) == "feather"
+    assert sniff_file_format(str(tmp_path / "c.data")) == "csv"
+
+
+def test_read_parquet_statistics(table, tmp_path):
+    path = tmp_path / "a.parquet"
+    pq.write_table(table, path, row_group_size=300)
+    stats = read_parquet_statistics(pq.ParquetFile(path))
+    assert stats.nb_rows == 1000
+    b = table.column("b").to_numpy()
+    assert stats.columns["b"].nb_null == np.isnan(b).sum()
+    assert stats.columns["b"].min == np.nanmin(b)
+    assert stats.columns["b"].max == np.nanmax(b)
+    assert stats.columns["a"].dtype == "int64"
+    assert stats.columns["a"].min == table.column("a").to_numpy().min()
+    assert np.isnan(stats.columns["a"].mean)
+    types = {col["name"]: col["type"] for col in find_type_from_stats(stats)}
+    assert types["a"] == "int"
+    assert types["b"] == "float"
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_profile_columnar_matches_profile_table(table, tmp_path, file_format):
+    path = str(tmp_path / f"a.{file_format}")
+    if file_format == "parquet":
+        pq.write_table(table, path, row_group_size=300)
+    else:
+        feather.write_feather(table, path)
+    stats = profile_columnar(path, percentiles=[99])
+    expected = profile_table(table, percentiles=[99])
+    assert stats == expected
+
+
+def test_profile_columnar_reuses_parquet_statistics(table, tmp_path, monkeypatch):
+    path = str(tmp_path / "a.parquet")
+    pq.write_table(table, path, row_group_size=300)
+    expected = profile_table(table)
+
+    def min_max(column):
+        raise AssertionError("The footer has the minimum and maximum")
+
+    monkeypatch.setattr(pc, "min_max", min_max)
+    stats = profile_columnar(path)
+    assert stats == expected
+    assert type(stats.columns["a"].min) is int
+    assert type(stats.columns["b"].min) is float
+
+
+def test_cli_predict_converted_parquet(tmp_path):
+    csv_path = str(tmp_path / "a.csv")
+    yaml_path = str(tmp_path / "a.yaml")
+    parquet_path = str(tmp_path / "a.parquet")
+    pd.DataFrame({"a": range(100), "b": ["x", "y", "z", "w"] * 25}).to_csv(
+        csv_path, index=False
+    )
+    runner = CliRunner()
+    command = ["csv", "predict", "--csv_path", csv_path, "--types", yaml_path]
+    assert runner.invoke(entry_point, command).exit_code == 0
+    command = ["csv", "convert", "--csv_path", csv_path, "--types", yaml_path]
+    assert (
+        runner.invoke(entry_point, command + ["--output", parquet_path]).exit_code == 0
+    )
+    command = ["csv", "predict", "--csv_path", parquet_path, "--metadata-only"]
+    result = runner.invoke(entry_point, command + ["--types", str(tmp_path / "b.yaml")])
+    assert result.exit_code == 0, result.output
+    assert "Number of datapoints: 100" in result.output
+    assert "     100   unknown   unknown" in result.output
+    columns = read_embedded_types(parquet_path)
+    assert [col["recommended_dtype"] for col in columns] == ["uint8", "category"]
@@ -0,0 +1,73 @@
+# Core Library
+import bz2
+import gzip
+import lzma
+import struct
+import zlib
+
+# Third party
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+# First party
+import edapy.csv.compression
+from edapy.csv.compression import detect_compression, open_decompressed
+from edapy.csv.dialect import sniff_dialect
+from edapy.csv.streaming import profile_csv_chunked
+
+
+def _bgzf_member(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    header = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00"
+    header += struct.pack("<H", len(header) + 2 + len(deflated) + 8 - 1)
+    return header + deflated + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+def _split(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+COMPRESSORS = {
+    "gzip": gzip.compress,
+    "bgzf": lambda data: b"".join(map(_bgzf_member, _split(data, 1000))),
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+    "zstd": lambda data: pa.compress(data, codec="zstd", asbytes=True),
+    # Skippable frame between the frames, as written by pzstd
+    "zstd-frames": lambda data: b"\x50\x2a\x4d\x18\x02\x00\x00\x00ab".join(
+        pa.compress(part, codec="zstd", asbytes=True) for part in _split(data, 1000)
+    ),
+}
+
+
+@pytest.fixture
+def csv_bytes():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"a": rng.integers(0, 100, 2000), "b": rng.random(2000)})
+    return df.to_csv(index=False, sep=";").encode()
+
+
+@pytest.mark.parametrize("name", sorted(COMPRESSORS))
+@pytest.mark.parametrize("threads", [1, 3])
+def test_open_decompressed(tmp_path, monkeypatch, csv_bytes, name, threads):
+    monkeypatch.setattr(edapy.csv.compression, "TASK_SIZE", 2000)
+    path = tmp_path / "a.csv.compressed"
+    path.write_bytes(COMPRESSORS[name](csv_bytes))
+    assert detect_compression(str(path)) == name.split("-")[0].replace("bgzf", "gzip")
+    with open_decompressed(str(path), threads=threads) as fp:
+        parts = iter(lambda: fp.read(777), b"")
+        assert b"".join(parts) == csv_bytes
+
+
+def test_profile_compressed_csv(tmp_path, csv_bytes):
+    plain = tmp_path / "a.csv"
+    plain.write_bytes(csv_bytes)
+    compressed = tmp_path / "a.csv.zst"
+    compressed.write_bytes(COMPRESSORS["zstd-frames"](csv_bytes))
+    assert detect_compression(str(plain)) is None
+    assert sniff_dialect(str(compressed)) == sniff_dialect(str(plain))
+    stats = profile_csv_chunked(str(compressed), chunksize=500, threads=2).to_stats()
+    assert stats == profile_csv_chunked(str(plain), chunksize=500).to_stats()
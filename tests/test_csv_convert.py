@@ -0,0 +1,64 @@
+# Third party
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import pytest
+from click.testing import CliRunner
+
+# First party
+from edapy.cli import entry_point
+from edapy.csv.convert import TYPES_METADATA_KEY, convert_csv, get_output_format
+
+
+@pytest.fixture
+def profiled_csv(tmp_path):
+    csv_path = str(tmp_path / "a.csv")
+    yaml_path = str(tmp_path / "a.yaml")
+    rng = np.random.default_rng(0)
+    pd.DataFrame(
+        {
+            "a": rng.integers(0, 100, 1000),
+            "b": rng.choice(["red", "green", "blue"], 1000),
+            "c": [None] * 500 + [f"id{i:08d}x" for i in range(500)],
+        }
+    ).to_csv(csv_path, index=False)
+    command = ["csv", "predict", "--csv_path", csv_path, "--types", yaml_path]
+    result = CliRunner().invoke(entry_point, command)
+    assert result.exit_code == 0, result.output
+    return csv_path, yaml_path
+
+
+def test_convert_parquet(profiled_csv, tmp_path):
+    csv_path, yaml_path = profiled_csv
+    output = str(tmp_path / "a.parquet")
+    command = ["csv", "convert", "--csv_path", csv_path, "--types", yaml_path]
+    command += ["--output", output, "--chunksize", "300"]
+    result = CliRunner().invoke(entry_point, command)
+    assert result.exit_code == 0, result.output
+    assert "Wrote 1000 rows" in result.output
+    parquet_file = pq.ParquetFile(output)
+    assert parquet_file.metadata.num_row_groups == 4
+    assert TYPES_METADATA_KEY in parquet_file.schema_arrow.metadata
+    statistics = parquet_file.metadata.row_group(0).column(0).statistics
+    assert statistics.has_min_max and statistics.null_count == 0
+    df = parquet_file.read().to_pandas()
+    assert df.dtypes.astype(str).tolist() == ["uint8", "category", "string"]
+    pd.testing.assert_frame_equal(
+        df.astype(object), pd.read_csv(csv_path).astype(object)
+    )
+
+
+def test_convert_feather(profiled_csv, tmp_path):
+    csv_path, yaml_path = profiled_csv
+    output = str(tmp_path / "a.feather")
+    assert convert_csv(csv_path, yaml_path, output, chunksize=300) == 1000
+    table = feather.read_table(output)
+    assert str(table.schema.field("a").type) == "uint8"
+    assert table.column("b").to_pylist() == pd.read_csv(csv_path)["b"].tolist()
+
+
+def test_get_output_format():
+    assert get_output_format("a.FEATHER") == "feather"
+    with pytest.raises(ValueError):
+        get_output_format("a.csv")
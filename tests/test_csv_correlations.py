@@ -0,0 +1,115 @@
+# Core Library
+import json
+import pickle
+
+# Third party
+import numpy as np
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+# First party
+from edapy.cli import entry_point
+from edapy.csv.correlations import CorrelationAccumulator, RowSample
+from edapy.csv.describe import profile_pandas_df, render_stats
+from edapy.csv.stats import DatasetStats
+from edapy.csv.streaming import AccumulatorConfig, DatasetAccumulator
+
+NUMERIC = ["x", "y", "z", "w"]
+CATEGORY = ["c", "d"]
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    x = rng.normal(1e6, 1, 3000)
+    y = x + rng.normal(0, 1, 3000)
+    df = pd.DataFrame(
+        {
+            "x": x,
+            "y": y,
+            "z": rng.integers(0, 5, 3000).astype(float),
+            "w": -((y - 1e6) ** 3),
+            "c": rng.choice(["a", "b"], 3000),
+        }
+    )
+    df["d"] = np.where(rng.random(3000) < 0.8, df["c"], "q")
+    return df
+
+
+def _accumulate(df, chunksize, block_size=3):
+    merged = CorrelationAccumulator(block_size=block_size)
+    for start in range(0, len(df), chunksize):
+        part = CorrelationAccumulator(block_size=block_size)
+        part.update(df.iloc[start : start + chunksize], NUMERIC, CATEGORY)
+        # Accumulators of shards are pickled by the worker processes
+        merged.merge(pickle.loads(pickle.dumps(part)))
+    return merged.to_correlations()
+
+
+@pytest.mark.parametrize("chunksize", [700, 3000])
+def test_correlations_equal_pandas(df, chunksize):
+    correlations = _accumulate(df, chunksize)
+    pd.testing.assert_frame_equal(correlations["pearson"], df[NUMERIC].corr())
+    pd.testing.assert_frame_equal(
+        correlations["spearman"], df[NUMERIC].corr(method="spearman")
+    )
+    assert correlations["spearman"].loc["y", "w"] == pytest.approx(-1)
+
+
+def test_pearson_with_missing_values(df):
+    df.iloc[::7, 1] = np.nan
+    df.iloc[::11, 3] = np.nan
+    correlations = _accumulate(df, 700)
+    pd.testing.assert_frame_equal(correlations["pearson"], df[NUMERIC].corr())
+
+
+def test_cramers_v(df):
+    cramers_v = _accumulate(df, 700)["cramers_v"]
+    table = pd.crosstab(df["c"], df["d"]).to_numpy()
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / table.sum()
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    assert cramers_v.loc["c", "d"] == pytest.approx(np.sqrt(chi2 / table.sum()))
+
+
+def test_cramers_v_leaves_out_large_columns(df):
+    df["d"] = np.arange(len(df)).astype(str)
+    accumulator = CorrelationAccumulator(max_categories=10)
+    accumulator.update(df, NUMERIC, CATEGORY)
+    assert list(accumulator.to_correlations()["cramers_v"].columns) == ["c"]
+
+
+def test_row_sample_is_bounded():
+    sample = RowSample(size=100)
+    for start in range(0, 1000, 300):
+        sample.update(pd.DataFrame({"a": np.arange(start, start + 300)}))
+    assert len(sample.rows) == 100
+    assert sample.rows["a"].nunique() == 100
+
+
+def test_dataset_accumulator_correlations(df):
+    accumulator = DatasetAccumulator(AccumulatorConfig(correlations=True))
+    for start in range(0, len(df), 1000):
+        accumulator.update(df.iloc[start : start + 1000])
+    stats = accumulator.to_stats()
+    expected = profile_pandas_df(df, correlations=True)
+    for method in ["pearson", "cramers_v"]:
+        pd.testing.assert_frame_equal(
+            stats.correlations[method], expected.correlations[method]
+        )
+    data = json.loads(render_stats(stats, "json"))
+    restored = DatasetStats.from_dict(data)
+    pd.testing.assert_frame_equal(
+        restored.correlations["pearson"], stats.correlations["pearson"]
+    )
+
+
+def test_cli_correlations(tmp_path, df):
+    csv_path = str(tmp_path / "a.csv")
+    df.to_csv(csv_path, index=False)
+    command = ["csv", "predict", "--csv_path", csv_path, "--types"]
+    command += [str(tmp_path / "a.yaml"), "--correlations"]
+    result = CliRunner().invoke(entry_point, command)
+    assert result.exit_code == 0, result.output
+    assert "## Pearson Correlations" in result.output
+    assert "c ~ d:" in result.output
@@ -1,11 +1,17 @@
 # Core Library
+import json
 from datetime import datetime
 
 # Third party
 import pandas as pd
+import yaml
+from click.testing import CliRunner
 
 # First party
 import edapy.csv
+from edapy.cli import entry_point
+from edapy.csv.describe import render_stats
+from edapy.csv.stats import DatasetStats
 
 
 def test_describe_pandas_df():
@@ -59,3 +65,44 @@ def test_generate_column_info():
     assert column_info_meta["b"]["value_count"] == 3
     assert column_info_meta["c"]["top_count_val"] == 2
     assert column_info_meta["c"]["value_count"] == 3
+
+
+def test_render_stats_round_trip():
+    df = pd.DataFrame(
+        {"a": [1, 2, 2, 4], "b": [0.5, None, 3.0, 3.0], "c": list("xyxz")}
+    )
+    stats = edapy.csv.profile_pandas_df(df, percentiles=[90])
+    data = json.loads(render_stats(stats, "json"))
+    assert data["nb_rows"] == 4
+    assert [column["name"] for column in data["columns"]] == ["a", "b", "c"]
+    assert DatasetStats.from_dict(data) == stats
+    assert DatasetStats.from_dict(yaml.safe_load(render_stats(stats, "yaml"))) == stats
+    assert render_stats(stats).startswith("Number of datapoints: 4")
+
+
+def test_cli_output_format_json(tmp_path):
+    csv_path = str(tmp_path / "a.csv")
+    output = str(tmp_path / "profile.json")
+    pd.DataFrame({"a": range(10), "b": list("xy") * 5}).to_csv(csv_path, index=False)
+    command = ["csv", "predict", "--csv_path", csv_path, "--types"]
+    command += [str(tmp_path / "a.yaml"), "--output-format", "json"]
+    result = CliRunner().invoke(entry_point, command + ["--output", output])
+    assert result.exit_code == 0, result.output
+    with open(output) as fp:
+        stats = DatasetStats.from_dict(json.load(fp))
+    assert stats.nb_rows == 10
+    assert stats.columns["a"].max == 9
+
+
+def test_cli_json_on_stdout_with_bool_column(tmp_path):
+    csv_path = str(tmp_path / "a.csv")
+    df = pd.DataFrame({"a": range(10), "flag": [True, False] * 5})
+    df.to_csv(csv_path, index=False)
+    command = ["csv", "predict", "--csv_path", csv_path, "--types"]
+    command += [str(tmp_path / "a.yaml"), "--output-format", "json"]
+    # The second run reads the types file which the first one wrote
+    for _ in range(2):
+        result = CliRunner().invoke(entry_point, command)
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.stdout)
+    assert data["nb_rows"] == 10
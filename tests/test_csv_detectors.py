@@ -0,0 +1,41 @@
+# Third party
+import pandas as pd
+import yaml
+
+# First party
+from edapy.csv.detectors import detect_type
+from edapy.csv.interactive_type_finder import find_type
+from edapy.csv.utils import load_csv
+
+
+def test_detect_type():
+    assert detect_type(pd.Series(["01.02.2020", "31.12.2021"])).date_format == (
+        "%d.%m.%Y"
+    )
+    assert detect_type(pd.Series(["Y", "N", None, "y"])).type == "bool"
+    uuids = pd.Series(["0f8fad5b-d9cb-469f-a165-70867728950e"] * 3)
+    assert detect_type(uuids).type == "identifier"
+    assert detect_type(pd.Series(["a3f9c0d1e2", "00ff00ff12"])).type == "identifier"
+    sentences = pd.Series(["This is a longer description of a thing"] * 5)
+    assert detect_type(sentences).type == "text"
+    assert detect_type(pd.Series(["red", "green", "blue"])) is None
+
+
+def test_detected_types_drive_load_dtypes(tmp_path):
+    csv_path = tmp_path / "detect.csv"
+    csv_path.write_text(
+        "when,ok,color\n01.02.2020,yes,red\n31.12.2021,no,blue\n,yes,green\n"
+    )
+    df = pd.read_csv(csv_path)
+    types = find_type(df)
+    assert [entry["type"] for entry in types] == ["date", "bool", "category"]
+    assert types[0]["format"] == "%d.%m.%Y"
+    yaml_path = tmp_path / "detect.yaml"
+    columns = [dict(entry) for entry in types]
+    yaml_path.write_text(
+        yaml.safe_dump({"columns": columns, "csv_meta": {"delimiter": ","}})
+    )
+    loaded = load_csv(str(csv_path), str(yaml_path))
+    assert str(loaded["when"].dtype) == "datetime64[ns]"
+    assert str(loaded["ok"].dtype) == "boolean"
+    assert str(loaded["color"].dtype) == "category"
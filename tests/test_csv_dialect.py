@@ -0,0 +1,47 @@
+# Core Library
+import os
+import tempfile
+
+# Third party
+import pytest
+from pkg_resources import resource_filename
+
+# First party
+from edapy.csv.dialect import CsvDialect, sniff_dialect
+
+
+@pytest.fixture
+def tmp_csv():
+    _, csv_path = tempfile.mkstemp(prefix="edapy_", suffix=".csv")
+    yield csv_path
+    os.remove(csv_path)
+
+
+def test_sniff_dialect_example():
+    csv_path = resource_filename(__name__, "data/example.csv")
+    dialect = sniff_dialect(csv_path)
+    assert dialect == CsvDialect(
+        delimiter=",",
+        quotechar='"',
+        escapechar=None,
+        has_header=True,
+        encoding="utf-8",
+    )
+
+
+def test_sniff_dialect_without_header(tmp_csv):
+    with open(tmp_csv, "w", encoding="latin-1") as fp:
+        fp.write("Größe;1;2.5\nBreite;3;4.5\nHöhe;5;6.5\n")
+    dialect = sniff_dialect(tmp_csv)
+    assert dialect.delimiter == ";"
+    assert dialect.has_header is False
+    assert dialect.encoding == "latin-1"
+
+
+def test_sniff_dialect_cache_invalidation(tmp_csv):
+    with open(tmp_csv, "w") as fp:
+        fp.write("a,b\n1,2\n3,4\n")
+    assert sniff_dialect(tmp_csv).delimiter == ","
+    with open(tmp_csv, "w") as fp:
+        fp.write("a;b;c\n1;2;3\n3;4;5\n")
+    assert sniff_dialect(tmp_csv).delimiter == ";"
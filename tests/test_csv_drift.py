@@ -0,0 +1,145 @@
+# Core Library
+import json
+import logging
+
+# Third party
+import numpy as np
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+# First party
+from edapy.cli import entry_point
+from edapy.csv.describe import profile_pandas_df, render_stats
+from edapy.csv.drift import (
+    DRIFT_PERCENTILES,
+    _as_cdf,
+    diff_stats,
+    get_histogram_shares,
+    get_quantiles,
+    kolmogorov_smirnov,
+    read_profile,
+)
+
+
+def _make_df(seed, shift=0.0, null_share=0.0, colors=("red", "green", "blue")):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(shift, 1, 20000)
+    x[: int(null_share * len(x))] = np.nan
+    return pd.DataFrame({"x": x, "color": rng.choice(list(colors), len(x))})
+
+
+def _profile(df):
+    return profile_pandas_df(df, percentiles=DRIFT_PERCENTILES)
+
+
+def test_diff_stats_same_distribution():
+    drift = diff_stats(_profile(_make_df(0)), _profile(_make_df(1)))
+    assert drift.drifted == []
+    assert drift.columns["x"].psi < 0.01
+    assert drift.columns["x"].ks < 0.02
+
+
+def test_diff_stats_shifted_distribution():
+    old = _profile(_make_df(0))
+    new = _profile(_make_df(1, shift=1, null_share=0.1, colors=("red", "pink")))
+    drift = diff_stats(old, new)
+    x = drift.columns["x"]
+    assert x.drifted
+    assert x.null_rate_delta == pytest.approx(0.1)
+    assert x.mean_shift == pytest.approx(1, abs=0.05)
+    # KS of two normal distributions whose means differ by one std
+    assert x.ks == pytest.approx(0.383, abs=0.02)
+    assert x.psi > 0.5
+    color = drift.columns["color"]
+    assert color.drifted
+    assert color.new_values == ["pink"]
+    assert color.vanished_values == ["blue", "green"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_diff_stats_discrete_same_distribution(seed):
+    # Quartiles of few distinct values say little about the distribution
+    old = profile_pandas_df(pd.DataFrame({"a": _make_integers(seed)}))
+    new = profile_pandas_df(pd.DataFrame({"a": _make_integers(100 + seed)}))
+    assert len(old.columns["a"].histogram_counts) == 10
+    column = diff_stats(old, new).columns["a"]
+    assert not column.drifted
+    assert column.psi < 0.01
+    assert column.ks < 0.05
+
+
+def _make_integers(seed):
+    return np.random.default_rng(seed).integers(0, 10, 5000)
+
+
+def test_get_histogram_shares_merges_bins():
+    old = _profile(pd.DataFrame({"a": np.arange(64)}))
+    new = _profile(pd.DataFrame({"a": np.arange(0, 256, 2)}))
+    old_shares, new_shares = get_histogram_shares(old.columns["a"], new.columns["a"])
+    # Bins of width 4 in [0, 256)
+    assert len(old_shares) == len(new_shares) == 64
+    assert old_shares[:16] == pytest.approx(np.full(16, 1 / 16))
+    assert new_shares == pytest.approx(np.full(64, 1 / 64))
+
+
+def test_diff_stats_warns_about_quartiles_only(caplog):
+    old = profile_pandas_df(_make_df(0))
+    new = profile_pandas_df(_make_df(1))
+    for stats in [old, new]:
+        stats.columns["x"].histogram_edges = []
+        stats.columns["x"].histogram_counts = []
+    with caplog.at_level(logging.WARNING):
+        drift = diff_stats(old, new)
+    assert drift.columns["x"].psi is not None
+    assert "The old profile has neither histograms" in caplog.text
+    assert "The new profile has neither histograms" in caplog.text
+    old, new = _profile(_make_df(0)), _profile(_make_df(1))
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        diff_stats(old, new)
+    assert caplog.text == ""
+
+
+def test_diff_stats_type_change():
+    old = _profile(pd.DataFrame({"a": [1, 2, 3]}))
+    new = _profile(pd.DataFrame({"a": ["x", "y", "z"]}))
+    column = diff_stats(old, new).columns["a"]
+    assert column.type_changed
+    assert column.drifted
+
+
+def test_kolmogorov_smirnov_with_repeated_quantiles():
+    # All values of the old column are 1, half of the new ones are 2
+    old = _as_cdf({0.0: 1, 0.5: 1, 1.0: 1})
+    new = _as_cdf({0.0: 1, 0.5: 1, 1.0: 2})
+    assert kolmogorov_smirnov(old, new) == pytest.approx(0.5)
+    assert kolmogorov_smirnov(old, old) == 0
+
+
+def test_get_quantiles_skips_unknown():
+    stats = _profile(pd.DataFrame({"a": [np.nan, np.nan]}))
+    assert get_quantiles(stats.columns["a"]) == {}
+
+
+def test_cli_diff(tmp_path):
+    old_csv = str(tmp_path / "old.csv")
+    new_csv = str(tmp_path / "new.csv")
+    _make_df(0).to_csv(old_csv, index=False)
+    _make_df(1, shift=2).to_csv(new_csv, index=False)
+    old_profile = str(tmp_path / "old.json")
+    with open(old_profile, "w") as fp:
+        fp.write(render_stats(_profile(pd.read_csv(old_csv)), "json"))
+    assert read_profile(old_profile) is not None
+    assert read_profile(old_csv) is None
+    runner = CliRunner()
+    command = ["csv", "diff", "--old", old_profile, "--new", new_csv]
+    command += ["--cache-dir", str(tmp_path / "cache"), "--fail-on-drift"]
+    result = runner.invoke(entry_point, command)
+    assert result.exit_code == 1
+    assert "## x (drift)" in result.output
+    result = runner.invoke(
+        entry_point, command + ["--output-format", "json", "--only-drifted"]
+    )
+    data = json.loads(result.output)
+    assert [column["name"] for column in data["columns"]] == ["x"]
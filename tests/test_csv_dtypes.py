@@ -0,0 +1,55 @@
+# Third party
+import pandas as pd
+import pyarrow as pa
+
+# First party
+from edapy.csv.arrow import profile_table
+from edapy.csv.describe import profile_pandas_df
+from edapy.csv.dtypes import estimate_memory, recommend_dtype
+from edapy.csv.stats import ColumnStats
+
+
+def test_recommend_dtype():
+    assert recommend_dtype(ColumnStats("a", "int", "int64", min=-5, max=300)) == (
+        "int16"
+    )
+    floats = ColumnStats(
+        "b",
+        "float",
+        "float64",
+        min=0.5,
+        max=1.5,
+        has_frac=True,
+        value_count=2,
+        value_list=[0.5, 1.5],
+    )
+    assert recommend_dtype(floats) == "float32"
+    floats.value_list = [0.5, 1 / 3]
+    assert recommend_dtype(floats) == "float64"
+    # Only the most common values are known, rare ones may lose precision
+    floats.value_count = 20000
+    floats.value_list = [0.5, 1.5]
+    assert recommend_dtype(floats) == "float64"
+    colors = ColumnStats(
+        "c", "other", "object", non_nan=1000, value_count=3, value_list=["red"]
+    )
+    assert recommend_dtype(colors) == "category"
+    # The type may be guessed from the column name only
+    assert recommend_dtype(colors, "date") == "category"
+    assert recommend_dtype(colors, "date", "%Y-%m-%d") == "datetime64[ns]"
+    assert recommend_dtype(colors, "bool") == "category"
+    flags = ColumnStats(
+        "d", "other", "object", non_nan=1000, value_count=2, value_list=["Y", "n"]
+    )
+    assert recommend_dtype(flags, "bool") == "boolean"
+    assert estimate_memory(colors, "category", 1000) < estimate_memory(
+        colors, "object", 1000
+    )
+
+
+def test_recommend_dtype_keeps_tiny_fractions():
+    df = pd.DataFrame({"a": [1.00001, 2.00002], "b": [1.0, 2.0]})
+    for stats in [profile_pandas_df(df), profile_table(pa.Table.from_pandas(df))]:
+        assert not stats.columns["a"].has_frac
+        assert recommend_dtype(stats.columns["a"]) == "float32"
+        assert recommend_dtype(stats.columns["b"]) == "uint8"
@@ -0,0 +1,102 @@
+# Third party
+import numpy as np
+import pandas as pd
+from click.testing import CliRunner
+
+# First party
+import edapy.csv.incremental
+from edapy.cli import entry_point
+from edapy.csv.incremental import profile_csv_incremental
+from edapy.csv.sharding import find_last_record_border, profile_shard
+from edapy.csv.streaming import profile_csv_chunked
+
+
+def _write(path, df):
+    df.to_csv(path, index=False)
+
+
+def test_find_last_record_border_skips_quoted_newlines(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_bytes(b'a,b\n1,"x\ny"\n2,z\n3,"w')
+    assert find_last_record_border(str(path), 4) == 16
+    assert find_last_record_border(str(path), 4, block_size=3) == 16
+    assert find_last_record_border(str(path), 16) == 16
+
+
+def test_profile_incremental_matches_full_profile(tmp_path):
+    path = str(tmp_path / "a.csv")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"a": rng.integers(0, 100, 1000), "b": rng.random(1000)})
+    _write(path, df.iloc[:600])
+    state = profile_csv_incremental(path, chunksize=100)
+    with open(path, "a") as fp:
+        # The last record is not complete yet
+        fp.write(df.iloc[600:].to_csv(index=False, header=False).rstrip("\n"))
+    state = profile_csv_incremental(path, state, chunksize=100)
+    assert state.accumulator.nb_rows == 999
+    with open(path, "a") as fp:
+        fp.write("\n")
+    state = profile_csv_incremental(path, state, chunksize=100)
+    incremental = state.accumulator.to_stats(percentiles=[50])
+    full = profile_csv_chunked(path, chunksize=100).to_stats(percentiles=[50])
+    assert incremental.nb_rows == full.nb_rows == 1000
+    for name in ["a", "b"]:
+        assert incremental.columns[name].min == full.columns[name].min
+        assert incremental.columns[name].max == full.columns[name].max
+        assert np.isclose(incremental.columns[name].mean, full.columns[name].mean)
+        assert incremental.columns[name].percentiles == full.columns[name].percentiles
+
+
+def test_profile_incremental_only_reads_the_tail(tmp_path, monkeypatch):
+    path = str(tmp_path / "a.csv")
+    _write(path, pd.DataFrame({"a": range(1000)}))
+    state = profile_csv_incremental(path)
+    with open(path, "a") as fp:
+        fp.write("1000\n1001\n")
+    ranges = []
+
+    def record(csv_path, start, end, *args):
+        ranges.append((start, end))
+        return profile_shard(csv_path, start, end, *args)
+
+    monkeypatch.setattr(edapy.csv.incremental, "profile_shard", record)
+    state = profile_csv_incremental(path, state)
+    assert ranges == [(state.offset - 10, state.offset)]
+    assert state.accumulator.nb_rows == 1002
+
+
+def test_profile_incremental_recomputes_rewritten_files(tmp_path):
+    path = str(tmp_path / "a.csv")
+    _write(path, pd.DataFrame({"a": range(1000)}))
+    state = profile_csv_incremental(path)
+    # Truncated
+    _write(path, pd.DataFrame({"a": range(10)}))
+    state = profile_csv_incremental(path, state)
+    assert state.accumulator.nb_rows == 10
+    # Rewritten with the same length
+    _write(path, pd.DataFrame({"a": range(10, 20)}))
+    state = profile_csv_incremental(path, state)
+    assert state.accumulator.nb_rows == 10
+    assert state.accumulator.to_stats().columns["a"].min == 10
+
+
+def test_cli_incremental(tmp_path):
+    csv_path = str(tmp_path / "a.csv")
+    _write(csv_path, pd.DataFrame({"a": range(100), "b": ["x", "y"] * 50}))
+    command = [
+        "csv",
+        "predict",
+        "--csv_path",
+        csv_path,
+        "--cache-dir",
+        str(tmp_path / "cache"),
+        "--incremental",
+    ]
+    runner = CliRunner()
+    first = runner.invoke(entry_point, command + ["--types", str(tmp_path / "1.yaml")])
+    assert first.exit_code == 0, first.output
+    with open(csv_path, "a") as fp:
+        fp.write("100,z\n")
+    second = runner.invoke(entry_point, command + ["--types", str(tmp_path / "2.yaml")])
+    assert second.exit_code == 0, second.output
+    assert "Number of datapoints: 101" in second.output
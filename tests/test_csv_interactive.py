@@ -46,7 +46,6 @@ def test_get_type_probabilities():
     assert pytest.approx(sum(type_probabilities.values())) == 1.0
 
 
-@pytest.mark.xfail(reason="Bug in find_type")
 def test_find_type():
     df = example_df()
     types = find_type(df)
@@ -70,3 +69,14 @@ def test_find_type():
     #     ),
     # ]
     # assert types == expected_types
+
+
+def test_find_type_sampled():
+    df = pd.DataFrame(
+        {"a": [1.0, 2.0, 3.0, None] * 1000, "b": [0.5, 1.0, 1.5, 2.0] * 1000}
+    )
+    types = find_type(df, sample_size=300)
+    assert [entry["type"] for entry in types] == ["int", "float"]
+    assert 0.98 < types[0]["confidence"] < 1
+    assert types[1]["confidence"] == 1.0
+    assert "confidence" not in find_type(df)[0]
@@ -0,0 +1,114 @@
+# Third party
+import pandas as pd
+import pytest
+import yaml
+from click.testing import CliRunner
+
+# First party
+from edapy.cli import entry_point
+from edapy.csv.loader import compile_types, load_csv
+
+CSV = "a;b;c;d\n1;yes;01.02.2020;x\n-;no;31.12.2021;y\n3;yes;;x\n"
+TYPES = {
+    "csv_meta": {"delimiter": ";", "na_values": ["-"]},
+    "columns": [
+        {"name": "a", "dtype": "object", "recommended_dtype": "Int8"},
+        {"name": "b", "dtype": "object", "type": "bool"},
+        {"name": "c", "dtype": "object", "type": "date", "format": "%d.%m.%Y"},
+        {
+            "name": "d",
+            "dtype": "object",
+            "recommended_dtype": "category",
+            "categories": ["x", "y"],
+        },
+    ],
+}
+
+
+@pytest.fixture
+def feed(tmp_path):
+    csv_path = tmp_path / "feed.csv"
+    csv_path.write_text(CSV)
+    yaml_path = tmp_path / "feed.yaml"
+    yaml_path.write_text(yaml.safe_dump(TYPES))
+    return str(csv_path), str(yaml_path)
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_load_csv(feed, engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    df = load_csv(*feed, engine=engine)
+    assert [str(dtype) for dtype in df.dtypes] == [
+        "Int8",
+        "boolean",
+        "datetime64[ns]",
+        "category",
+    ]
+    assert df["a"].isnull().tolist() == [False, True, False]
+    assert df["d"].cat.categories.tolist() == ["x", "y"]
+
+
+def test_load_csv_chunks_and_usecols(feed):
+    chunks = list(load_csv(*feed, usecols=["b", "d"], chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0].columns.tolist() == ["b", "d"]
+    assert str(chunks[1]["b"].dtype) == "boolean"
+    with pytest.raises(ValueError):
+        load_csv(*feed, usecols=["unknown"])
+
+
+def test_compile_types_uses_c_engine_for_column_na_values():
+    types = {"columns": [{"name": "a", "dtype": "float64", "na_values": ["?"]}]}
+    plan = compile_types(types)
+    assert plan.read_kwargs["engine"] == "c"
+    assert plan.read_kwargs["na_values"] == {"a": ["?"]}
+
+
+def test_compile_types_does_not_change_types():
+    # load_csv caches the types YAML, so it is compiled again for each load
+    types = {
+        "csv_meta": {"na_values": ["-"]},
+        "columns": [
+            {"name": "a", "dtype": "float64", "na_values": ["?"]},
+            {"name": "b", "dtype": "float64"},
+        ],
+    }
+    for _ in range(2):
+        plan = compile_types(types)
+        assert plan.read_kwargs["na_values"] == {"a": ["?", "-"], "b": ["-"]}
+    assert types["columns"][0]["na_values"] == ["?"]
+
+
+def test_load_csv_keeps_values_of_guessed_bool_column(tmp_path):
+    # A column with a single value is typed bool, but "x" is no bool token
+    csv_path = str(tmp_path / "a.csv")
+    yaml_path = str(tmp_path / "a.yaml")
+    pd.DataFrame({"flag": ["x"] * 50, "b": ["yes", "no"] * 25}).to_csv(
+        csv_path, index=False
+    )
+    command = ["csv", "predict", "--csv_path", csv_path, "--types", yaml_path]
+    assert CliRunner().invoke(entry_point, command).exit_code == 0
+    df = load_csv(csv_path, yaml_path)
+    assert df["flag"].tolist() == ["x"] * 50
+    assert str(df["b"].dtype) == "boolean"
+
+
+def test_load_csv_date_without_format(tmp_path):
+    # Written by older versions of edapy csv predict for guessed dates
+    csv_path = tmp_path / "a.csv"
+    csv_path.write_text("update_time\nsoon\nlater\n")
+    types = {
+        "columns": [
+            {
+                "name": "update_time",
+                "type": "date",
+                "dtype": "object",
+                "recommended_dtype": "datetime64[ns]",
+            }
+        ]
+    }
+    yaml_path = tmp_path / "a.yaml"
+    yaml_path.write_text(yaml.safe_dump(types))
+    df = load_csv(str(csv_path), str(yaml_path))
+    assert df["update_time"].tolist() == ["soon", "later"]
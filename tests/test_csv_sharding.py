@@ -0,0 +1,50 @@
+# Core Library
+import io
+import os
+import tempfile
+
+# Third party
+import pandas as pd
+import pytest
+
+# First party
+from edapy.csv.sharding import find_shards, profile_csv_parallel
+
+
+@pytest.fixture
+def multiline_csv():
+    df = pd.DataFrame(
+        {
+            "a": list(range(200)),
+            "text": [f'line {i}\n"quoted"\nend' for i in range(200)],
+        }
+    )
+    _, csv_path = tempfile.mkstemp(prefix="edapy_", suffix=".csv")
+    df.to_csv(csv_path, index=False)
+    yield csv_path, df
+    os.remove(csv_path)
+
+
+def test_find_shards(multiline_csv):
+    csv_path, df = multiline_csv
+    shards = find_shards(csv_path, 4, block_size=64)
+    assert len(shards) == 4
+    with open(csv_path, "rb") as fp:
+        content = fp.read()
+    nb_rows = 0
+    for start, end in shards:
+        shard = pd.read_csv(
+            io.BytesIO(content[start:end]), header=None, names=df.columns
+        )
+        nb_rows += len(shard)
+        assert shard["text"].str.endswith("end").all()
+    assert nb_rows == len(df)
+
+
+def test_profile_csv_parallel(multiline_csv):
+    csv_path, df = multiline_csv
+    stats = profile_csv_parallel(csv_path, jobs=2, chunksize=30).to_stats()
+    assert stats.nb_rows == len(df)
+    assert stats.columns["a"].mean == pytest.approx(df["a"].mean())
+    assert stats.columns["a"].std == pytest.approx(df["a"].std())
+    assert stats.columns["text"].value_count == len(df)
@@ -0,0 +1,155 @@
+# Third party
+import numpy as np
+import pandas as pd
+import pytest
+
+# First party
+from edapy.csv.describe import _generate_column_info, format_stats, profile_pandas_df
+from edapy.csv.interactive_type_finder import find_type
+from edapy.csv.sketches import (
+    FrequencySketch,
+    Histogram,
+    HyperLogLog,
+    KllSketch,
+    QuantileSummary,
+    sketch_value_counts,
+)
+
+
+def zipf_column(size=100000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(rng.zipf(1.5, size)).astype(str)
+
+
+def test_hyperloglog_merge():
+    first, second = HyperLogLog(), HyperLogLog()
+    first.update(pd.Series(range(0, 60000)))
+    second.update(pd.Series(range(40000, 100000)))
+    first.merge(second)
+    assert first.estimate() == pytest.approx(100000, rel=0.05)
+
+
+def test_frequency_sketch_error_bound():
+    column = zipf_column()
+    error = 0.01
+    sketch = sketch_value_counts(column, error, batch_size=10000)
+    exact = column.value_counts()
+    assert not sketch.is_exact
+    assert sketch.distinct_count() == pytest.approx(len(exact), rel=0.05)
+    top = sketch.top_values()
+    assert top.index[:3].tolist() == exact.index[:3].tolist()
+    for value, count in top.head(10).items():
+        assert 0 <= count - exact[value] <= error * len(column)
+
+
+def test_frequency_sketch_merge():
+    column = zipf_column()
+    merged = FrequencySketch(error=0.01)
+    for part in np.array_split(column, 4):
+        sketch = FrequencySketch(error=0.01)
+        sketch.update(part)
+        merged.merge(sketch)
+    expected = sketch_value_counts(column, 0.01)
+    assert merged.distinct_count() == expected.distinct_count()
+    assert merged.top_values().index[0] == expected.top_values().index[0]
+
+
+def test_sketch_mode_is_exact_for_small_columns():
+    df = pd.DataFrame({"a": ["x", "y", "y", None], "b": zipf_column(1000)[:4]})
+    _, exact_meta = _generate_column_info(df, {})
+    _, sketch_meta = _generate_column_info(df, {}, sketch_error=0.01)
+    for column_name in df:
+        assert sketch_meta[column_name]["approximate"] is False
+        assert (
+            sketch_meta[column_name]["value_count"]
+            == exact_meta[column_name]["value_count"]
+        )
+        assert (
+            sketch_meta[column_name]["top_count_val"]
+            == exact_meta[column_name]["top_count_val"]
+        )
+
+
+def test_find_type_marks_approximate_columns():
+    df = pd.DataFrame({"id": zipf_column(), "small": ["a", "b"] * 50000})
+    columns = find_type(df, sketch_error=0.01)
+    assert columns[0]["approximate"] is True
+    assert "approximate" not in columns[1]
+
+
+def test_kll_sketch_merge_rank_error():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=200000)
+    sketches = [KllSketch(k=200, seed=i) for i in range(4)]
+    for sketch, part in zip(sketches, np.array_split(values, 4)):
+        for batch in np.array_split(part, 10):
+            sketch.update(batch)
+    for sketch in sketches[1:]:
+        sketches[0].merge(sketch)
+    q = [0.01, 0.25, 0.5, 0.75, 0.99, 0.999]
+    estimates = sketches[0].quantile(q)
+    ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+    assert np.abs(ranks - q).max() < 0.02
+    assert sum(len(items) for items in sketches[0].compactors) < 5 * 200
+
+
+def test_quantile_summary_switches_to_sketch():
+    summary, other = QuantileSummary(max_exact=1000), QuantileSummary(max_exact=1000)
+    summary.update(np.arange(600, dtype=float))
+    other.update(np.arange(600, 1200, dtype=float))
+    assert summary.is_exact
+    assert summary.quantile([0.5])[0] == 299.5
+    summary.merge(other)
+    assert not summary.is_exact
+    assert summary.quantile([0.5])[0] == pytest.approx(600, abs=30)
+
+
+@pytest.mark.parametrize("integer", [False, True])
+def test_histogram_merge_equals_single_pass(integer):
+    rng = np.random.default_rng(0)
+    values = rng.normal(1000, 50, 10000)
+    if integer:
+        values = np.round(values)
+    expected = Histogram(integer=integer)
+    expected.update(values)
+    merged = Histogram(integer=integer)
+    for part in np.array_split(np.sort(values), 7):
+        histogram = Histogram(integer=integer)
+        histogram.update(part)
+        merged.merge(histogram)
+    assert merged.trimmed() == expected.trimmed()
+    edges, counts = expected.trimmed()
+    assert counts == np.histogram(values, bins=edges)[0].tolist()
+    assert len(expected.counts) == 64
+
+
+@pytest.mark.parametrize("integer", [False, True])
+def test_histogram_beyond_float64_range(integer):
+    # The range of the values exceeds the largest float64
+    values = np.array([-1.7e308, 1.7e308, 1.0, np.finfo(np.float64).max])
+    expected = Histogram(integer=integer)
+    expected.update(values)
+    merged = Histogram(integer=integer)
+    for value in values:
+        histogram = Histogram(integer=integer)
+        histogram.update(np.array([value]))
+        merged.merge(histogram)
+    assert merged.trimmed() == expected.trimmed()
+    edges, counts = expected.trimmed()
+    assert sum(counts) == len(values)
+    assert np.all(np.isfinite(edges))
+
+
+def test_frequency_sketch_unique_values_have_no_top_values():
+    column = pd.Series([f"t{i}" for i in range(10000)])
+    sketch = sketch_value_counts(column, 0.01, batch_size=1000)
+    assert not sketch.is_exact
+    assert len(sketch.heavy_hitters.counters) == 0
+    assert sketch.top_values().empty
+
+
+def test_format_stats_marks_approximate_top_values():
+    df = pd.DataFrame({"id": zipf_column()})
+    text = format_stats(profile_pandas_df(df, sketch_error=0.01))
+    top = sketch_value_counts(df["id"], 0.01).top_values()
+    assert f"{top.index[0]} (~{top.iloc[0]})" in text
@@ -0,0 +1,39 @@
+# Third party
+import pandas as pd
+import pytest
+
+# First party
+from edapy.csv.describe import _generate_column_info
+from edapy.csv.stats import MAX_VALUE_LIST, compute_stats
+
+
+def test_compute_stats():
+    df = pd.DataFrame(
+        {
+            "a": [1, 2, 3, 4],
+            "b": [1.0, None, 3.0, 3.0],
+            "c": ["a", "b", None, "b"],
+        }
+    )
+    column_info, column_info_meta = _generate_column_info(df, dtype={})
+    stats = compute_stats(df, column_info, column_info_meta)
+    assert stats.nb_rows == 4
+    assert [col.name for col in stats.by_kind("int")] == ["a"]
+    assert stats.columns["a"].mean == pytest.approx(2.5)
+    assert stats.columns["a"].q50 == pytest.approx(2.5)
+    assert stats.columns["a"].max == 4
+    assert stats.columns["b"].non_nan == 3
+    assert stats.columns["b"].max == 3.0
+    assert stats.columns["b"].min == 1.0
+    assert stats.columns["c"].mean is None
+    assert stats.columns["c"].value_count == 2
+    assert stats.columns["c"].unique == 3
+    assert stats.columns["c"].top_count_val == 2
+
+
+def test_compute_stats_caps_value_list():
+    df = pd.DataFrame({"id": [f"id{i}" for i in range(MAX_VALUE_LIST + 10)]})
+    column_info, column_info_meta = _generate_column_info(df, dtype={})
+    stats = compute_stats(df, column_info, column_info_meta)
+    assert stats.columns["id"].value_count == MAX_VALUE_LIST + 10
+    assert len(stats.columns["id"].value_list) == MAX_VALUE_LIST
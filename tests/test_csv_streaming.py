@@ -0,0 +1,104 @@
+# Third party
+import numpy as np
+import pandas as pd
+import pytest
+from pkg_resources import resource_filename
+
+# First party
+from edapy.csv.describe import format_stats, profile_pandas_df
+from edapy.csv.interactive_type_finder import find_type_from_stats
+from edapy.csv.streaming import (
+    AccumulatorConfig,
+    DatasetAccumulator,
+    profile_csv_chunked,
+)
+
+
+def test_profile_csv_chunked():
+    csv_path = resource_filename(__name__, "data/example.csv")
+    accumulator = profile_csv_chunked(csv_path, chunksize=2)
+    stats = accumulator.to_stats()
+    df = pd.read_csv(csv_path)
+    assert stats.nb_rows == len(df)
+    population = stats.columns["population"]
+    assert population.kind == "float"
+    assert population.non_nan == df["population"].notnull().sum()
+    assert population.mean == pytest.approx(df["population"].mean())
+    assert population.std == pytest.approx(df["population"].std())
+    assert population.min == df["population"].min()
+    assert population.max == df["population"].max()
+    assert stats.columns["country"].value_count == len(df["country"].unique())
+    types = find_type_from_stats(stats)
+    assert [entry["name"] for entry in types] == list(df.columns)
+
+
+def test_dataset_accumulator_merge():
+    df = pd.DataFrame({"a": np.arange(100), "b": ["x", "y"] * 50})
+    first, second = DatasetAccumulator(), DatasetAccumulator()
+    first.update(df.iloc[:30])
+    second.update(df.iloc[30:].assign(a=lambda d: d["a"].astype(float)))
+    first.merge(second)
+    stats = first.to_stats()
+    assert stats.nb_rows == 100
+    assert stats.columns["a"].dtype == "float64"
+    assert stats.columns["a"].mean == pytest.approx(df["a"].mean())
+    assert stats.columns["a"].std == pytest.approx(df["a"].std())
+    assert stats.columns["a"].q50 == pytest.approx(df["a"].median())
+    assert stats.columns["b"].value_count == 2
+    assert stats.columns["b"].top_count_val == 50
+
+
+def test_histograms_and_top_counts_equal_pandas():
+    csv_path = resource_filename(__name__, "data/example.csv")
+    stats = profile_csv_chunked(csv_path, chunksize=2).to_stats()
+    expected = profile_pandas_df(pd.read_csv(csv_path))
+    for column_name, column_stats in expected.columns.items():
+        chunked = stats.columns[column_name]
+        assert chunked.histogram_edges == column_stats.histogram_edges
+        assert chunked.histogram_counts == column_stats.histogram_counts
+        assert chunked.top_counts == column_stats.top_counts
+    population = stats.columns["population"]
+    assert sum(population.histogram_counts) == population.non_nan
+
+
+def test_percentiles_switch_to_sketch_above_threshold():
+    df = pd.DataFrame({"a": np.arange(10000, dtype=float)})
+    config = AccumulatorConfig(exact_quantile_max_rows=1000)
+    accumulators = [DatasetAccumulator(config) for _ in range(2)]
+    accumulators[0].update(df.iloc[:5000])
+    accumulators[1].update(df.iloc[5000:])
+    accumulators[0].merge(accumulators[1])
+    column = accumulators[0].to_stats(percentiles=[1, 99]).columns["a"]
+    assert column.quantiles_approximate
+    assert column.q50 == pytest.approx(5000, abs=200)
+    assert column.percentiles[1] == pytest.approx(100, abs=200)
+    assert column.percentiles[99] == pytest.approx(9900, abs=200)
+
+
+def test_format_stats_marks_estimated_value_count():
+    df = pd.DataFrame({"id": [f"id{i}" for i in range(2000)]})
+    accumulator = DatasetAccumulator(AccumulatorConfig(max_tracked_values=100))
+    accumulator.update(df)
+    stats = accumulator.to_stats()
+    column = stats.columns["id"]
+    assert column.approximate
+    assert f"~{column.value_count}" in format_stats(stats)
+    assert "~" not in format_stats(profile_pandas_df(df))
+
+
+@pytest.mark.parametrize("merge", [False, True])
+def test_histogram_with_fractions_in_later_chunks(merge):
+    # Integer bins of the first chunk would be 1 wide, too wide for 0.25
+    df = pd.DataFrame({"a": np.concatenate([np.arange(4.0), [0.25, 0.5]])})
+    accumulator = DatasetAccumulator()
+    for chunk in [df.iloc[:4], df.iloc[4:]]:
+        if merge:
+            other = DatasetAccumulator()
+            other.update(chunk)
+            accumulator.merge(other)
+        else:
+            accumulator.update(chunk)
+    stats = accumulator.to_stats()
+    expected = profile_pandas_df(df)
+    assert stats.columns["a"].histogram_edges == expected.columns["a"].histogram_edges
+    assert stats.columns["a"].histogram_counts == expected.columns["a"].histogram_counts
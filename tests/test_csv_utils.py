@@ -1,7 +1,9 @@
 # Third party
+from click.testing import CliRunner
 from pkg_resources import resource_filename
 
 # First party
+from edapy.cli import entry_point
 from edapy.csv import utils
 
 
@@ -21,3 +23,22 @@ def test_get_quote_char():
     csv_path = resource_filename(__name__, "data/example.csv")
     quote_char = utils.get_quote_char(csv_path)
     assert quote_char == '"'
+
+
+def test_load_csv_recommended_dtypes(tmp_path):
+    csv_path = resource_filename(__name__, "data/example.csv")
+    yaml_path = str(tmp_path / "types.yaml")
+    runner = CliRunner()
+    result = runner.invoke(
+        entry_point, ["csv", "predict", "--csv_path", csv_path, "--types", yaml_path]
+    )
+    assert result.exit_code == 0
+    assert "Recommended dtypes" in result.output
+    df = utils.load_csv(csv_path, yaml_path)
+    # The country is a string[pyarrow] or an object, depending on pyarrow
+    assert [str(dtype) for dtype in df.dtypes][1:] == [
+        "UInt32",
+        "datetime64[ns]",
+        "bool",
+        "float32",
+    ]
@@ -0,0 +1,130 @@
+# Core Library
+import csv
+import logging
+import os
+
+# Third party
+import pytest
+from click.testing import CliRunner
+
+# First party
+from edapy.cli import entry_point
+from edapy.file_index import FileIndex, open_index, scan_files
+
+
+class Scanner:
+    """Count the scanned files and fail after max_files of them."""
+
+    def __init__(self, max_files=None):
+        self.scanned = []
+        self.max_files = max_files
+
+    def __call__(self, paths):
+        for path in paths:
+            if len(self.scanned) == self.max_files:
+                raise RuntimeError("Crash")
+            self.scanned.append(os.path.basename(path))
+            with open(path) as fp:
+                yield path, {"path": path, "content": fp.read()}
+
+
+def _scan(root, state_dir, scanner):
+    paths = sorted(os.path.join(root, name) for name in os.listdir(root))
+    with open_index(state_dir, "test", {"columns": ["content"]}) as index:
+        rows = list(scan_files(root, paths, scanner, index))
+    return sorted((os.path.basename(row["path"]), row["content"]) for row in rows)
+
+
+def test_scan_files_incrementally(tmp_path):
+    root = tmp_path / "files"
+    root.mkdir()
+    for name in "abcd":
+        (root / name).write_text(name)
+    state_dir = str(tmp_path / "state")
+
+    # An interrupted scan keeps the rows of the files which were done
+    scanner = Scanner(max_files=2)
+    with pytest.raises(RuntimeError):
+        _scan(str(root), state_dir, scanner)
+    scanner = Scanner()
+    rows = _scan(str(root), state_dir, scanner)
+    assert scanner.scanned == ["c", "d"]
+    assert rows == [(name, name) for name in "abcd"]
+
+    # Unchanged files are not scanned, deleted files are removed
+    (root / "a").write_text("changed")
+    (root / "b").unlink()
+    scanner = Scanner()
+    rows = _scan(str(root), state_dir, scanner)
+    assert scanner.scanned == ["a"]
+    assert rows == [("a", "changed"), ("c", "c"), ("d", "d")]
+    index = FileIndex(os.path.join(state_dir, "test.sqlite"), {"columns": []})
+    assert index.connection.execute("SELECT COUNT(*) FROM files").fetchone() == (0,)
+    index.close()
+
+
+def test_pdf_find_state_dir(tmp_path, caplog):
+    root = tmp_path / "pdfs"
+    root.mkdir()
+    for name in ["a.pdf", "b.pdf"]:
+        (root / name).write_bytes(b"no PDF")
+    output = tmp_path / "results.csv"
+    command = ["pdf", "find", "--path", str(root), "--output", str(output)]
+    command += ["--state-dir", str(tmp_path / "state")]
+    runner = CliRunner()
+    caplog.set_level(logging.INFO)
+    for _ in range(2):
+        result = runner.invoke(entry_point, command)
+        assert result.exit_code == 0, result.output
+        with open(output) as fp:
+            rows = list(csv.DictReader(fp, delimiter=";"))
+        assert sorted(os.path.basename(row["path"]) for row in rows) == [
+            "a.pdf",
+            "b.pdf",
+        ]
+        assert all(row["is_errornous"] == "1" for row in rows)
+    assert "Scanned 0 new or changed files" in caplog.messages
+
+
+def test_scan_files_retries_rows(tmp_path):
+    root = tmp_path / "files"
+    root.mkdir()
+    for name in "ab":
+        (root / name).write_text(name)
+    paths = sorted(str(path) for path in root.iterdir())
+    state_dir = str(tmp_path / "state")
+    for expected in [["a", "b"], ["b"]]:
+        scanner = Scanner()
+        with open_index(state_dir, "test", {}) as index:
+            rows = list(
+                scan_files(
+                    str(root),
+                    paths,
+                    scanner,
+                    index,
+                    retry=lambda row: row["content"] == "b",
+                )
+            )
+        assert scanner.scanned == expected
+        assert len(rows) == 2
+
+
+def test_scan_files_does_not_walk_ahead(tmp_path):
+    root = tmp_path / "files"
+    root.mkdir()
+    for name in "abcde":
+        (root / name).write_text(name)
+    walked = []
+
+    def walk():
+        for path in sorted(root.iterdir()):
+            walked.append(path.name)
+            yield str(path)
+
+    def scan(paths):
+        for path, row in Scanner()(paths):
+            yield path, dict(row, nb_walked=len(walked))
+
+    with open_index(str(tmp_path / "state"), "test", {}) as index:
+        rows = list(scan_files(str(root), walk(), scan, index, batch_size=2))
+    assert [row["nb_walked"] for row in rows] == [2, 2, 4, 4, 5]
@@ -1,11 +1,122 @@
+# Core Library
+import csv
+import os
+import random
+import shutil
+import time
+
 # Third party
 import pkg_resources
+from click.testing import CliRunner
 
 # First party
 import edapy.pdf
+from edapy.cli import entry_point
 
 
 def test_make_path_absolute():
     path = "examples/book.pdf"  # always use slash
     filepath = pkg_resources.resource_filename("edapy", path)
     edapy.pdf.get_pdf_info(filepath)
+
+
+def test_find_parallel(tmp_path):
+    for name in ["a.pdf", "b.PDF", "c.txt"]:
+        (tmp_path / name).write_bytes(b"no PDF")
+    output = tmp_path / "results.csv"
+    command = ["pdf", "find", "--path", str(tmp_path), "--output", str(output)]
+    result = CliRunner().invoke(entry_point, command + ["--jobs", "2"])
+    assert result.exit_code == 0, result.output
+    with open(output) as fp:
+        rows = list(csv.DictReader(fp, delimiter=";"))
+    assert sorted(os.path.basename(row["path"]) for row in rows) == [
+        "a.pdf",
+        "b.PDF",
+    ]
+    assert all(row["is_errornous"] == "1" for row in rows)
+
+
+def test_scan_pdf_timeout(monkeypatch):
+    def get_pdf_info(pdf_path, config=None, timeout=None):
+        time.sleep(10)
+
+    monkeypatch.setattr(edapy.pdf, "get_pdf_info", get_pdf_info)
+    monkeypatch.setattr(edapy.pdf, "TIMEOUT_GRACE", 0)
+    start = time.monotonic()
+    info = edapy.pdf.scan_pdf("slow.pdf", timeout=0.1)
+    assert info.is_timed_out
+    assert time.monotonic() - start < 5
+
+
+def test_scan_config_is_loaded_once(tmp_path, monkeypatch):
+    for name in ["a.pdf", "b.pdf", "c.pdf"]:
+        (tmp_path / name).write_bytes(b"no PDF")
+    paths = []
+    get_flat_cfg_file = edapy.pdf.get_flat_cfg_file
+
+    def read_cfg_file(path):
+        paths.append(path)
+        return get_flat_cfg_file(path=path)
+
+    monkeypatch.setattr(edapy.pdf, "get_flat_cfg_file", read_cfg_file)
+    infos = list(edapy.pdf.scan_pdfs(edapy.pdf.find_pdfs(str(tmp_path))))
+    assert len(infos) == 3
+    assert len(paths) == 2
+    config = edapy.pdf.PdfScanConfig(
+        keys=("/Title",), ignore_keys=frozenset({"/Creator"})
+    )
+    assert config.known_keys == {"/Title", "/Creator"}
+
+
+def test_pypdf2_text_extractor():
+    filepath = pkg_resources.resource_filename("edapy", "examples/book.pdf")
+    config = edapy.pdf.PdfScanConfig.load(text_extractor="pypdf2")
+    info = edapy.pdf.get_pdf_info(filepath, config)
+    assert info.nb_pages == 13
+    text = edapy.pdf.get_text(filepath, extractor="pypdf2")
+    assert info.nb_characters == len(text) > 0
+    assert edapy.pdf.get_text(filepath, extractor="pypdf2", page=0).startswith(
+        "TestBook"
+    )
+
+
+def test_find_common_substring_equals_brute_force():
+    rng = random.Random(0)
+    for _ in range(100):
+        texts = [
+            "".join(rng.choice("ab€") for _ in range(rng.randint(0, 20)))
+            for _ in range(rng.randint(1, 4))
+        ]
+        shortest = min(texts, key=len)
+        substrings = [
+            shortest[start:end]
+            for start in range(len(shortest))
+            for end in range(start, len(shortest) + 1)
+        ]
+        expected = max(
+            [s for s in substrings if all(s in text for text in texts)] + [""],
+            key=len,
+        )
+        common_substring = edapy.pdf.find_common_substring(texts)
+        assert len(common_substring) == len(expected)
+        assert all(common_substring in text for text in texts)
+
+
+def test_find_watermark():
+    pages = [f"Page {i}\nCONFIDENTIAL\n{i * 'x'}\f" for i in range(500)]
+    assert edapy.pdf.find_watermark(pages) == "\nCONFIDENTIAL\n"
+
+
+def test_find_watermark_column(tmp_path):
+    filepath = pkg_resources.resource_filename("edapy", "examples/book.pdf")
+    shutil.copy(filepath, tmp_path)
+    output = tmp_path / "results.csv"
+    command = ["pdf", "find", "--path", str(tmp_path), "--output", str(output)]
+    command += ["--text-extractor", "pypdf2"]
+    for options, has_watermark in [([], False), (["--watermark"], True)]:
+        result = CliRunner().invoke(entry_point, command + options)
+        assert result.exit_code == 0, result.output
+        with open(output) as fp:
+            (row,) = csv.DictReader(fp, delimiter=";")
+        assert ("watermark" in row) == has_watermark
+        assert row["nb_characters"] == "16096"